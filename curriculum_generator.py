@@ -1,87 +1,26 @@
 import os
 import streamlit as st
-from dotenv import load_dotenv
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
+from tutor.admission import wait_in_line
+from tutor.background import LOW, collect, get_executor
+from tutor.engine import PREREQUISITE_LEVEL, get_engine
+from tutor.event_log import log_response, new_session_id
+from tutor.lesson_pack import build_pack, write_pack, zip_pack
+from tutor.lesson_sections import SECTION_LABELS
+from tutor.lesson_store import profile_hash
+from tutor.parsers import parse_lesson_quiz
+from tutor.metrics import track_session
+from tutor.profiling import checkpoint, render_panel, start_rerun
+from tutor.review import ReviewQueue
+from tutor.session import init_state, learner_id
+from tutor.session_cache import SessionCache, render_usage
+from tutor.validation import answer_letter, grade, shuffled_quiz, validate_question
 
-load_dotenv(dotenv_path="../.env", override=True)
-llm = ChatOpenAI(temperature=0.5)
-
-curriculum_prompt = PromptTemplate(
-    input_variables=["topic", "num_lessons", "level", "mistakes"],
-    template="Create a structured curriculum with {num_lessons} lesson topics for the subject: {topic}. Return only the numbered list:\n1. ...\n2. ...\n3. ...\n etc. Make sure to take their level of understanding ({level}) and any learning challenges ({challenges}) into account when organizing the curriculum. Keep the curriculum concise with each lesson topic under 10 words."
-)
-
-lesson_prompt = PromptTemplate(
-    input_variables=["topic", "level", "mistakes"],
-    template="""
-You are a helpful and engaging AI tutor.
-
-Create a comprehensive personalized lesson based on:
-- Lesson Title: {lesson}
-- Broader Unit: {topic}
-- Level: {level}
-- Learning Challenges: {challenges} (adjust explanation style and/or use analogies)
-- Mistakes: {mistakes} (address these directly with clarification and repetition)
-
-The lesson should include:
-1. Clear explanation of key concepts (about two paragraphs)
-2. Two examples (basic and advanced)
-3. 3-question multiple choice quiz
-
-Use this format:
-**Title:** [Title]
-
-**Explanation:**
-[Explanation]
-
-**Example 1: Basic**
-[...]
-
-**Example 2: Advanced**
-[...]
-
-**Quiz:**
-
-**Q1:** [Question]
-A. ...
-B. ...
-C. ...
-D. ...
-**Answer:** [Correct]
-
-**Q2:** [Question]
-...
-**Answer:** [Correct]
-
-**Q3:** [Question]
-...
-**Answer:** [Correct]
-""")
-
-quiz_prompt = PromptTemplate(
-    input_variables=["topic", "difficulty", "question_number"],
-    template="""
-You are a helpful AI tutor. Write one UNIQUE question about "{topic}" at a "{difficulty}" difficulty level.
-
-Use this format:This is question #{question_number} - make sure it's different from previous questions and randomize the correct answer.
-
-Question: <question>
-A. <option>
-B. <option>
-C. <option>
-D. <option>
-**Correct Answer: X**
-Explanation: <one sentence explanation>
-"""
-)
-
-curriculum_chain = LLMChain(llm=llm, prompt=curriculum_prompt)
-lesson_chain = LLMChain(llm=llm, prompt=lesson_prompt)
-quiz_chain = LLMChain(llm=llm, prompt=quiz_prompt)
+engine = get_engine("curriculum_generator")
+lesson_store = engine.lesson_store
+curriculum_library = engine.curriculum_library
 
 st.set_page_config(page_title="AI Learning Platform", layout="wide", initial_sidebar_state="expanded")
+start_rerun("curriculum_generator")
 
 # Custom CSS for better aesthetics
 st.markdown("""
@@ -142,59 +81,77 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+checkpoint("css")
+
 # Initialize session state
-if "curriculum" not in st.session_state:
-    st.session_state.curriculum = []
-if "lesson_index" not in st.session_state:
-    st.session_state.lesson_index = 0
-if "lesson_data" not in st.session_state:
-    st.session_state.lesson_data = {}
-if "quiz_answers" not in st.session_state:
-    st.session_state.quiz_answers = {}
-if "quiz_submitted" not in st.session_state:
-    st.session_state.quiz_submitted = False
-if "completed_lessons" not in st.session_state:
-    st.session_state.completed_lessons = set()
-if "practice_questions" not in st.session_state:
-    st.session_state.practice_questions = []
+init_state({
+    "session_id": new_session_id,
+    "learner": learner_id,  # stable across sessions through the URL, keys the saved review schedule
+    "curriculum": [],
+    "curriculum_id": None,  # row in the curriculum library
+    "prerequisites": [],  # leading lesson titles served from the shared prerequisite library
+    "lesson_index": 0,
+    "lesson_data": {},  # lesson title -> lesson store digest
+    "quiz_answers": {},
+    "quiz_submitted": False,
+    "quiz_attempt": 0,  # each retake shows the choices in a new order
+    "completed_lessons": set(),
+    "reviews": lambda: ReviewQueue(st.session_state.learner),  # spaced-repetition schedule of answered questions
+    "practice_checked": None,  # lesson title whose practice answers were checked
+    # text:<digest>, quiz:<digest> and practice:<title> entries, bounded in memory
+    "lesson_cache": lambda: SessionCache(st.session_state.session_id),
+    "lesson_alternates": {},  # lesson title -> Future of a pre-generated alternate's digest
+    "lesson_prefetch": {},  # lesson title -> Future of its lesson digest
+})
 
-def parse_quiz(text):
-    lines = text.split('\n')
-    quiz_started = False
-    questions = {}
-    q_num = 0
-    for line in lines:
-        if line.strip().startswith("**Quiz:**"):
-            quiz_started = True
-            continue
-        if quiz_started:
-            if line.strip().startswith("**Q"):
-                q_num += 1
-                q = line.split(":**", 1)[-1].strip()
-                questions[q_num] = {"question": q, "choices": [], "answer": ""}
-            elif line.strip().startswith(("A.", "B.", "C.", "D.")):
-                questions[q_num]["choices"].append(line.strip())
-            elif line.strip().startswith("**Answer:**"):
-                questions[q_num]["answer"] = line.strip().split("**Answer:**")[-1].strip()
-    return questions
+# Quiz scores below this trigger speculative generation of an alternate lesson
+POOR_SCORE = 2
+PRACTICE_QUESTIONS = 5
+
+track_session("curriculum_generator")
+checkpoint("state_init")
+
+def lesson_inputs(lesson_title, alternate=False):
+    """Build the lesson prompt inputs for a lesson of the current curriculum"""
+    lesson_mistakes = mistakes
+    if lesson_title in st.session_state.prerequisites:
+        # Shared by every learner of the subject, so nothing learner-specific
+        lesson_mistakes = "Ensure the explanation introduces and clearly explains any background ideas or terminology the learner must understand before continuing to later lessons. Do not assume prior knowledge, and provide gentle, beginner-friendly explanations when appropriate."
+    if alternate:
+        lesson_mistakes = lesson_mistakes + " The learner struggled with a previous version of this lesson, so explain the concepts in a different way and use new examples and quiz questions."
+    return {"lesson": lesson_title, "topic": topic, "level": level, "mistakes": lesson_mistakes, "challenges": challenges}
+
+def lesson_cache_keys(lesson_num):
+    """Session cache keys holding the content of a lesson (0-based index)"""
+    if not 0 <= lesson_num < len(st.session_state.curriculum):
+        return []
+    title = st.session_state.curriculum[lesson_num]
+    digest = st.session_state.lesson_data.get(title)
+    return [f"text:{digest}", f"quiz:{digest}", f"practice:{title}"]
 
-def generate_practice_questions(topic, level):
-    questions = []
-    for i in range(1, 6):
-        result = quiz_chain.run({"topic": topic, "difficulty": level, "question_number": i})
-        parts = result.strip().split("\n")
-        q_text, choices, correct, explanation = "", [], "", ""
-        for part in parts:
-            if part.startswith("Question:"):
-                q_text = part.replace("Question:", "").strip()
-            elif part.startswith(("A.", "B.", "C.", "D.")):
-                choices.append(part.strip())
-            elif part.startswith("**Correct Answer:"):
-                correct = part.replace("**Correct Answer:", "").replace("**", "").strip()
-            elif part.startswith("Explanation:"):
-                explanation = part.replace("Explanation:", "").strip()
-        questions.append({"question": q_text, "choices": choices, "correct": correct, "explanation": explanation})
-    return questions
+def lesson_key(lesson_title):
+    """Lesson store key for a lesson of the current curriculum and learner"""
+    if lesson_title in st.session_state.prerequisites:
+        return (topic, lesson_title, PREREQUISITE_LEVEL, profile_hash(challenges))
+    return (topic, lesson_title, level, profile_hash(mistakes, challenges))
+
+def prefetch_first_lesson(title):
+    """Start generating lesson 1 in the background as soon as its title is known"""
+    if title not in st.session_state.lesson_prefetch:
+        st.session_state.lesson_prefetch = {title: engine.prefetch_unit_lesson(lesson_inputs(title), lesson_key(title))}
+
+def pack_lessons():
+    """Generated lessons of the current curriculum, with their quizzes, for a lesson pack"""
+    cache = st.session_state.lesson_cache
+    lessons = {}
+    for title in st.session_state.curriculum:
+        digest = st.session_state.lesson_data.get(title) or lesson_store.lookup(*lesson_key(title))
+        if digest is None:
+            continue
+        content = cache.get(f"text:{digest}", lambda: lesson_store.get(digest))
+        quiz = cache.get(f"quiz:{digest}") or {q_num: q for q_num, q in parse_lesson_quiz(content).items() if not validate_question(q)}
+        lessons[title] = {"content": content, "quiz": list(quiz.values()), "practice": cache.get(f"practice:{title}") or []}
+    return lessons
 
 def get_completion_progress():
     if not st.session_state.curriculum:
@@ -218,26 +175,57 @@ with tab1:
         num_lessons = st.slider("Number of Lessons", min_value=3, max_value=15, value=5)
         mistakes = st.text_area("Common Mistakes/Difficult Topics", placeholder="Optional: List common mistakes or areas of difficulty...")
         challenges = st.text_area("Learning Challenges", placeholder="Optional: List any learning difficulties or challenges (ex. must be at a 3rd grade level)")
+        fresh_curriculum = st.checkbox("Generate a fresh curriculum", help="Skip the library of curricula other learners have already used")
     
     if st.button("Generate Curriculum", type="primary", use_container_width=True):
         with st.spinner("Creating your personalized curriculum..."):
-            if (level == "Lacks Foundation"):
-                num_lessons = num_lessons + 3;
-                mistakes = mistakes + (
-                " The first three lessons should focus on the essential prerequisite knowledge "
-                "a learner must understand before diving into the main subject. Ensure these lessons "
-                "cover foundational concepts that are commonly missing or assumed prior to learning the topic.")
-            result = curriculum_chain.run({"topic": topic, "num_lessons": num_lessons, "challenges": challenges, "level": level})
-            st.session_state.curriculum = [line.split(". ", 1)[1] for line in result.strip().split("\n") if ". " in line]
+            st.session_state.lesson_prefetch = {}
+            # Foundation learners first get the subject's prerequisite lessons, which all of them share
+            prerequisites = wait_in_line("Finding prerequisite lessons...", engine.prerequisites, topic) if level == "Lacks Foundation" else []
+            st.session_state.prerequisites = prerequisites
+            if prerequisites:
+                prefetch_first_lesson(prerequisites[0])
+            # Serve a saved curriculum for known subjects, only call the LLM for new ones
+            profile = profile_hash(challenges)
+            match = None if fresh_curriculum else curriculum_library.find(topic, level, num_lessons, profile)
+            if match:
+                st.session_state.curriculum_id, titles = match
+            else:
+                inputs = {"topic": topic, "num_lessons": num_lessons, "challenges": challenges, "level": level}
+                titles_box = st.empty()
+                waiting = engine.admission.stats()["waiting"]
+                if waiting:
+                    titles_box.info(f"The tutor is busy right now - {waiting} requests are ahead of yours.")
+                try:
+                    # Show titles as they stream and start on lesson 1 right away
+                    titles = []
+                    for titles in engine.stream_curriculum(inputs):
+                        titles_box.markdown("\n".join(f"{n}. {title}" for n, title in enumerate(prerequisites + titles, 1)))
+                        prefetch_first_lesson((prerequisites + titles)[0])
+                except Exception:
+                    # Streaming failed or timed out; fall back to the hedged, non-streaming call
+                    titles = wait_in_line("Creating your personalized curriculum...", engine.curriculum, inputs)
+                if not titles:
+                    # Never save an empty curriculum to the shared library
+                    titles_box.empty()
+                    st.error("The curriculum could not be created. Please try again.")
+                    st.stop()
+                st.session_state.curriculum_id = curriculum_library.add(topic, level, num_lessons, titles, profile)
+            st.session_state.curriculum = prerequisites + [title for title in titles if title not in prerequisites]
+            if st.session_state.curriculum:
+                prefetch_first_lesson(st.session_state.curriculum[0])
             st.session_state.lesson_index = 0
             st.session_state.lesson_data = {}
+            st.session_state.lesson_cache.clear()
             st.session_state.quiz_answers = {}
             st.session_state.quiz_submitted = False
             st.session_state.completed_lessons = set()
-            st.session_state.practice_questions = []
+            st.session_state.lesson_alternates = {}
         st.success("Curriculum created successfully! Switch to the Learning Dashboard to begin.")
         st.rerun()
 
+checkpoint("create_tab")
+
 with tab2:
     # Sidebar for lessons and progress
     with st.sidebar:
@@ -290,11 +278,19 @@ with tab2:
                 if btn:
                     st.session_state.lesson_index = i
                     st.session_state.quiz_submitted = False
-                    st.session_state.practice_questions = []
                     st.rerun()
+
+            # Static offline copy of the generated lessons; viewing it costs no LLM calls
+            st.markdown("---")
+            if st.button("Export Lesson Pack"):
+                files = build_pack(topic, level, st.session_state.curriculum, pack_lessons())
+                pack_name = os.path.basename(write_pack(files))
+                st.download_button("Download Lesson Pack", zip_pack(files), file_name=f"lesson-pack-{pack_name}.zip", mime="application/zip")
         else:
             st.info("Create a curriculum first to see your lessons here.")
 
+    checkpoint("sidebar")
+
     # Main content area
     if st.session_state.curriculum:
         current_topic = st.session_state.curriculum[st.session_state.lesson_index]
@@ -304,23 +300,44 @@ with tab2:
         st.markdown(f'<div class="lesson-title">Lesson {current_lesson_num}: {current_topic}</div>', unsafe_allow_html=True)
 
         if current_topic not in st.session_state.lesson_data:
-            with st.spinner("Generating lesson content..."):
-                if level == "Lacks Foundation" and current_lesson_num < 3:
-                    mistakes = mistakes +  "ensure the explanation introduces and clearly explains any background ideas or terminology the learner must understand before continuing to later lessons. Do not assume prior knowledge, and provide gentle, beginner-friendly explanations when appropriate."
-                result = lesson_chain.run({"lesson": current_topic, "topic": topic, "level": level, "mistakes": mistakes, "challenges": challenges})
-                st.session_state.lesson_data[current_topic] = result
-                st.session_state.quiz_answers = {}
-                st.session_state.quiz_submitted = False
+            # Use the prefetched lesson or an identical earlier request before asking the LLM
+            inputs, key = lesson_inputs(current_topic), lesson_key(current_topic)
+            prefetched = st.session_state.lesson_prefetch.pop(current_topic, None)
+            digest = wait_in_line(
+                "Generating lesson content...", lambda: collect(prefetched) or engine.unit_lesson(inputs, key)
+            )
+            st.session_state.lesson_data[current_topic] = digest
+            st.session_state.quiz_answers = {}
+            st.session_state.quiz_submitted = False
 
-        full_lesson = st.session_state.lesson_data[current_topic]
+        lesson_digest = st.session_state.lesson_data[current_topic]
+        cache = st.session_state.lesson_cache
+        # Keep the current and adjacent lessons in memory; others may be spilled to disk
+        cache.pin(*[key for i in range(current_lesson_num - 2, current_lesson_num + 1) for key in lesson_cache_keys(i)])
+        full_lesson = cache.get(f"text:{lesson_digest}", lambda: lesson_store.get(lesson_digest))
         main_content = full_lesson.split("**Quiz:")[0]
         st.markdown(main_content)
+        checkpoint("lesson_markdown")
+
+        # Regenerate one part of the lesson and keep the rest
+        with st.expander("Refresh part of this lesson"):
+            for col, (section, label) in zip(st.columns(len(SECTION_LABELS)), SECTION_LABELS.items()):
+                if col.button(f"New {label.lower()}", key=f"refresh_{section}"):
+                    st.session_state.lesson_data[current_topic] = wait_in_line(
+                        f"Writing a new {label.lower()}...",
+                        engine.refresh_section, lesson_digest, section, lesson_inputs(current_topic)
+                    )
+                    st.session_state.quiz_answers = {}
+                    st.session_state.quiz_submitted = False
+                    st.rerun()
 
         # Quiz section
         st.markdown('<div class="quiz-section">', unsafe_allow_html=True)
         st.markdown("### Knowledge Check")
         
-        quiz = parse_quiz(full_lesson)
+        if f"quiz:{lesson_digest}" not in cache:
+            cache.set(f"quiz:{lesson_digest}", engine.lesson_quiz(full_lesson, current_topic, level, seed=lesson_digest))
+        quiz = shuffled_quiz(cache.get(f"quiz:{lesson_digest}"), f"{st.session_state.session_id}:{st.session_state.quiz_attempt}")
         
         if not st.session_state.quiz_submitted:
             with st.form("quiz_form"):
@@ -329,13 +346,25 @@ with tab2:
                     options = [c.split(".", 1)[0].strip() for c in q["choices"]]
                     option_map = {c.split(".", 1)[0].strip(): c for c in q["choices"]}
                     st.session_state.quiz_answers[q_num] = st.radio(
-                        "Select your answer:", options, format_func=lambda x: option_map[x], key=f"q{q_num}"
+                        "Select your answer:", options, format_func=lambda x, m=option_map: m[x], key=f"q{q_num}"
                     )
                     st.markdown("---")
                 
                 submitted = st.form_submit_button("Submit Quiz", type="primary")
                 if submitted:
+                    for q_num, q in quiz.items():
+                        selected = st.session_state.quiz_answers.get(q_num, "")
+                        log_response(
+                            st.session_state.session_id, "curriculum_generator", topic, q["question"],
+                            selected, answer_letter(q), grade(q, selected),
+                            difficulty=level, lesson=current_topic
+                        )
+                        if "id" in q:
+                            st.session_state.reviews.record(q["id"], grade(q, selected))
                     st.session_state.quiz_submitted = True
+                    # A curriculum someone has learned from is good enough to reuse
+                    if st.session_state.curriculum_id is not None:
+                        curriculum_library.approve(st.session_state.curriculum_id)
                     # Mark lesson as completed when quiz is submitted
                     st.session_state.completed_lessons.add(st.session_state.lesson_index)
                     st.rerun()
@@ -346,48 +375,93 @@ with tab2:
                 selected = st.session_state.quiz_answers.get(q_num, "")
                 st.markdown(f"**Question {q_num}:** {q['question']}")
                 
-                if selected == correct[0]:
+                if grade(q, selected):
                     st.success(f"Correct! Answer: {correct}")
                     score += 1
                 else:
                     st.error(f"Incorrect. You selected: {selected} | Correct answer: {correct}")
                 st.markdown("---")
             
-            st.markdown(f'<div class="score-display">Final Score: {score} out of 3</div>', unsafe_allow_html=True)
+            st.markdown(f'<div class="score-display">Final Score: {score} out of {len(quiz)}</div>', unsafe_allow_html=True)
+
+            # Pre-generate an alternate explanation in the background so Regenerate is instant
+            if score < POOR_SCORE and current_topic not in st.session_state.lesson_alternates:
+                st.session_state.lesson_alternates[current_topic] = get_executor().submit(
+                    engine.unit_lesson, lesson_inputs(current_topic, alternate=True), priority=LOW
+                )
             
             # Action buttons
             col1, col2, col3 = st.columns(3)
             with col1:
                 if st.button("Retake Quiz", type="secondary"):
                     st.session_state.quiz_submitted = False
+                    st.session_state.quiz_attempt += 1
                     st.rerun()
             
             with col2:
                 if st.button("Regenerate Lesson"):
-                    with st.spinner("Regenerating lesson..."):
-                        result = lesson_chain.run({"topic": current_topic, "level": level, "mistakes": mistakes})
-                        st.session_state.lesson_data[current_topic] = result
+                    alternate = st.session_state.lesson_alternates.get(current_topic)
+                    if engine.admission.overloaded() and not (alternate and alternate.done()):
+                        # Optional work: keep the lesson rather than join a long line
+                        st.warning("The tutor is very busy right now, so the lesson was kept as it is. Please try again in a minute.")
+                    else:
+                        st.session_state.lesson_alternates.pop(current_topic, None)
+                        inputs = lesson_inputs(current_topic, alternate=True)
+                        st.session_state.lesson_data[current_topic] = wait_in_line(
+                            "Regenerating lesson...", lambda: collect(alternate) or engine.unit_lesson(inputs)
+                        )
                         st.session_state.quiz_answers = {}
                         st.session_state.quiz_submitted = False
-                        st.session_state.practice_questions = []
-                    st.rerun()
+                        cache.pop(f"practice:{current_topic}")
+                        st.rerun()
             
             with col3:
                 if st.button("Extra Practice"):
-                    with st.spinner("Generating practice questions..."):
-                        st.session_state.practice_questions = generate_practice_questions(current_topic, level)
+                    # Questions due for review first; only the remainder is generated
+                    seed = st.session_state.session_id
+                    reviews = engine.review_questions(st.session_state.reviews.due(PRACTICE_QUESTIONS), seed=seed)
+                    fresh = wait_in_line(
+                        "Generating practice questions...",
+                        engine.practice_questions, current_topic, level, seed=seed,
+                        count=PRACTICE_QUESTIONS - len(reviews), exclude=[q["id"] for q in reviews]
+                    )
+                    cache.set(f"practice:{current_topic}", reviews + fresh)
+                    st.session_state.practice_checked = None
                     st.rerun()
             
             # Practice questions section
-            if st.session_state.practice_questions:
+            practice_questions = cache.get(f"practice:{current_topic}")
+            if practice_questions:
                 st.markdown('<div class="practice-section">', unsafe_allow_html=True)
                 st.markdown("### Extra Practice Questions")
-                for i, q in enumerate(st.session_state.practice_questions):
-                    st.markdown(f"**Practice Question {i+1}:** {q['question']}")
-                    for c in q['choices']:
-                        st.markdown(c)
-                    st.info(f"**Correct Answer:** {q['correct']} - {q['explanation']}")
-                    st.markdown("---")
+                with st.form("practice_form"):
+                    for i, q in enumerate(practice_questions):
+                        label = "Review Question" if q.get("review") else "Practice Question"
+                        st.markdown(f"**{label} {i+1}:** {q['question']}")
+                        options = [c.split(".", 1)[0].strip() for c in q["choices"]]
+                        option_map = {c.split(".", 1)[0].strip(): c for c in q["choices"]}
+                        st.radio(
+                            "Select your answer:", options, format_func=lambda x, m=option_map: m[x], key=f"practice{i}"
+                        )
+                        if st.session_state.practice_checked == current_topic:
+                            if grade(q, st.session_state.get(f"practice{i}", "")):
+                                st.success("Correct!")
+                            else:
+                                st.error("Incorrect.")
+                            st.info(f"**Correct Answer:** {answer_letter(q)} - {q['explanation']}")
+                        st.markdown("---")
+                    if st.form_submit_button("Check Answers") and st.session_state.practice_checked != current_topic:
+                        for i, q in enumerate(practice_questions):
+                            selected = st.session_state.get(f"practice{i}", "")
+                            log_response(
+                                st.session_state.session_id, "curriculum_generator", topic, q["question"],
+                                selected, answer_letter(q), grade(q, selected),
+                                difficulty=level, lesson=current_topic
+                            )
+                            if "id" in q:
+                                st.session_state.reviews.record(q["id"], grade(q, selected))
+                        st.session_state.practice_checked = current_topic
+                        st.rerun()
                 st.markdown('</div>', unsafe_allow_html=True)
             
             # Next lesson button
@@ -395,7 +469,6 @@ with tab2:
                 if st.button("Continue to Next Lesson", type="primary", use_container_width=True):
                     st.session_state.lesson_index += 1
                     st.session_state.quiz_submitted = False
-                    st.session_state.practice_questions = []
                     st.rerun()
             else:
                 completion_rate = get_completion_progress()
@@ -416,4 +489,9 @@ with tab2:
         - **Knowledge check quizzes** to test your understanding  
         - **Extra practice questions** for additional reinforcement
         - **Lesson regeneration** for alternative explanations
-        """)
\ No newline at end of file
+        """)
+
+render_usage(st.session_state.lesson_cache)
+
+# Developer profiling panel (opt-in)
+render_panel()
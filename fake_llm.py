@@ -0,0 +1,130 @@
+"""Local stand-in for the OpenAI backend, used by the load tester.
+
+``install()`` replaces ``LLMChain.run`` so every chain in the apps answers
+with canned text in the formats our parsers expect, after a latency drawn
+from a log-normal distribution per prompt type.  A semaphore models the
+provider's concurrency limit, so queueing shows up the way it would against
+the real API.  Calls to the cascade's small model (``small_model``) are
+faster and can be made to return unusable output, to exercise escalation.
+"""
+
+import random
+import threading
+import time
+
+# (median seconds, log-normal sigma) per prompt type, roughly what we see in production
+LATENCY_PROFILE = {
+    "curriculum": (3.0, 0.4),
+    "lesson": (12.0, 0.35),
+    "lesson_section": (5.0, 0.35),
+    "quiz": (2.5, 0.4),
+    "quiz_batch": (9.0, 0.35),
+}
+# Small-model latency relative to the default model
+SMALL_MODEL_SPEED = 0.4
+
+
+def prompt_type(inputs):
+    """Infer the prompt type from the chain inputs"""
+    if "num_lessons" in inputs:
+        return "curriculum"
+    if "section" in inputs:
+        return "lesson_section"
+    if "per_level" in inputs:
+        return "quiz_batch"
+    if "difficulty" in inputs:
+        return "quiz"
+    return "lesson"
+
+
+def _question(rng, topic, n, difficulty=None):
+    letter = rng.choice("ABCD")
+    lines = [f"Difficulty: {difficulty}"] if difficulty else []
+    lines += [
+        f"Question: Which statement about {topic} is true? (#{n}-{rng.randrange(10**6)})",
+        "",
+        *[f"{c}. Option {c} about {topic}" for c in "ABCD"],
+        "",
+        f"**Correct Answer: {letter}**",
+        "",
+        f"Explanation: Option {letter} is the accurate statement.",
+    ]
+    return "\n".join(lines)
+
+
+def respond(inputs, rng=random):
+    """Canned output for a chain call"""
+    kind = prompt_type(inputs)
+    topic = inputs.get("topic", "the topic")
+    if kind == "curriculum":
+        return "\n".join(f"{i}. {topic} concept {i}" for i in range(1, int(inputs["num_lessons"]) + 1))
+    if kind == "quiz":
+        return _question(rng, topic, inputs.get("question_number", 1))
+    if kind == "quiz_batch":
+        return "\n\n".join(
+            _question(rng, topic, i, level)
+            for level in ("easy", "medium", "hard") for i in range(int(inputs["per_level"]))
+        )
+    title = inputs.get("lesson", topic)
+    sections = {
+        "explanation": " ".join([f"{title} builds on {topic}."] * 60),
+        "basic_example": f"A simple case of {title}.",
+        "advanced_example": f"A harder case of {title}.",
+        "quiz": "\n\n".join(
+            f"**Q{i}:** What is key idea {i} of {title}?\n"
+            + "\n".join(f"{c}. Idea {c}{i}" for c in "ABCD")
+            + f"\n**Answer:** {rng.choice('ABCD')}"
+            for i in range(1, 4)
+        ),
+    }
+    if kind == "lesson_section":
+        return sections[inputs["section"]]
+    return (
+        f"**Title:** {title}\n\n**Explanation:**\n{sections['explanation']}\n\n"
+        f"**Example 1: Basic**\n{sections['basic_example']}\n\n"
+        f"**Example 2: Advanced**\n{sections['advanced_example']}\n\n**Quiz:**\n\n{sections['quiz']}\n"
+    )
+
+
+class FakeBackend:
+    """Latency, concurrency limit and call accounting for the fake LLM"""
+
+    def __init__(self, concurrency=32, speed=1.0, error_rate=0.0, seed=None, small_model=None, small_invalid_rate=0.0):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.speed = speed
+        self.error_rate = error_rate
+        self.small_model = small_model
+        self.small_invalid_rate = small_invalid_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = []  # (prompt type, queue wait, service time, ok)
+
+    def run(self, inputs, model=None):
+        kind = prompt_type(inputs)
+        median, sigma = LATENCY_PROFILE[kind]
+        small = model is not None and model == self.small_model
+        with self.lock:
+            service = self.rng.lognormvariate(0, sigma) * median * self.speed * (SMALL_MODEL_SPEED if small else 1.0)
+            fail = self.rng.random() < self.error_rate
+            invalid = small and self.rng.random() < self.small_invalid_rate
+        if small:
+            kind += ":small"
+        queued = time.perf_counter()
+        with self.slots:
+            waited = time.perf_counter() - queued
+            time.sleep(service)
+        with self.lock:
+            self.calls.append((kind, waited, service, not fail))
+        if fail:
+            raise RuntimeError(f"fake {kind} backend error")
+        if invalid:
+            return "I'm not sure how to answer that."
+        return respond(inputs, self.rng)
+
+
+def install(backend):
+    """Route every LLMChain.run through ``backend``"""
+    from langchain.chains import LLMChain
+
+    LLMChain.run = lambda self, inputs, *args, **kwargs: backend.run(inputs, getattr(self.llm, "model_name", None))
+    return backend
@@ -0,0 +1,454 @@
+"""Simulate a classroom of learners hitting one tutor process.
+
+Each simulated learner is a thread that makes the same engine calls, in the
+same order, as an app script does for each action (generate a curriculum,
+open a lesson, submit a quiz, ...), while every LLM call goes to the local
+fake backend in fake_llm.py.  All learners share the process's engine,
+admission control, background workers and stores, the way sessions share a
+``streamlit run`` server.  The report covers throughput, action latency,
+admission waits and shedding, provider queueing, process memory and errors,
+so runs with different cache or concurrency settings can be compared.
+
+With ``--size-for N`` the tool sizes replicas instead: it runs classrooms of
+growing size, each in a fresh process, finds the most learners one process
+serves with no errors and interactive admission waits (p95) within
+``--max-wait``, and reports how many replicas N learners need.
+``--llm-concurrency`` is then the provider capacity available to one replica.
+
+    python loadtest.py --learners 60 --app curriculum_generator
+    python loadtest.py --learners 30 --app quiz --llm-concurrency 8 --speed 0.2
+    python loadtest.py --cascade-model gpt-4o-mini --small-invalid-rate 0.1
+    python loadtest.py --app quiz --speed 0.1 --size-for 500 --max-wait 2
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+LEVELS = ["Lacks Foundation", "Understands a Little", "Understands Somewhat", "Understands a Lot"]
+# Same thresholds as the apps
+POOR_SCORE = 2
+PRACTICE_QUESTIONS = 5
+
+
+def _percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+
+def _bucket_percentile(bounds, cumulative, count, p):
+    """Upper bound of the histogram bucket holding the p-th percentile (inf past the last bucket)"""
+    target = math.ceil(count * p / 100)
+    return next((bound for bound, n in zip(bounds, cumulative) if n >= target), math.inf)
+
+
+class Learner:
+    """One scripted learner session"""
+
+    def __init__(self, app, index, args, recorder):
+        from tutor.engine import get_engine
+
+        self.engine = get_engine(app)
+        self.app = app
+        self.index = index
+        self.args = args
+        self.rng = random.Random(index)
+        self.recorder = recorder
+        self.session_id = f"loadtest-{index}"
+
+    def act(self, name, fn):
+        start = time.perf_counter()
+        ok = True
+        try:
+            fn()
+        except Exception:
+            ok = False
+        self.recorder.record(name, time.perf_counter() - start, ok)
+        time.sleep(self.rng.uniform(0, self.args.think_time))
+        return ok
+
+    def run(self):
+        getattr(self, f"run_{self.app}")()
+
+    def answer_quiz(self, quiz, topic, difficulty, lesson=""):
+        """Pick answers at random and log them like the apps do; returns the score"""
+        from tutor.event_log import log_response
+        from tutor.validation import answer_letter, grade
+
+        score = 0
+        for q in quiz.values():
+            selected = self.rng.choice("ABCD")
+            correct = grade(q, selected)
+            score += correct
+            log_response(self.session_id, self.app, topic, q["question"], selected, answer_letter(q), correct,
+                         difficulty=difficulty, lesson=lesson)
+            if "id" in q:
+                self.reviews.record(q["id"], correct)
+        return score
+
+    # curriculum_generator.py
+
+    def lesson_key(self, topic, level, title):
+        from tutor.engine import PREREQUISITE_LEVEL
+        from tutor.lesson_store import profile_hash
+
+        if title in self.prerequisites:
+            return (topic, title, PREREQUISITE_LEVEL, profile_hash(""))
+        return (topic, title, level, profile_hash("", ""))
+
+    def prefetch_first_lesson(self, topic, level, title):
+        if title not in self.prefetch:
+            inputs = {"lesson": title, "topic": topic, "level": level, "mistakes": "", "challenges": ""}
+            self.prefetch = {title: self.engine.prefetch_unit_lesson(inputs, self.lesson_key(topic, level, title))}
+
+    def generate_curriculum(self, topic, level):
+        from tutor.lesson_store import profile_hash
+
+        engine = self.engine
+        self.prefetch = {}
+        self.prerequisites = engine.prerequisites(topic) if level == "Lacks Foundation" else []
+        if self.prerequisites:
+            self.prefetch_first_lesson(topic, level, self.prerequisites[0])
+        match = engine.curriculum_library.find(topic, level, self.args.lessons, profile_hash(""))
+        if match:
+            self.curriculum_id, titles = match
+        else:
+            inputs = {"topic": topic, "num_lessons": self.args.lessons, "challenges": "", "level": level}
+            try:
+                titles = []
+                for titles in engine.stream_curriculum(inputs):
+                    self.prefetch_first_lesson(topic, level, (self.prerequisites + titles)[0])
+            except Exception:
+                titles = engine.curriculum(inputs)
+            if not titles:
+                raise RuntimeError("empty curriculum")
+            self.curriculum_id = engine.curriculum_library.add(topic, level, self.args.lessons, titles, profile_hash(""))
+        self.curriculum = self.prerequisites + [title for title in titles if title not in self.prerequisites]
+
+    def open_lesson(self, topic, level, title):
+        from tutor.background import collect
+
+        engine = self.engine
+        inputs = {"lesson": title, "topic": topic, "level": level, "mistakes": "", "challenges": ""}
+        prefetched = self.prefetch.pop(title, None)
+        digest = collect(prefetched) or engine.unit_lesson(inputs, self.lesson_key(topic, level, title))
+        self.quiz = engine.lesson_quiz(engine.lesson_store.get(digest), title, level, seed=digest)
+
+    def submit_quiz(self, topic, level, title):
+        from tutor.background import LOW, get_executor
+
+        score = self.answer_quiz(self.quiz, topic, level, lesson=title)
+        self.engine.curriculum_library.approve(self.curriculum_id)
+        if score < POOR_SCORE:
+            inputs = {"lesson": title, "topic": topic, "level": level, "mistakes": "", "challenges": ""}
+            get_executor().submit(self.engine.unit_lesson, inputs, priority=LOW)
+
+    def extra_practice(self, title, level):
+        reviews = self.engine.review_questions(self.reviews.due(PRACTICE_QUESTIONS), seed=self.session_id)
+        self.engine.practice_questions(
+            title, level, seed=self.session_id,
+            count=PRACTICE_QUESTIONS - len(reviews), exclude=[q["id"] for q in reviews]
+        )
+
+    def run_curriculum_generator(self):
+        from tutor.review import ReviewQueue
+
+        self.reviews = ReviewQueue(self.session_id)
+        topic, level = self.rng.choice(self.args.subjects), self.rng.choice(LEVELS)
+
+        def generate():
+            self.generate_curriculum(topic, level)
+            self.open_lesson(topic, level, self.curriculum[0])
+
+        if not self.act("generate_curriculum", generate):
+            return
+        for lesson, title in enumerate(self.curriculum[:self.args.lessons]):
+            if lesson and not self.act("open_lesson", lambda: self.open_lesson(topic, level, title)):
+                continue
+            self.act("submit_quiz", lambda: self.submit_quiz(topic, level, title))
+            if self.rng.random() < self.args.practice_rate:
+                self.act("extra_practice", lambda: self.extra_practice(title, level))
+
+    # quiz.py and the lesson agent's adaptive practice
+
+    def next_question(self, topic):
+        question = self.engine.next_question(
+            topic, self.difficulty, self.question_number, pool=self.pool,
+            exclude=self.seen, seed=f"{self.session_id}:{self.question_number}"
+        )
+        if question is None:
+            raise RuntimeError("no valid question")
+        if "id" in question:
+            self.seen.append(question["id"])
+        self.question = question
+
+    def start_adaptive_quiz(self, topic):
+        self.pool = self.engine.question_pool(topic)
+        self.difficulty, self.question_number, self.seen, self.responses = "medium", 1, [], []
+        self.next_question(topic)
+
+    def submit_answer(self, topic):
+        from tutor.event_log import log_response
+        from tutor.validation import answer_letter, grade
+
+        selected = self.rng.choice("ABCD")
+        correct = grade(self.question, selected)
+        log_response(self.session_id, self.app, topic, self.question["question"], selected,
+                     answer_letter(self.question), correct, difficulty=self.difficulty)
+        self.responses.append((self.difficulty, correct))
+        theta, _ = self.engine.ability_model.estimate(self.responses)
+        self.difficulty = self.engine.ability_model.next_difficulty(theta)
+
+    def run_quiz(self):
+        topic = self.rng.choice(self.args.subjects)
+        if not self.act("start_quiz", lambda: self.start_adaptive_quiz(topic)):
+            return
+        for number in range(1, self.args.questions + 1):
+            self.act("submit_answer", lambda: self.submit_answer(topic))
+            if number == self.args.questions:
+                break
+            self.question_number += 1
+            if not self.act("next_question", lambda: self.next_question(topic)):
+                break
+
+    # personalized_lesson_agent.py
+
+    def generate_lesson(self, topic, level):
+        from tutor.lesson_store import profile_hash
+
+        engine = self.engine
+        inputs = {"topic": topic, "level": level, "mistakes": ""}
+        digest = engine.topic_lesson(inputs, (topic, topic, level, profile_hash("")))
+        self.quiz = engine.lesson_quiz(engine.lesson_store.get(digest), topic, level, seed=digest)
+
+    def run_personalized_lesson_agent(self):
+        from tutor.review import ReviewQueue
+
+        self.reviews = ReviewQueue()
+        topic, level = self.rng.choice(self.args.subjects), self.rng.choice(["easy", "medium", "hard"])
+        if not self.act("generate_lesson", lambda: self.generate_lesson(topic, level)):
+            return
+        self.act("submit_quiz", lambda: self.answer_quiz(self.quiz, topic, level))
+        if self.rng.random() < self.args.practice_rate:
+            self.act("extra_practice", lambda: self.start_adaptive_quiz(topic))
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.actions = {}
+        self.errors = {}
+
+    def record(self, name, seconds, ok):
+        with self._lock:
+            self.actions.setdefault(name, []).append(seconds)
+            if not ok:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def run_classroom(args, learners):
+    """Run ``learners`` sessions in this process; returns the figures ``report`` prints"""
+    import fake_llm
+    from tutor.admission import get_admission
+    from tutor.cascade import cascade_stats
+    from tutor.engine import get_engine
+    from tutor.metrics import registry
+
+    backend = fake_llm.install(fake_llm.FakeBackend(
+        args.llm_concurrency, args.speed, args.llm_error_rate, seed=0,
+        small_model=args.cascade_model, small_invalid_rate=args.small_invalid_rate
+    ))
+    recorder = Recorder()
+
+    def run(index):
+        try:
+            Learner(args.app, index, args, recorder).run()
+        except Exception:
+            recorder.record("learner_crashed", 0.0, False)
+
+    # Build the shared engine first, so the heap figures are what the sessions add
+    get_engine(args.app)
+    tracemalloc.start()
+    start = time.perf_counter()
+    threads = []
+    for i in range(learners):
+        thread = threading.Thread(target=run, args=(i,), name=f"learner-{i}", daemon=True)
+        threads.append(thread)
+        thread.start()
+        time.sleep(args.ramp / max(1, learners))
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    bounds, series = registry.histogram("tutor_llm_admission_wait_seconds")
+    waits = {dict(labels)["priority"]: (cumulative, count, total) for labels, (cumulative, count, total) in series.items()}
+    return {
+        "learners": learners, "elapsed": elapsed, "actions": recorder.actions, "errors": recorder.errors,
+        "calls": list(backend.calls), "cascade": cascade_stats.stats(), "shed": get_admission().stats()["shed"],
+        "wait_bounds": bounds, "waits": waits, "heap_peak": heap_peak,
+        "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def interactive_wait_p95(result):
+    cumulative, count, _ = result["waits"].get("high", ((), 0, 0))
+    return _bucket_percentile(result["wait_bounds"], cumulative, count, 95) if count else 0.0
+
+
+def report(args, result):
+    actions, errors, calls, elapsed = result["actions"], result["errors"], result["calls"], result["elapsed"]
+    total_actions = sum(len(v) for v in actions.values())
+    total_errors = sum(errors.values())
+    print(f"\n{result['learners']} learners on {args.app} in one process, {elapsed:.1f}s wall time")
+    print(f"throughput: {total_actions / elapsed:.2f} actions/s, "
+          f"{len(calls) / elapsed:.2f} LLM calls/s, "
+          f"error rate {total_errors / max(1, total_actions):.1%}")
+    print(f"\n{'action':<20}{'count':>7}{'p50 s':>9}{'p95 s':>9}{'max s':>9}{'errors':>8}")
+    for name, values in sorted(actions.items()):
+        print(f"{name:<20}{len(values):>7}{_percentile(values, 50):>9.2f}{_percentile(values, 95):>9.2f}"
+              f"{max(values):>9.2f}{errors.get(name, 0):>8}")
+
+    bounds = result["wait_bounds"]
+    print(f"\n{'admission wait':<20}{'requests':>9}{'mean s':>9}{'p50 s':>9}{'p95 s':>9}")
+    for priority in ("high", "normal", "low"):
+        if priority in result["waits"]:
+            cumulative, count, total = result["waits"][priority]
+            p50, p95 = (_bucket_percentile(bounds, cumulative, count, p) for p in (50, 95))
+            print(f"{priority:<20}{count:>9}{total / count:>9.2f}{p50:>9.2f}{p95:>9.2f}")
+    print("(percentiles rounded up to histogram buckets)")
+    print(f"admission: {result['shed']} background LLM requests shed under overload")
+
+    print(f"\n{'LLM prompt':<20}{'calls':>7}{'wait p50':>10}{'wait p95':>10}{'svc p50':>9}{'failed':>8}")
+    for kind in sorted({c[0] for c in calls}):
+        of_kind = [c for c in calls if c[0] == kind]
+        waits = [c[1] for c in of_kind]
+        services = [c[2] for c in of_kind]
+        print(f"{kind:<20}{len(of_kind):>7}{_percentile(waits, 50):>10.2f}{_percentile(waits, 95):>10.2f}"
+              f"{_percentile(services, 50):>9.2f}{sum(not c[3] for c in of_kind):>8}")
+
+    if result["cascade"]:
+        print(f"\n{'cascade prompt':<20}{'calls':>7}{'invalid':>9}{'errors':>8}{'escalated':>11}")
+        for kind, c in sorted(result["cascade"].items()):
+            print(f"{kind:<20}{c['calls']:>7}{c.get('invalid', 0):>9}{c.get('error', 0):>8}{c['rate']:>11.1%}")
+    print(f"\nmemory: python heap growth peak {result['heap_peak'] / 2**20:.1f} MiB "
+          f"({result['heap_peak'] / max(1, result['learners']) / 1024:.1f} KiB per learner), "
+          f"max RSS {result['max_rss'] / 2**20:.1f} MiB")
+
+
+def _run_step(args, learners, results):
+    """Entry point of a fresh process running one classroom for ``size_replicas``"""
+    prepare(args)
+    results.put(run_classroom(args, learners))
+
+
+def size_replicas(args):
+    """Find the learners one process serves within the targets, and the replicas ``--size-for`` needs"""
+    ctx = multiprocessing.get_context("spawn")
+    outcomes = {}
+
+    def passes(learners):
+        if learners not in outcomes:
+            results = ctx.Queue()
+            process = ctx.Process(target=_run_step, args=(args, learners, results))
+            process.start()
+            result = None
+            while result is None and process.is_alive():
+                try:
+                    result = results.get(timeout=1.0)
+                except queue.Empty:
+                    pass
+            process.join()
+            if result is None:
+                sys.exit(f"the {learners}-learner run crashed")
+            total = sum(len(v) for v in result["actions"].values())
+            error_rate = sum(result["errors"].values()) / max(1, total)
+            wait = interactive_wait_p95(result)
+            outcomes[learners] = error_rate <= args.max_error_rate and wait <= args.max_wait
+            print(f"{learners:>6} learners: interactive wait p95 {wait:.2f}s, error rate {error_rate:.1%}, "
+                  f"{result['shed']} shed -> {'ok' if outcomes[learners] else 'over target'}")
+        return outcomes[learners]
+
+    # Double until the targets are missed, then bisect to within 10%
+    low, high, learners = 0, None, max(1, min(args.learners, args.size_for))
+    while high is None:
+        if not passes(learners):
+            high = learners
+        elif learners >= args.size_for:
+            break
+        else:
+            low, learners = learners, min(2 * learners, args.size_for)
+    if high is None:
+        low = learners
+    while high is not None and high - low > max(1, low // 10):
+        mid = (low + high) // 2
+        if passes(mid):
+            low = mid
+        else:
+            high = mid
+
+    if not low:
+        print(f"\neven {high} learners miss the targets in one process; lower the load or raise --llm-concurrency")
+        return
+    print(f"\none process serves {low} learners with interactive admission waits (p95) within {args.max_wait}s; "
+          f"{args.size_for} learners need {math.ceil(args.size_for / low)} replicas")
+
+
+def prepare(args):
+    """Environment for a run; must happen before the tutor modules are imported"""
+    os.environ["TUTOR_DATA_DIR"] = args.data_dir or tempfile.mkdtemp(prefix="tutor-loadtest-")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-loadtest")
+    if args.cascade_model:
+        os.environ["CASCADE_MODEL_NAME"] = args.cascade_model
+    sys.path.insert(0, HERE)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", default="curriculum_generator",
+                        choices=["curriculum_generator", "quiz", "personalized_lesson_agent"])
+    parser.add_argument("--learners", type=int, default=30, help="learners, or the first classroom size when sizing")
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds over which learners arrive")
+    parser.add_argument("--lessons", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--practice-rate", type=float, default=0.3)
+    parser.add_argument("--think-time", type=float, default=2.0, help="max seconds between actions")
+    parser.add_argument("--subjects", nargs="+", default=["Physics", "Chemistry", "Newton's Laws", "Algebra"])
+    parser.add_argument("--llm-concurrency", type=int, default=32, help="fake provider concurrency limit")
+    parser.add_argument("--speed", type=float, default=1.0, help="multiplier on fake LLM latencies")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--cascade-model", help="small model to try first (sets CASCADE_MODEL_NAME)")
+    parser.add_argument("--small-invalid-rate", type=float, default=0.0,
+                        help="fraction of small-model answers that fail validation")
+    parser.add_argument("--data-dir", help="TUTOR_DATA_DIR for the run (default: fresh temp dir)")
+    parser.add_argument("--size-for", type=int, help="size replicas for this many concurrent learners")
+    parser.add_argument("--max-wait", type=float, default=2.0,
+                        help="target p95 admission wait of interactive requests when sizing, seconds")
+    parser.add_argument("--max-error-rate", type=float, default=0.0, help="target error rate when sizing")
+    args = parser.parse_args(argv)
+
+    if args.size_for:
+        size_replicas(args)
+        return
+    prepare(args)
+    result = run_classroom(args, args.learners)
+    print(f"data dir: {os.environ['TUTOR_DATA_DIR']}")
+    report(args, result)
+
+
+if __name__ == "__main__":
+    main()
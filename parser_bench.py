@@ -0,0 +1,355 @@
+"""Throughput benchmark and fuzz harness for the LLM output parsers.
+
+The apps parse lessons, quiz questions, question batches and curriculum
+lists on every rerun, so these parsers are the main CPU work the tutor does
+itself.  The corpus is synthetic output in the prompt formats (from
+fake_llm.py) plus malformed variants the models really produce: missing
+answers, the answer marked by a bold choice, extra whitespace and CRLF line
+endings, and ``**Correct Answer:`` inline instead of on its own line.
+Recorded output can be added with ``--recorded`` (lessons in the lesson
+store of ``TUTOR_DATA_DIR``) and ``--corpus DIR`` (``DIR/<kind>/*.txt``,
+the layout ``--save`` writes), where kind is lesson, quiz, quiz_batch or
+curriculum.
+
+The benchmark reports items and MB parsed per second, and per item the peak
+transient heap and the bytes and blocks kept by the result.  The fuzz
+harness mutates corpus items at random and checks that no parser raises,
+that results have the documented structure, that streaming and whole-text
+curriculum parsing agree, and that valid questions stay valid and keep
+their answer when their choices are shuffled.
+
+    python parser_bench.py
+    python parser_bench.py --recorded --corpus recorded/ --iterations 500
+    python parser_bench.py --fuzz 50000 --seed 3 --no-bench
+"""
+
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import fake_llm  # noqa: E402
+from tutor.curriculum_parser import CurriculumParser, parse_curriculum  # noqa: E402
+from tutor.lesson_sections import SECTIONS, split_lesson  # noqa: E402
+from tutor.parsers import parse_lesson_quiz, parse_question  # noqa: E402
+from tutor.question_pool import parse_question_batch  # noqa: E402
+from tutor.validation import answer_letter, choice_text, grade, shuffle_choices, validate_question  # noqa: E402
+
+KINDS = ("lesson", "quiz", "quiz_batch", "curriculum")
+TOPICS = ["Physics", "Newton's Laws", "Organic Chemistry", "Linear Algebra", "The French Revolution"]
+QUESTION_KEYS = {"question", "choices", "correct", "explanation"}
+
+
+def parse_curriculum_streamed(text, chunk=7):
+    """Curriculum titles fed to the streaming parser in small chunks, as the app does"""
+    parser = CurriculumParser()
+    titles = []
+    for i in range(0, len(text), chunk):
+        titles += parser.feed(text[i:i + chunk])
+    return titles + parser.finish()
+
+
+# Parsers per corpus kind, as (name, function of the raw text)
+PARSERS = {
+    "lesson": [("parse_lesson_quiz", parse_lesson_quiz), ("split_lesson", split_lesson)],
+    "quiz": [("parse_question", parse_question)],
+    "quiz_batch": [("parse_question_batch", lambda raw: parse_question_batch(raw, parse_question))],
+    "curriculum": [("parse_curriculum", parse_curriculum), ("CurriculumParser", parse_curriculum_streamed)],
+}
+
+
+# Malformed variants, each a function of (raw text, rng)
+
+def missing_answer(raw, rng):
+    return "\n".join(line for line in raw.split("\n") if "Answer" not in line)
+
+
+def bold_choices(raw, rng):
+    """Mark the answer by bolding its choice instead of a Correct Answer line"""
+    lines = raw.split("\n")
+    answer = next((line for line in lines if "Correct Answer:" in line), "")
+    letter = answer.replace("**", "").split(":")[-1].strip()[:1]
+    out = []
+    for line in lines:
+        if line.startswith(f"{letter}.") and letter:
+            out.append(f"**{line}**")
+        elif line is not answer:
+            out.append(line)
+    return "\n".join(out)
+
+
+def extra_whitespace(raw, rng):
+    lines = []
+    for line in raw.split("\n"):
+        lines.append(" " * rng.randrange(4) + line + " \t" * rng.randrange(2))
+        if rng.random() < 0.3:
+            lines.append("   ")
+    return ("\r\n" if rng.random() < 0.5 else "\n").join(lines)
+
+
+def inline_answer(raw, rng):
+    """Put the answer on the line before it, e.g. after the last choice or the explanation"""
+    lines = raw.split("\n")
+    for i, line in enumerate(lines):
+        if line.lstrip().startswith(("**Correct Answer:", "**Answer:**")) and i:
+            j = i - 1
+            while j and not lines[j].strip():
+                j -= 1
+            lines[j] = f"{lines[j]} {line.strip()}"
+            lines[i] = ""
+    return "\n".join(lines)
+
+
+VARIANTS = {
+    "lesson": [missing_answer, extra_whitespace, inline_answer],
+    "quiz": [missing_answer, bold_choices, extra_whitespace, inline_answer],
+    "quiz_batch": [missing_answer, extra_whitespace, inline_answer],
+    "curriculum": [extra_whitespace],
+}
+
+
+def synthetic_corpus(per_kind, rng):
+    """{kind: [raw text]} of well-formed output plus one malformed variant per item.
+
+    Also returns (kind, variant name, well-formed, malformed) for every variant.
+    """
+    corpus = {kind: [] for kind in KINDS}
+    variants = []
+    for i in range(per_kind):
+        topic = rng.choice(TOPICS)
+        inputs = {
+            "lesson": {"topic": topic, "lesson": f"{topic} part {i}"},
+            "quiz": {"topic": topic, "difficulty": "Medium", "question_number": i + 1},
+            "quiz_batch": {"topic": topic, "per_level": 1 + i % 3},
+            "curriculum": {"topic": topic, "num_lessons": 3 + i % 8},
+        }
+        for kind in KINDS:
+            raw = fake_llm.respond(inputs[kind], rng)
+            variant = rng.choice(VARIANTS[kind])
+            malformed = variant(raw, rng)
+            corpus[kind] += [raw, malformed]
+            variants.append((kind, variant.__name__, raw, malformed))
+    return corpus, variants
+
+
+def recorded_corpus(corpus_dir=None, lesson_store=False):
+    corpus = {kind: [] for kind in KINDS}
+    if lesson_store:
+        from tutor.lesson_store import get_lesson_store
+
+        store = get_lesson_store()
+        digests = {entry[-1] for entry in store.entries()}
+        corpus["lesson"] += [text for text in map(store.get, sorted(digests)) if text]
+    if corpus_dir:
+        for kind in KINDS:
+            for path in sorted(glob.glob(os.path.join(corpus_dir, kind, "*.txt"))):
+                with open(path, encoding="utf-8") as f:
+                    corpus[kind].append(f.read())
+    return corpus
+
+
+def save_corpus(corpus, corpus_dir):
+    for kind, items in corpus.items():
+        os.makedirs(os.path.join(corpus_dir, kind), exist_ok=True)
+        for i, raw in enumerate(items):
+            with open(os.path.join(corpus_dir, kind, f"{i:05d}.txt"), "w", encoding="utf-8") as f:
+                f.write(raw)
+
+
+# Benchmark
+
+def bench(fn, items, iterations):
+    """(items/s, MB/s, peak transient bytes, kept bytes, kept blocks) per item"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for raw in items:
+            fn(raw)
+    elapsed = time.perf_counter() - start
+    parsed = iterations * len(items)
+    size = iterations * sum(len(raw.encode("utf-8")) for raw in items)
+
+    peak = kept = 0
+    tracemalloc.start()
+    for raw in items:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        result = fn(raw)
+        after, high = tracemalloc.get_traced_memory()
+        peak += high - before
+        kept += after - before
+        del result
+    tracemalloc.stop()
+    blocks = sys.getallocatedblocks()
+    results = [fn(raw) for raw in items]
+    blocks = sys.getallocatedblocks() - blocks
+    del results
+    n = max(1, len(items))
+    return parsed / elapsed, size / elapsed / 1e6, peak / n, kept / n, blocks / n
+
+
+def run_bench(corpus, iterations):
+    print(f"\n{'parser':<24}{'items':>7}{'items/s':>11}{'MB/s':>8}{'peak B':>9}{'kept B':>9}{'blocks':>8}")
+    for kind, parsers in PARSERS.items():
+        items = corpus[kind]
+        if not items:
+            continue
+        for name, fn in parsers:
+            rate, mb, peak, kept, blocks = bench(fn, items, iterations)
+            print(f"{name:<24}{len(items):>7}{rate:>11,.0f}{mb:>8.1f}{peak:>9.0f}{kept:>9.0f}{blocks:>8.1f}")
+
+
+# Answer letters a response parses to, per kind that has answers
+ANSWERS = {
+    "lesson": lambda raw: [answer_letter(q) for q in parse_lesson_quiz(raw).values()],
+    "quiz": lambda raw: [answer_letter(parse_question(raw))],
+    "quiz_batch": lambda raw: [answer_letter(q) for _, q in parse_question_batch(raw, parse_question)],
+}
+
+
+def run_drift(variants):
+    """How often a malformed variant parses to different answers than its well-formed original"""
+    counts = {}
+    for kind, name, raw, malformed in variants:
+        if kind in ANSWERS:
+            total, changed = counts.get((kind, name), (0, 0))
+            counts[(kind, name)] = (total + 1, changed + (ANSWERS[kind](raw) != ANSWERS[kind](malformed)))
+    print(f"\n{'variant':<30}{'items':>7}{'answers changed':>17}")
+    for (kind, name), (total, changed) in sorted(counts.items()):
+        print(f"{kind + ' ' + name:<30}{total:>7}{changed / total:>17.0%}")
+
+
+# Fuzzing
+
+def mutate(raw, rng):
+    """One random corruption of a model response"""
+    lines = raw.split("\n")
+    op = rng.randrange(9)
+    if op == 0 and lines:
+        del lines[rng.randrange(len(lines))]
+    elif op == 1 and lines:
+        i = rng.randrange(len(lines))
+        lines.insert(rng.randrange(len(lines) + 1), lines[i])
+    elif op == 2 and len(lines) > 1:
+        i, j = rng.randrange(len(lines)), rng.randrange(len(lines))
+        lines[i], lines[j] = lines[j], lines[i]
+    elif op == 3:
+        return raw[:rng.randrange(len(raw) + 1)]
+    elif op == 4:
+        i = rng.randrange(len(raw) + 1)
+        noise = rng.choice(["**", ":**", "\n", ".", ":", "A.", "**Q", "Question:", "Difficulty:", "**Quiz:**",
+                            "**Answer:**", "**Correct Answer:", "• ", "1)", "\x00", "é", "﻿", "\r"])
+        return raw[:i] + noise + raw[i:]
+    elif op == 5 and lines:
+        i = rng.randrange(len(lines))
+        lines[i] = lines[i].upper() if rng.random() < 0.5 else lines[i].lower()
+    elif op == 6:
+        return raw.replace("\n", " ")
+    elif op == 7:
+        return rng.choice(["", " ", "\n\n", "**", "I'm not sure how to answer that."])
+    else:
+        return rng.choice([v for variants in VARIANTS.values() for v in variants])(raw, rng)
+    return "\n".join(lines)
+
+
+def question_problems(q, keys):
+    if not isinstance(q, dict) or set(q) != keys:
+        return [f"keys {sorted(q) if isinstance(q, dict) else type(q).__name__}"]
+    problems = [f"{k} is not str" for k in keys - {"choices"} if not isinstance(q[k], str)]
+    if not isinstance(q["choices"], list) or not all(isinstance(c, str) for c in q["choices"]):
+        problems.append("choices is not a list of str")
+    if problems:
+        return problems
+    # Downstream handling of every parsed item
+    if validate_question(q):
+        return []
+    shuffled = shuffle_choices(q, "fuzz")
+    if validate_question(shuffled):
+        return ["shuffled copy of a valid question is invalid"]
+    original = {choice_text(c) for c in q["choices"] if c.replace("**", "").strip().startswith(answer_letter(q))}
+    kept = {choice_text(c) for c in shuffled["choices"] if grade(shuffled, c.replace("**", "").strip()[:1])}
+    if original != kept:
+        return ["shuffling changed the correct choice"]
+    return []
+
+
+def check(name, raw, result):
+    """Structural problems with one parser result"""
+    if name == "parse_lesson_quiz":
+        if not isinstance(result, dict) or list(result) != list(range(1, len(result) + 1)):
+            return ["questions are not numbered 1..n"]
+        return [p for q in result.values() for p in question_problems(q, {"question", "choices", "answer"})]
+    if name == "parse_question":
+        return question_problems(result, QUESTION_KEYS)
+    if name == "parse_question_batch":
+        if not isinstance(result, list):
+            return ["not a list"]
+        problems = [f"bad level {level!r}" for level, _ in result if not isinstance(level, str)]
+        return problems + [p for _, q in result for p in question_problems(q, QUESTION_KEYS)]
+    if name == "split_lesson":
+        title, sections = result
+        if not isinstance(title, str) or list(sections) != list(SECTIONS):
+            return ["unexpected title or section names"]
+        return [f"{k} is not str" for k, v in sections.items() if not isinstance(v, str)]
+    if name in ("parse_curriculum", "CurriculumParser"):
+        if not all(isinstance(t, str) and t and "\n" not in t for t in result) or len(set(result)) != len(result):
+            return ["titles are not unique single-line strings"]
+        if result != parse_curriculum(raw):
+            return ["streamed titles differ from whole-text parse"]
+        return []
+    return []
+
+
+def run_fuzz(corpus, cases, rng, show=5):
+    failures = []
+    pool = [(kind, raw) for kind, items in corpus.items() for raw in items]
+    for _ in range(cases):
+        kind, raw = rng.choice(pool)
+        for _ in range(rng.randrange(1, 4)):
+            raw = mutate(raw, rng)
+        for name, fn in PARSERS[kind]:
+            try:
+                problems = check(name, raw, fn(raw))
+            except Exception as exc:
+                problems = [f"raised {type(exc).__name__}: {exc}"]
+            if problems:
+                failures.append((name, problems, raw))
+    print(f"\nfuzz: {cases} mutated inputs, {len(failures)} failures")
+    for name, problems, raw in failures[:show]:
+        print(f"\n{name}: {'; '.join(problems)}\n{raw[:400]!r}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50, help="synthetic responses per kind (plus one variant each)")
+    parser.add_argument("--recorded", action="store_true", help="add lessons from the lesson store")
+    parser.add_argument("--corpus", help="directory of recorded responses, DIR/<kind>/*.txt")
+    parser.add_argument("--save", help="write the combined corpus to this directory")
+    parser.add_argument("--iterations", type=int, default=200, help="passes over the corpus per parser")
+    parser.add_argument("--fuzz", type=int, default=5000, help="mutated inputs to try (0 skips fuzzing)")
+    parser.add_argument("--no-bench", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    corpus, variants = synthetic_corpus(args.items, rng)
+    for kind, items in recorded_corpus(args.corpus, args.recorded).items():
+        corpus[kind] += items
+    print("corpus: " + ", ".join(f"{len(items)} {kind}" for kind, items in corpus.items()))
+    if args.save:
+        save_corpus(corpus, args.save)
+    if not args.no_bench:
+        run_bench(corpus, args.iterations)
+    run_drift(variants)
+    if args.fuzz and run_fuzz(corpus, args.fuzz, rng):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,214 +1,47 @@
 # run with streamlit run personalized_lesson_agent.py
-# python -m pip install streamlit langchain openai python-dotenv
+# python -m pip install streamlit langchain openai python-dotenv numpy
 
-import os
 import streamlit as st
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from dotenv import load_dotenv
-
-# Set OpenAI API Key
-load_dotenv(dotenv_path="../.env", override=True)
-
-# Initialize LLM
-llm = ChatOpenAI(temperature=0.7)
-
-# Prompt for lessons
-lesson_prompt = PromptTemplate(
-    input_variables=["topic", "level", "mistakes"],
-    template="""
-You are a helpful and engaging AI tutor.
-
-Create a comprehensive personalized lesson based on the following:
-- Topic: {topic}
-- Level: {level}
-- Common Mistakes: {mistakes}
-
-The lesson should include:
-1. A clear explanation of the topic with key concepts
-2. Two illustrative examples (one basic, one advanced)
-3. A short 3-question quiz with multiple choice answers based on the given explanation and examples
-
-Format your response EXACTLY like this:
-
-**Title:** [Lesson Title]
-
-**Explanation:**
-[Detailed explanation of the topic, highlighting key concepts and addressing common mistakes]
-
-**Example 1: Basic**
-[Simple, easy-to-understand example]
-
-**Example 2: Advanced**
-[More complex example that builds on the basic one]
-
-**Quiz:**
-
-**Q1:** [Question 1]
-A. [Option A]
-B. [Option B]
-C. [Option C]
-D. [Option D]
-**Answer:** [Correct letter]
-
-**Q2:** [Question 2]
-A. [Option A]
-B. [Option B]
-C. [Option C]
-D. [Option D]
-**Answer:** [Correct letter]
-
-**Q3:** [Question 3]
-A. [Option A]
-B. [Option B]
-C. [Option C]
-D. [Option D]
-**Answer:** [Correct letter]
-"""
-)
-
-# Prompt Template for adaptive quiz
-quiz_prompt = PromptTemplate(
-    input_variables=["topic", "difficulty", "question_number"],
-    template="""
-You are a helpful AI tutor. Write one UNIQUE question about "{topic}" at a "{difficulty}" difficulty level.
-This is question #{question_number} - make sure it's different from previous questions.
-
-For EASY level: Basic definitions, simple concepts, straightforward applications
-For MEDIUM level: More complex relationships, multi-step thinking, analysis
-For HARD level: Advanced concepts, synthesis, critical thinking, complex scenarios
-
-Use this EXACT format:
-
-Question: <actual question here>
-
-A. <option>
-B. <option>
-C. <option>
-D. <option>
-
-**Correct Answer: X** (where X is the letter A, B, C, or D of the correct choice)
-
-Explanation: <one sentence explaining why this answer is correct>
-
-IMPORTANT: 
-- Vary which letter (A, B, C, or D) is correct
-- Make the question unique and appropriate for the {difficulty} level
-- Ensure only one answer is clearly correct
-"""
-)
-
-# Create chains
-lesson_chain = LLMChain(llm=llm, prompt=lesson_prompt)
-quiz_chain = LLMChain(llm=llm, prompt=quiz_prompt)
-difficulty_levels = ["easy", "medium", "hard"]
+from tutor import adaptive
+from tutor.admission import wait_in_line
+from tutor.ability import DIFFICULTY_LEVELS
+from tutor.engine import get_engine
+from tutor.event_log import log_response, new_session_id
+from tutor.lesson_sections import SECTION_LABELS
+from tutor.lesson_store import profile_hash
+from tutor.metrics import track_session
+from tutor.profiling import checkpoint, render_panel, start_rerun
+from tutor.session import init_state, reset_state
+from tutor.session_cache import SessionCache, render_usage
+from tutor.validation import answer_letter, grade, shuffled_quiz
+
+engine = get_engine("personalized_lesson_agent")
+lesson_store = engine.lesson_store
+difficulty_levels = DIFFICULTY_LEVELS
 
 st.set_page_config(page_title="AI Training Agent")
 st.title("Training Agent")
+start_rerun("personalized_lesson_agent")
 
 # Initialize session state
-if "mode" not in st.session_state:
-    st.session_state.mode = "input"  # input, lesson, quiz, adaptive_quiz
-if "topic" not in st.session_state:
-    st.session_state.topic = ""
-if "level" not in st.session_state:
-    st.session_state.level = "beginner"
-if "mistakes" not in st.session_state:
-    st.session_state.mistakes = ""
-if "lesson_content" not in st.session_state:
-    st.session_state.lesson_content = ""
-if "lesson_quiz_answers" not in st.session_state:
-    st.session_state.lesson_quiz_answers = {}
-if "lesson_quiz_submitted" not in st.session_state:
-    st.session_state.lesson_quiz_submitted = False
-
-# Adaptive quiz session states
-if "difficulty" not in st.session_state:
-    st.session_state.difficulty = "medium"
-if "question_data" not in st.session_state:
-    st.session_state.question_data = {}
-if "question_number" not in st.session_state:
-    st.session_state.question_number = 1
-if "total_questions" not in st.session_state:
-    st.session_state.total_questions = 1
-if "score" not in st.session_state:
-    st.session_state.score = 0
-if "selected" not in st.session_state:
-    st.session_state.selected = None
-if "submitted" not in st.session_state:
-    st.session_state.submitted = False
-if "quiz_finished" not in st.session_state:
-    st.session_state.quiz_finished = False
-if "pending_next" not in st.session_state:
-    st.session_state.pending_next = False
-if "question_generated" not in st.session_state:
-    st.session_state.question_generated = False
-
-def parse_lesson_quiz(lesson_content):
-    """Parse the quiz section from lesson content"""
-    lines = lesson_content.split('\n')
-    quiz_started = False
-    current_question = None
-    questions = {}
-    
-    for line in lines:
-        line = line.strip()
-        if line.startswith("**Quiz:**"):
-            quiz_started = True
-            continue
-        
-        if quiz_started:
-            if line.startswith("**Q") and ":**" in line:
-                # Extract question number and text
-                q_part = line.split(":**", 1)
-                if len(q_part) == 2:
-                    q_num = q_part[0].replace("**Q", "").strip()
-                    q_text = q_part[1].strip()
-                    current_question = q_num
-                    questions[current_question] = {
-                        "question": q_text,
-                        "choices": [],
-                        "answer": ""
-                    }
-            elif line.startswith(("A.", "B.", "C.", "D.")) and current_question:
-                questions[current_question]["choices"].append(line)
-            elif line.startswith("**Answer:**") and current_question:
-                answer = line.replace("**Answer:**", "").strip()
-                questions[current_question]["answer"] = answer
-    
-    return questions
-
-def parse_adaptive_question(raw):
-    """Parse adaptive quiz question"""
-    lines = [line.strip() for line in raw.strip().split("\n") if line.strip()]
-    question = ""
-    choices = []
-    explanation = ""
-    correct_choice = ""
-
-    for line in lines:
-        if line.startswith("Question:"):
-            question = line.replace("Question:", "").strip()
-        elif line.startswith(("A.", "B.", "C.", "D.")):
-            choices.append(line.strip())
-        elif line.startswith("**Correct Answer:") and line.endswith("**"):
-            correct_choice = line.replace("**Correct Answer:", "").replace("**", "").strip()
-        elif line.startswith("Explanation:"):
-            explanation = line.replace("Explanation:", "").strip()
-
-    if not correct_choice:
-        for line in lines:
-            if line.startswith(("A.", "B.", "C.", "D.")) and "**" in line:
-                correct_choice = line.replace("**", "").strip().split(".")[0].strip()
-                break
-    
-    return {
-        "question": question,
-        "choices": choices,
-        "correct": correct_choice,
-        "explanation": explanation
-    }
+init_state({
+    "session_id": new_session_id,
+    "mode": "input",  # input, lesson, quiz, adaptive_quiz
+    "topic": "",
+    "level": "beginner",
+    "mistakes": "",
+    "lesson_digest": "",  # key into the lesson store
+    "regenerate_lesson": False,
+    # text:<digest> and quiz:<digest> entries, bounded in memory
+    "lesson_cache": lambda: SessionCache(st.session_state.session_id),
+    "lesson_quiz_answers": {},
+    "lesson_quiz_submitted": False,
+    # Adaptive quiz session states
+    **adaptive.ADAPTIVE_STATE,
+})
+
+track_session("personalized_lesson_agent")
+checkpoint("state_init")
 
 # MODE 1: INPUT FORM
 if st.session_state.mode == "input":
@@ -233,21 +66,48 @@ if st.session_state.mode == "input":
 
 # MODE 2: DISPLAY LESSON
 elif st.session_state.mode == "lesson":
-    if not st.session_state.lesson_content:
-        with st.spinner("Creating your personalized lesson..."):
-            lesson_content = lesson_chain.run({
-                "topic": st.session_state.topic,
-                "level": st.session_state.level,
-                "mistakes": st.session_state.mistakes
-            })
-            st.session_state.lesson_content = lesson_content
+    lesson_inputs = {
+        "topic": st.session_state.topic,
+        "level": st.session_state.level,
+        "mistakes": st.session_state.mistakes
+    }
+    if not st.session_state.lesson_digest:
+        # Reuse an identical earlier request unless the learner asked for a new version
+        lesson_key = (st.session_state.topic, st.session_state.topic, st.session_state.level,
+                      profile_hash(st.session_state.mistakes))
+        st.session_state.lesson_digest = wait_in_line(
+            "Creating your personalized lesson...",
+            engine.topic_lesson, lesson_inputs, None if st.session_state.regenerate_lesson else lesson_key
+        )
+        st.session_state.regenerate_lesson = False
+    lesson_digest = st.session_state.lesson_digest
+    cache = st.session_state.lesson_cache
+    # Earlier (regenerated) lessons may be spilled to disk
+    cache.pin(f"text:{lesson_digest}", f"quiz:{lesson_digest}")
+    lesson_content = cache.get(f"text:{lesson_digest}", lambda: lesson_store.get(lesson_digest))
     
     # Display lesson content
-    lesson_words = st.session_state.lesson_content.split("**Quiz:")[0]
+    lesson_words = lesson_content.split("**Quiz:")[0]
     st.markdown(lesson_words)
+    checkpoint("lesson_markdown")
+
+    # Regenerate one part of the lesson and keep the rest
+    with st.expander("Refresh part of this lesson"):
+        for col, (section, label) in zip(st.columns(len(SECTION_LABELS)), SECTION_LABELS.items()):
+            if col.button(f"New {label.lower()}", key=f"refresh_{section}"):
+                st.session_state.lesson_digest = wait_in_line(
+                    f"Writing a new {label.lower()}...", engine.refresh_section, lesson_digest, section, lesson_inputs
+                )
+                st.session_state.lesson_quiz_submitted = False
+                st.session_state.lesson_quiz_answers = {}
+                st.rerun()
     
-    # Parse and display quiz
-    lesson_quiz = parse_lesson_quiz(st.session_state.lesson_content)
+    # Parse, validate and display quiz
+    if f"quiz:{lesson_digest}" not in cache:
+        cache.set(f"quiz:{lesson_digest}", engine.lesson_quiz(
+            lesson_content, st.session_state.topic, st.session_state.level, seed=lesson_digest
+        ))
+    lesson_quiz = shuffled_quiz(cache.get(f"quiz:{lesson_digest}"), st.session_state.session_id)
     
     if lesson_quiz and not st.session_state.lesson_quiz_submitted:
         st.markdown("---")
@@ -275,6 +135,13 @@ elif st.session_state.mode == "lesson":
             quiz_submitted = st.form_submit_button("Submit Quiz")
             
             if quiz_submitted:
+                for q_num, q_data in lesson_quiz.items():
+                    log_response(
+                        st.session_state.session_id, "personalized_lesson_agent", st.session_state.topic,
+                        q_data['question'], answers.get(q_num), answer_letter(q_data),
+                        grade(q_data, answers.get(q_num)),
+                        difficulty=st.session_state.level, lesson=st.session_state.topic
+                    )
                 st.session_state.lesson_quiz_answers = answers
                 st.session_state.lesson_quiz_submitted = True
                 st.rerun()
@@ -291,7 +158,7 @@ elif st.session_state.mode == "lesson":
             st.markdown(f"**Question {q_num}:** {q_data['question']}")
             user_answer = st.session_state.lesson_quiz_answers.get(q_num, "")
             correct_answer = q_data['answer']
-            is_correct = user_answer == correct_answer[0]
+            is_correct = grade(q_data, user_answer)
             
             if is_correct:
                 correct_count += 1
@@ -315,17 +182,20 @@ elif st.session_state.mode == "lesson":
     
     with col1:
         if st.button("🏠 New Topic"):
-            # Reset everything
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            reset_state()
             st.rerun()
     
     with col2:
         if st.button("🔄 Regenerate Lesson"):
-            st.session_state.lesson_content = ""
-            st.session_state.lesson_quiz_submitted = False
-            st.session_state.lesson_quiz_answers = {}
-            st.rerun()
+            if engine.admission.overloaded():
+                # Optional work: keep the lesson rather than join a long line
+                st.warning("The tutor is very busy right now, so the lesson was kept as it is. Please try again in a minute.")
+            else:
+                st.session_state.lesson_digest = ""
+                st.session_state.regenerate_lesson = True
+                st.session_state.lesson_quiz_submitted = False
+                st.session_state.lesson_quiz_answers = {}
+                st.rerun()
     
     with col3:
         if st.button("💪 Extra Practice Questions"):
@@ -356,9 +226,7 @@ elif st.session_state.mode == "adaptive_quiz" and st.session_state.total_questio
         start_practice = st.form_submit_button("Start Practice! 🎯")
         
         if start_practice:
-            st.session_state.total_questions = num_questions
-            st.session_state.difficulty = starting_difficulty
-            st.session_state.question_number = 1
+            adaptive.start_quiz(engine, num_questions, starting_difficulty)
             st.rerun()
     
     if st.button("← Back to Lesson"):
@@ -367,19 +235,7 @@ elif st.session_state.mode == "adaptive_quiz" and st.session_state.total_questio
 
 # MODE 4: ADAPTIVE QUIZ QUESTIONS
 elif st.session_state.mode == "adaptive_quiz" and not st.session_state.quiz_finished:
-    # Generate question if needed
-    if not st.session_state.question_generated:
-        with st.spinner("Generating practice question..."):
-            result = quiz_chain.run({
-                "topic": st.session_state.topic,
-                "difficulty": st.session_state.difficulty,
-                "question_number": st.session_state.question_number
-            })
-            st.session_state.question_data = parse_adaptive_question(result)
-            st.session_state.selected = None
-            st.session_state.submitted = False
-            st.session_state.pending_next = False
-            st.session_state.question_generated = True
+    adaptive.ensure_question(engine, "Generating practice question...")
     
     # Display question
     if st.session_state.question_data:
@@ -393,71 +249,10 @@ elif st.session_state.mode == "adaptive_quiz" and not st.session_state.quiz_fini
         st.markdown(f"### {q['question']}")
         st.info(f"Current difficulty: {st.session_state.difficulty.title()}")
         
-        # Create options for radio buttons
-        options = [c.split(".")[0].strip() for c in q["choices"]]
-        choice_map = {c.split(".")[0].strip(): c for c in q["choices"]}
-
-        # Show radio buttons if not submitted
-        if not st.session_state.submitted:
-            selected = st.radio(
-                "Choose your answer:",
-                options=options,
-                format_func=lambda x: choice_map[x],
-                index=None,
-                key=f"radio_q{st.session_state.question_number}"
-            )
-
-            if st.button("Submit Answer", key=f"submit_{st.session_state.question_number}"):
-                if selected:
-                    st.session_state.selected = selected
-                    st.session_state.submitted = True
-                    st.session_state.pending_next = True
-                    st.rerun()
-                else:
-                    st.warning("Please select an answer before submitting.")
-        
-        # Process and show results
-        if st.session_state.submitted and "result_processed" not in st.session_state:
-            is_correct = st.session_state.selected == q["correct"]
-            
-            if is_correct:
-                st.session_state.score += 1
-                # Increase difficulty
-                idx = difficulty_levels.index(st.session_state.difficulty)
-                if idx < len(difficulty_levels) - 1:
-                    st.session_state.difficulty = difficulty_levels[idx + 1]
-            else:
-                # Decrease difficulty
-                idx = difficulty_levels.index(st.session_state.difficulty)
-                if idx > 0:
-                    st.session_state.difficulty = difficulty_levels[idx - 1]
-            
-            st.session_state.result_processed = True
-        
-        # Display results
+        adaptive.answer_picker(q)
+        adaptive.record_answer(engine, "personalized_lesson_agent", q)
         if st.session_state.submitted:
-            st.markdown("**Answer choices:**")
-            for choice in q["choices"]:
-                choice_letter = choice.split(".")[0].strip()
-                if choice_letter == q["correct"]:
-                    st.markdown(f"✅ **{choice}** ← Correct Answer")
-                elif choice_letter == st.session_state.selected:
-                    st.markdown(f"❌ {choice} ← Your Answer")
-                else:
-                    st.markdown(f"   {choice}")
-            
-            # Show result message
-            if st.session_state.selected == q["correct"]:
-                st.success("✅ Correct! Great job!")
-                if hasattr(st.session_state, 'result_processed'):
-                    st.info(f"Difficulty increased to: {st.session_state.difficulty.title()}")
-            else:
-                st.error(f"❌ Incorrect. The correct answer was {q['correct']}.")
-                if hasattr(st.session_state, 'result_processed'):
-                    st.info(f"Difficulty decreased to: {st.session_state.difficulty.title()}")
-
-            st.info(f"💡 **Explanation:** {q['explanation']}")
-            st.markdown(f"**Current Score:** {st.session_state.score} / {st.session_state.question_number}")
+            adaptive.show_review(engine, q)
 
         # Navigation
         if st.session_state.submitted and st.session_state.pending_next:
@@ -473,15 +268,12 @@ elif st.session_state.mode == "adaptive_quiz" and not st.session_state.quiz_fini
                         st.session_state.mode = "lesson"
                         st.rerun()
             else:
+                # Stop early once the ability estimate is precise enough
+                if adaptive.finish_early_offer(engine):
+                    st.rerun()
                 with col1:
                     if st.button("Next Question →", key=f"next_{st.session_state.question_number}"):
-                        st.session_state.question_number += 1
-                        st.session_state.question_data = {}
-                        st.session_state.submitted = False
-                        st.session_state.pending_next = False
-                        st.session_state.question_generated = False
-                        if "result_processed" in st.session_state:
-                            del st.session_state.result_processed
+                        adaptive.next_question()
                         st.rerun()
                 with col2:
                     if st.button("← Back to Lesson"):
@@ -528,7 +320,10 @@ elif st.session_state.mode == "adaptive_quiz" and st.session_state.quiz_finished
     
     with col3:
         if st.button("🏠 New Topic"):
-            # Reset everything
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
-            st.rerun()
\ No newline at end of file
+            reset_state()
+            st.rerun()
+
+render_usage(st.session_state.lesson_cache)
+
+# Developer profiling panel (opt-in)
+render_panel()
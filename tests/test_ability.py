@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from tutor.ability import (
+    DEFAULT_ITEM_PARAMS, AbilityModel, EloModel, IRTModel, calibrate_item_params, load_item_params, save_item_params,
+)
+
+
+@pytest.fixture(params=[IRTModel, EloModel])
+def model(request):
+    return request.param(DEFAULT_ITEM_PARAMS)
+
+
+def test_base_model_is_abstract():
+    with pytest.raises(TypeError):
+        AbilityModel(DEFAULT_ITEM_PARAMS)
+
+
+def test_no_responses_is_the_prior(model):
+    assert model.estimate([]) == (0.0, 1.0)
+
+
+def test_answers_move_the_estimate(model):
+    right, _ = model.estimate([("medium", True), ("hard", True)])
+    wrong, _ = model.estimate([("medium", False), ("easy", False)])
+    assert wrong < 0.0 < right
+
+
+def test_more_answers_shrink_the_standard_error(model):
+    _, few = model.estimate([("medium", True), ("medium", False)])
+    _, many = model.estimate([("medium", True), ("medium", False)] * 5)
+    assert many < few
+
+
+def test_irt_estimate_matches_a_direct_posterior_mean():
+    responses = [("easy", True), ("medium", True), ("hard", False)]
+    theta, _ = IRTModel(DEFAULT_ITEM_PARAMS).estimate(responses)
+    grid = np.linspace(-4.0, 4.0, 161)
+    posterior = np.exp(-0.5 * grid ** 2)
+    for level, correct in responses:
+        p = 1.0 / (1.0 + np.exp(-(grid - DEFAULT_ITEM_PARAMS[level]["b"])))
+        posterior *= p if correct else 1.0 - p
+    assert theta == pytest.approx((grid * posterior).sum() / posterior.sum())
+
+
+def test_elo_update_is_k_times_surprise():
+    elo = EloModel(DEFAULT_ITEM_PARAMS, k=0.4)
+    theta, _ = elo.estimate([("medium", True)])
+    assert theta == pytest.approx(0.4 * 0.5)
+
+
+def test_item_selection_and_placement_follow_theta(model):
+    assert model.next_difficulty(-1.0) == "easy"
+    assert model.next_difficulty(0.0) == "medium"
+    assert model.next_difficulty(1.2) == "hard"
+    assert model.placement(-0.8) == "easy"
+    assert model.placement(0.9) == "hard"
+
+
+def test_calibration_orders_difficulties():
+    rng = np.random.default_rng(0)
+    true_b = {"easy": -1.5, "medium": 0.2, "hard": 1.8}
+    learners, items, correct = [], [], []
+    for learner, theta in enumerate(rng.normal(size=300)):
+        for level, b in true_b.items():
+            for _ in range(4):
+                learners.append(learner)
+                items.append(level)
+                correct.append(rng.random() < 1.0 / (1.0 + np.exp(-(theta - b))))
+    params = calibrate_item_params(learners, items, correct)
+    assert params["easy"]["b"] < params["medium"]["b"] < params["hard"]["b"]
+
+
+def test_item_params_round_trip(tmp_path):
+    path = str(tmp_path / "data" / "item_params.json")
+    assert load_item_params(path) == DEFAULT_ITEM_PARAMS
+    save_item_params({"hard": {"a": 1.3, "b": 1.4}}, path)
+    assert load_item_params(path)["hard"] == {"a": 1.3, "b": 1.4}
+    assert load_item_params(path)["easy"] == DEFAULT_ITEM_PARAMS["easy"]
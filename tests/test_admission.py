@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+
+from tutor.admission import AdmissionController, Overloaded
+from tutor.background import HIGH, LOW, NORMAL, PriorityExecutor, collect
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_collected_job_waits_at_high_priority():
+    admission = AdmissionController(max_in_flight=1)
+    executor = PriorityExecutor(max_workers=2)
+    release, order = threading.Event(), []
+
+    def request(name):
+        with admission.slot():
+            order.append(name)
+
+    with admission.slot():
+        prefetch = executor.submit(request, "prefetch", priority=LOW)
+        wait_for(lambda: admission.stats()["waiting"] == 1)
+        executor.submit(request, "top-up", priority=NORMAL)
+        wait_for(lambda: admission.stats()["waiting"] == 2)
+        threading.Thread(target=lambda: (collect(prefetch), release.set())).start()
+        wait_for(lambda: prefetch.priority == HIGH)
+    release.wait(2)
+    wait_for(lambda: len(order) == 2)
+
+    assert order == ["prefetch", "top-up"]
+
+
+def test_background_work_is_shed_when_the_line_is_full():
+    admission = AdmissionController(max_in_flight=1, shed_depth=1)
+    executor = PriorityExecutor(max_workers=2)
+
+    def request():
+        with admission.slot():
+            return "done"
+
+    with admission.slot():
+        executor.submit(request, priority=HIGH)
+        wait_for(lambda: admission.stats()["waiting"] == 1)
+        with pytest.raises(Overloaded):
+            executor.submit(request, priority=NORMAL).result(2)
+
+
+def test_try_acquire_only_takes_a_spare_slot():
+    admission = AdmissionController(max_in_flight=1)
+
+    assert admission.try_acquire()
+    assert not admission.try_acquire()
+    admission.release()
+    assert admission.stats()["in_flight"] == 0
@@ -0,0 +1,50 @@
+import pytest
+
+from tutor.curriculum_library import CurriculumLibrary, normalize_topic
+
+LESSONS = ["Lesson one", "Lesson two", "Lesson three"]
+
+
+@pytest.fixture
+def library(tmp_path):
+    return CurriculumLibrary(str(tmp_path / "curricula.sqlite3"))
+
+
+def approved(library, topic):
+    library.approve(library.add(topic, "Understands a Little", 3, LESSONS))
+    return library
+
+
+def find(library, topic):
+    return library.find(topic, "Understands a Little", 3)
+
+
+@pytest.mark.parametrize("stored, requested", [
+    ("World War I", "World War II"),
+    ("Calculus I", "Calculus II"),
+    ("Organic", "Inorganic Chemistry"),
+    ("Physics 1", "Physics 2"),
+    ("Python 2", "Python 3"),
+    ("C++", "C#"),
+    ("Physics", "Physics 2"),
+])
+def test_similar_but_different_subjects_do_not_match(library, stored, requested):
+    approved(library, stored)
+    assert find(library, requested) is None
+
+
+@pytest.mark.parametrize("requested", ["Newton's Laws", "newtons laws", "Newtons law", "Newton's Laws!"])
+def test_spelling_variants_match(library, requested):
+    approved(library, "Newton's Laws")
+    assert find(library, requested) is not None
+
+
+def test_symbols_and_numerals_stay_in_the_key():
+    assert normalize_topic("C++") != normalize_topic("C#")
+    assert normalize_topic("Calculus II") == "calculus ii"
+    assert normalize_topic("Newton’s  Laws") == "newtons laws"
+
+
+def test_unapproved_curricula_are_not_served(library):
+    library.add("Optics", "Understands a Little", 3, LESSONS)
+    assert find(library, "Optics") is None
@@ -0,0 +1,51 @@
+import pytest
+
+from tutor.curriculum_parser import CurriculumParser, parse_curriculum, parse_item
+
+TITLES = ["Forces and Motion", "Newton's Laws", "Energy and Work"]
+
+RESPONSES = {
+    "dot numbering": "1. Forces and Motion\n2. Newton's Laws\n3. Energy and Work",
+    "paren numbering": "1) Forces and Motion\n2) Newton's Laws\n3) Energy and Work",
+    "bullets": "- Forces and Motion\n* Newton's Laws\n• Energy and Work",
+    "bold": "1. **Forces and Motion**\n2. **Newton's Laws**\n3. __Energy and Work__",
+    "lesson prefixes": "1. Lesson 1: Forces and Motion\n2. Lesson 2 - Newton's Laws\n3. **Lesson 3: Energy and Work**",
+    "quoted": '1. "Forces and Motion"\n2. "Newton\'s Laws"\n3. "Energy and Work"',
+    "preamble": (
+        "Here is a curriculum for you:\n\n"
+        "1. Forces and Motion\n2. Newton's Laws\n3. Energy and Work\n\n"
+        "Good luck with your studies!"
+    ),
+    "crlf and padding": "  1.  Forces and Motion  \r\n  2. Newton's Laws\r\n3. Energy and Work\r\n",
+    "duplicates": "1. Forces and Motion\n2. Newton's Laws\n3. Newton's Laws\n4. Energy and Work",
+}
+
+
+@pytest.mark.parametrize("text", RESPONSES.values(), ids=RESPONSES.keys())
+def test_malformed_lists_parse_to_titles(text):
+    assert parse_curriculum(text) == TITLES
+
+
+@pytest.mark.parametrize("line", ["Here is a curriculum:", "", "**Curriculum**", "1.", "Lesson 1: Forces"])
+def test_non_items_are_ignored(line):
+    assert parse_item(line) is None
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_chunked_stream_matches_whole_response(size):
+    text = RESPONSES["preamble"]
+    parser = CurriculumParser()
+    emitted = []
+    for i in range(0, len(text), size):
+        emitted += parser.feed(text[i:i + size])
+    emitted += parser.finish()
+
+    assert emitted == parser.titles == TITLES
+
+
+def test_titles_are_emitted_as_soon_as_their_line_ends():
+    parser = CurriculumParser()
+
+    assert parser.feed("1. Forces and Mo") == []
+    assert parser.feed("tion\n2. Newton") == ["Forces and Motion"]
+    assert parser.finish() == ["Newton"]
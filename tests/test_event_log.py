@@ -0,0 +1,15 @@
+import json
+import time
+
+from tutor.event_log import ResponseLog
+
+
+def test_close_writes_the_batch_the_writer_holds(tmp_path):
+    log = ResponseLog(str(tmp_path), flush_interval=30)
+    for i in range(5):
+        log.append({"ts": time.time(), "i": i})
+    time.sleep(0.2)  # the writer has taken the events and is waiting for more
+    log.close()
+
+    events = [json.loads(line) for path in tmp_path.glob("*.jsonl") for line in path.read_text().splitlines()]
+    assert sorted(e["i"] for e in events) == list(range(5))
@@ -0,0 +1,29 @@
+import pytest
+
+from tutor import lesson_pack
+from tutor.lesson_pack import markdown_to_html
+
+PAYLOAD = 'Forces <script>alert("pwned")</script> act\n\n<img src=x onerror=alert(1)>\n\n[more](javascript:alert(1))'
+
+
+@pytest.fixture(params=["markdown", "fallback"])
+def renderer(request, monkeypatch):
+    if request.param == "markdown":
+        pytest.importorskip("markdown")
+    else:
+        monkeypatch.setattr(lesson_pack, "markdown", None)
+
+
+def test_raw_html_in_lessons_is_escaped(renderer):
+    rendered = markdown_to_html(PAYLOAD)
+
+    assert "<script" not in rendered and "<img" not in rendered
+    assert "&lt;script&gt;" in rendered
+    assert 'href="javascript' not in rendered
+
+
+def test_lesson_markdown_still_renders(renderer):
+    rendered = markdown_to_html("## Newton's laws\n\nA **force** changes motion.\n\n- inertia\n- momentum")
+
+    assert "<strong>force</strong>" in rendered
+    assert "<li>inertia</li>" in rendered
@@ -0,0 +1,31 @@
+from tutor.metrics import Registry
+
+
+def test_session_state_size_is_an_unlabelled_histogram():
+    registry = Registry()
+    registry.session("session-1", "quiz", 25_000)
+    registry.session("session-2", "quiz", 2_000_000)
+    registry.session("session-1", "quiz", 40_000)
+    lines = registry.render().splitlines()
+
+    assert 'tutor_sessions{app="quiz"} 2' in lines
+    assert "# TYPE tutor_session_state_bytes histogram" in lines
+    assert 'tutor_session_state_bytes_bucket{le="30000"} 1' in lines
+    assert 'tutor_session_state_bytes_bucket{le="+Inf"} 3' in lines
+    assert not [line for line in lines if "session-" in line]
+
+
+
+def test_cascade_outcomes_are_counted(monkeypatch):
+    from tutor import cascade
+    from tutor.cascade import CascadeStats
+
+    registry = Registry()
+    monkeypatch.setattr(cascade, "inc", registry.inc)
+    stats = CascadeStats()
+    stats.record("quiz", "accepted")
+    stats.record("quiz_batch", "invalid", 3)
+    lines = registry.render().splitlines()
+
+    assert 'tutor_cascade_accepted_total{prompt_type="quiz"} 1' in lines
+    assert 'tutor_cascade_escalated_total{prompt_type="quiz_batch",reason="invalid"} 3' in lines
@@ -0,0 +1,25 @@
+import pytest
+
+from tutor.profiling import Profiler
+
+
+class EchoChain:
+    prompt = None
+
+    def run(self, inputs):
+        return inputs["topic"]
+
+
+def test_profiled_lesson_records_llm_spans_from_wait_in_line():
+    pytest.importorskip("streamlit")
+    pytest.importorskip("langchain")
+    from tutor.admission import wait_in_line
+    from tutor.latency import HedgedChain
+
+    profiler = Profiler("test")
+    profiler.begin()
+    result = wait_in_line("Generating lesson...", HedgedChain(EchoChain(), "lesson").run, {"topic": "Optics"})
+    profiler.end()
+
+    assert result == "Optics"
+    assert "llm:lesson" in [name for name, *_ in profiler.reruns[-1].spans]
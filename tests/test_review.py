@@ -0,0 +1,88 @@
+import pytest
+
+from tutor.review import MIN_EASINESS, RELEARN_DELAY, REVIEW_INTERVAL_UNIT, ReviewQueue
+
+DAY = REVIEW_INTERVAL_UNIT
+
+
+def test_nothing_is_due_before_its_interval():
+    reviews = ReviewQueue()
+    reviews.record("q1", True, now=0)
+    assert reviews.due(5, now=DAY - 1) == []
+    assert reviews.due(5, now=DAY) == ["q1"]
+
+
+def test_correct_answers_follow_sm2_intervals():
+    reviews = ReviewQueue()
+    now = 0
+    intervals = []
+    for _ in range(4):
+        reviews.record("q1", True, now=now)
+        repetitions, easiness, interval, due, _ = reviews.cards["q1"]
+        intervals.append(interval)
+        assert due == now + interval * DAY
+        now = due
+    assert intervals == [1, 6, 15, 38]
+    assert easiness == pytest.approx(2.5)
+
+
+def test_missed_items_come_back_soon_and_first():
+    reviews = ReviewQueue()
+    reviews.record("known", True, now=0)
+    reviews.record("missed", False, now=DAY - RELEARN_DELAY)
+    assert reviews.due(5, now=DAY - 1) == []
+    assert reviews.due(5, now=DAY) == ["missed", "known"]
+    assert reviews.due(1, now=DAY) == ["missed"]
+
+
+def test_a_lapse_resets_repetitions_and_lowers_easiness():
+    reviews = ReviewQueue()
+    for now in (0, DAY, 7 * DAY):
+        reviews.record("q1", True, now=now)
+    reviews.record("q1", False, now=30 * DAY)
+    repetitions, easiness, interval, due, missed = reviews.cards["q1"]
+    assert (repetitions, interval, due, missed) == (0, 1, 30 * DAY + RELEARN_DELAY, True)
+    assert easiness == pytest.approx(2.5 - 0.54)
+    for _ in range(10):
+        reviews.record("q1", False, now=30 * DAY)
+    assert reviews.cards["q1"][1] == MIN_EASINESS
+
+
+def test_due_items_stay_scheduled_until_answered():
+    reviews = ReviewQueue()
+    reviews.record("q1", False, now=0)
+    assert reviews.due(5, now=RELEARN_DELAY) == ["q1"]
+    assert reviews.due(5, now=RELEARN_DELAY) == ["q1"]
+    reviews.record("q1", True, now=RELEARN_DELAY)
+    # The superseded entry must not resurface
+    assert reviews.due(5, now=RELEARN_DELAY + 1) == []
+    assert reviews.due(5, now=RELEARN_DELAY + DAY) == ["q1"]
+
+
+def test_due_items_come_in_due_order_and_heaps_stay_compact():
+    reviews = ReviewQueue()
+    for i in range(1000):
+        reviews.record(i, True, now=i)
+    for _ in range(5):
+        for i in range(1000):
+            reviews.record(i, i % 2 == 0, now=0)
+    assert len(reviews) == 1000
+    assert len(reviews._missed) + len(reviews._review) <= 2 * len(reviews) + 16
+    assert reviews.due(3, now=RELEARN_DELAY) == [1, 3, 5]
+
+
+def test_schedule_is_saved_per_learner(tmp_path, monkeypatch):
+    from tutor import review
+    from tutor.review import ReviewStore
+
+    store = ReviewStore(str(tmp_path / "reviews.sqlite3"))
+    monkeypatch.setattr(review, "get_review_store", lambda: store)
+    reviews = ReviewQueue("learner-1")
+    reviews.record(1, True, now=0)
+    reviews.record(2, False, now=0)
+    reviews.record(2, True, now=RELEARN_DELAY)
+
+    restored = ReviewQueue("learner-1")
+    assert restored.cards == reviews.cards
+    assert restored.due(5, now=DAY + RELEARN_DELAY) == reviews.due(5, now=DAY + RELEARN_DELAY) == [1, 2]
+    assert len(ReviewQueue("learner-2")) == 0
@@ -0,0 +1,92 @@
+import pytest
+
+from tutor.validation import answer_letter, choice_text, grade, shuffle_choices, validate_question
+
+
+def make_question(**fields):
+    q = {
+        "question": "Which force keeps the Moon in orbit?",
+        "choices": ["A. Friction", "B. Gravity", "C. Magnetism", "D. Buoyancy"],
+        "correct": "B",
+        "explanation": "Option B is right: gravity pulls the Moon toward the Earth.",
+    }
+    q.update(fields)
+    return q
+
+
+def correct_text(q):
+    return next(choice_text(c) for c in q["choices"] if c.startswith(answer_letter(q)))
+
+
+def test_shuffle_keeps_the_correct_choice():
+    q = make_question()
+    for seed in range(20):
+        shuffled = shuffle_choices(q, seed)
+        assert not validate_question(shuffled)
+        assert correct_text(shuffled) == "Gravity"
+        assert grade(shuffled, answer_letter(shuffled))
+
+
+def test_shuffle_is_stable_per_seed_and_varies_across_seeds():
+    q = make_question()
+    assert shuffle_choices(q, "learner-1") == shuffle_choices(q, "learner-1")
+    assert len({answer_letter(shuffle_choices(q, seed)) for seed in range(40)}) > 1
+
+
+def test_shuffle_remaps_letter_references_in_the_explanation():
+    q = make_question(explanation="Option B is right, not choice (A).")
+    for seed in range(20):
+        shuffled = shuffle_choices(q, seed)
+        letters = {choice_text(c): c[0] for c in shuffled["choices"]}
+        assert shuffled["explanation"] == f"Option {letters['Gravity']} is right, not choice ({letters['Friction']})."
+
+
+def test_shuffle_leaves_plain_words_in_the_explanation():
+    explanation = "Gravity is the answer a physicist would give; option b is lowercase prose."
+    q = make_question(explanation=explanation)
+    for seed in range(20):
+        assert shuffle_choices(q, seed)["explanation"] == explanation
+
+
+def test_invalid_question_is_returned_as_is():
+    q = make_question(choices=["A. Friction", "B. Gravity"])
+    assert validate_question(q)
+    assert shuffle_choices(q, "seed") is q
+
+
+def test_lesson_quiz_answer_field_is_remapped():
+    q = make_question(answer="B")
+    del q["correct"]
+    shuffled = shuffle_choices(q, "seed")
+    assert correct_text(shuffled) == "Gravity"
+
+
+@pytest.fixture
+def bank(tmp_path, monkeypatch):
+    from tutor import validation
+    from tutor.question_bank import QuestionBank
+
+    bank = QuestionBank(str(tmp_path / "questions.sqlite3"))
+    monkeypatch.setattr(validation, "get_question_bank", lambda: bank)
+    return bank
+
+
+def test_invalid_question_is_regenerated_inline_when_the_bank_is_empty(bank):
+    from tutor.validation import checked_question
+
+    q = checked_question(make_question(correct="E"), "Orbits", "easy", make_question)
+
+    assert q["id"] and not validate_question(q)
+    assert [item["id"] for item in bank.items("Orbits")] == [q["id"]]
+
+
+def test_lesson_quiz_replacements_are_distinct(bank):
+    from tutor.validation import checked_lesson_quiz
+
+    for i in range(3):
+        bank.add("Orbits", "easy", make_question(question=f"Banked question {i}?"))
+    quiz = {n: make_question(correct="E") for n in range(1, 4)}
+    # Replacements fail validation too, so the background jobs leave the bank alone
+    checked = checked_lesson_quiz(quiz, "Orbits", "easy", lambda: make_question(correct="E"), seed="learner-1")
+
+    assert len({q["id"] for q in checked.values()}) == 3
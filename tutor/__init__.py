@@ -0,0 +1,6 @@
+"""Tutoring engine shared by the Streamlit apps.
+
+``engine.get_engine(app)`` is the entry point for generation; the other
+modules provide the stores, validation, scheduling and instrumentation
+behind it.  The apps in the repository root are thin UIs over this package.
+"""
@@ -0,0 +1,191 @@
+"""Ability estimation for the adaptive quizzes.
+
+Learners sit on a single ability scale (theta) and every question tier carries
+item parameters on the same scale: a discrimination ``a`` and a difficulty
+``b``.  After each answer the learner's ability is re-estimated and the next
+question is drawn from the tier that is most informative at that ability, so
+placement converges in far fewer (LLM-generated) questions than stepping one
+level at a time.
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+import numpy as np
+
+DIFFICULTY_LEVELS = ["easy", "medium", "hard"]
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+# Precomputed item parameters, refreshed by calibrate_item_params()
+ITEM_PARAMS_PATH = os.getenv("ITEM_PARAMS_PATH", os.path.join(DATA_DIR, "item_params.json"))
+DEFAULT_ITEM_PARAMS = {
+    "easy": {"a": 1.0, "b": -1.0},
+    "medium": {"a": 1.0, "b": 0.0},
+    "hard": {"a": 1.0, "b": 1.0},
+}
+
+# Standard error below which the learner counts as placed
+PLACEMENT_SE = float(os.getenv("PLACEMENT_SE", "0.6"))
+
+THETA_GRID = np.linspace(-4.0, 4.0, 161)
+PRIOR = np.exp(-0.5 * THETA_GRID ** 2)
+
+
+def load_item_params(path=ITEM_PARAMS_PATH):
+    """Load calibrated item parameters, falling back to the defaults"""
+    params = {level: dict(p) for level, p in DEFAULT_ITEM_PARAMS.items()}
+    if os.path.exists(path):
+        with open(path) as f:
+            params.update(json.load(f))
+    return params
+
+
+def save_item_params(params, path=ITEM_PARAMS_PATH):
+    """Write calibrated item parameters for the apps to pick up"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(params, f, indent=2)
+
+
+def item_probability(theta, a, b):
+    """Probability of a correct answer under the 2PL model (vectorized)"""
+    return 1.0 / (1.0 + np.exp(-np.asarray(a) * (np.asarray(theta) - np.asarray(b))))
+
+
+def item_information(theta, a, b):
+    """Fisher information of an item at ability theta (vectorized)"""
+    p = item_probability(theta, a, b)
+    return np.asarray(a) ** 2 * p * (1.0 - p)
+
+
+class AbilityModel(ABC):
+    """Shared item bookkeeping and maximum-information item selection"""
+
+    def __init__(self, item_params):
+        self.levels = list(item_params)
+        self.a = np.array([item_params[level]["a"] for level in self.levels], dtype=float)
+        self.b = np.array([item_params[level]["b"] for level in self.levels], dtype=float)
+
+    def _item_arrays(self, responses):
+        idx = np.array([self.levels.index(level) for level, _ in responses], dtype=int)
+        correct = np.array([bool(c) for _, c in responses], dtype=float)
+        return self.a[idx], self.b[idx], correct
+
+    @abstractmethod
+    def estimate(self, responses):
+        """Return (theta, standard error) for a list of (level, correct) pairs"""
+
+    def next_difficulty(self, theta):
+        """Pick the difficulty level carrying the most information at theta"""
+        return self.levels[int(np.argmax(item_information(theta, self.a, self.b)))]
+
+    def placement(self, theta):
+        """Map an ability estimate to the closest difficulty level"""
+        return self.levels[int(np.argmin(np.abs(self.b - theta)))]
+
+    def is_placed(self, se):
+        return se <= PLACEMENT_SE
+
+
+class IRTModel(AbilityModel):
+    """1PL/2PL IRT with an expected-a-posteriori estimate over a theta grid"""
+
+    def __init__(self, item_params, two_parameter=True):
+        super().__init__(item_params)
+        if not two_parameter:
+            self.a = np.ones_like(self.a)
+
+    def estimate(self, responses):
+        if not responses:
+            return 0.0, 1.0
+        a, b, correct = self._item_arrays(responses)
+        # (grid, items) likelihood in one shot
+        p = item_probability(THETA_GRID[:, None], a[None, :], b[None, :])
+        log_lik = (correct * np.log(p) + (1.0 - correct) * np.log1p(-p)).sum(axis=1)
+        posterior = PRIOR * np.exp(log_lik - log_lik.max())
+        posterior /= posterior.sum()
+        theta = float((THETA_GRID * posterior).sum())
+        se = float(np.sqrt(((THETA_GRID - theta) ** 2 * posterior).sum()))
+        return theta, se
+
+
+class EloModel(AbilityModel):
+    """Elo-style rating updates with an information-based standard error"""
+
+    def __init__(self, item_params, k=0.4):
+        super().__init__(item_params)
+        self.k = k
+
+    def estimate(self, responses):
+        if not responses:
+            return 0.0, 1.0
+        a, b, correct = self._item_arrays(responses)
+        theta = 0.0
+        for i in range(len(correct)):
+            theta += self.k * (correct[i] - item_probability(theta, a[i], b[i]))
+        info = item_information(theta, a, b).sum()
+        return float(theta), float(1.0 / np.sqrt(1.0 + info))
+
+
+@lru_cache(maxsize=None)
+def get_ability_model(kind=None):
+    """Build the configured ability model ("elo", "1pl" or "2pl")"""
+    kind = (kind or os.getenv("ABILITY_MODEL", "2pl")).lower()
+    params = load_item_params()
+    if kind == "elo":
+        return EloModel(params)
+    if kind == "1pl":
+        return IRTModel(params, two_parameter=False)
+    return IRTModel(params)
+
+
+def calibrate_item_params(learners, items, correct, two_parameter=True, n_iter=100, lr=0.5):
+    """Fit item parameters from logged responses.
+
+    ``learners`` and ``items`` are parallel sequences of learner ids and
+    difficulty levels, ``correct`` holds 0/1 outcomes.  Uses marginal maximum
+    likelihood (EM over the theta grid) on per-learner response counts, so the
+    cost scales with learners x levels rather than with raw responses.
+    """
+    _, learner_idx = np.unique(np.asarray(learners), return_inverse=True)
+    levels = list(DEFAULT_ITEM_PARAMS)
+    levels += [level for level in dict.fromkeys(items) if level not in levels]
+    item_idx = np.array([levels.index(level) for level in items], dtype=int)
+    y = np.asarray(correct, dtype=float)
+
+    # Sufficient statistics: attempts and correct answers per (learner, level)
+    attempts = np.zeros((learner_idx.max() + 1, len(levels)))
+    rights = np.zeros_like(attempts)
+    np.add.at(attempts, (learner_idx, item_idx), 1.0)
+    np.add.at(rights, (learner_idx, item_idx), y)
+    wrongs = attempts - rights
+
+    grid = THETA_GRID[::4]
+    prior = PRIOR[::4]
+    b = np.array([DEFAULT_ITEM_PARAMS.get(level, {"b": 0.0})["b"] for level in levels])
+    log_a = np.zeros(len(levels))
+
+    for _ in range(n_iter):
+        # E-step: posterior over the grid for every learner
+        p = item_probability(grid[:, None], np.exp(log_a)[None, :], b[None, :])
+        log_lik = rights @ np.log(p).T + wrongs @ np.log1p(-p).T
+        posterior = prior * np.exp(log_lik - log_lik.max(axis=1, keepdims=True))
+        posterior /= posterior.sum(axis=1, keepdims=True)
+        expected_n = posterior.T @ attempts
+        expected_r = posterior.T @ rights
+        n_item = np.maximum(1.0, expected_n.sum(axis=0))
+
+        # M-step: a few gradient steps per item with weak priors on b and log(a)
+        for _ in range(5):
+            a = np.exp(log_a)
+            p = item_probability(grid[:, None], a[None, :], b[None, :])
+            resid = expected_r - expected_n * p
+            b += lr * (-(resid * a).sum(axis=0) - b) / n_item
+            if two_parameter:
+                g_log_a = (resid * a * (grid[:, None] - b)).sum(axis=0) - log_a
+                log_a = np.clip(log_a + lr * g_log_a / n_item, -2.0, 2.0)
+
+    a = np.exp(log_a)
+    return {level: {"a": round(float(a[i]), 4), "b": round(float(b[i]), 4)} for i, level in enumerate(levels)}
@@ -0,0 +1,160 @@
+"""Adaptive multiple-choice quiz flow shared by quiz.py and the lesson agent.
+
+These functions read and write ``st.session_state``; page layout and
+navigation stay in the apps.
+"""
+
+import streamlit as st
+
+from .admission import wait_in_line
+from .event_log import log_response
+from .validation import answer_letter, grade
+
+ADAPTIVE_STATE = {
+    "difficulty": "medium",
+    "question_data": {},
+    "question_number": 1,
+    "total_questions": 1,
+    "score": 0,
+    "selected": None,
+    "submitted": False,
+    "quiz_finished": False,
+    "pending_next": False,
+    "question_generated": False,
+    "responses": [],  # (difficulty, correct) pairs for ability estimation
+    "ability": (0.0, 1.0),
+    "seen_question_ids": [],
+    "question_pool": None,
+}
+
+
+def start_quiz(engine, total_questions, difficulty):
+    """Begin an adaptive quiz on the session's topic"""
+    state = st.session_state
+    state.total_questions = total_questions
+    state.difficulty = difficulty
+    state.question_number = 1
+    state.question_generated = False
+    state.responses = []
+    if state.question_pool is None:
+        state.question_pool = engine.question_pool(state.topic)
+
+
+def ensure_question(engine, message="Generating question..."):
+    """Generate the current question once; stops the script if none can be produced"""
+    state = st.session_state
+    if state.question_generated:
+        return
+    question = wait_in_line(
+        message, engine.next_question, state.topic, state.difficulty, state.question_number,
+        pool=state.question_pool,
+        exclude=state.seen_question_ids,
+        seed=f"{state.session_id}:{state.question_number}"
+    )
+    if question is None:
+        st.error("Sorry, we couldn't generate a valid question. Please refresh to try again.")
+        st.stop()
+    state.question_data = question
+    if "id" in question:
+        state.seen_question_ids.append(question["id"])
+    state.selected = None
+    state.submitted = False
+    state.pending_next = False
+    state.question_generated = True
+
+
+def answer_picker(q):
+    """Answer radio and submit button, shown until the answer is submitted"""
+    state = st.session_state
+    if state.submitted:
+        return
+    options = [c.split(".")[0].strip() for c in q["choices"]]
+    choice_map = {c.split(".")[0].strip(): c for c in q["choices"]}
+    selected = st.radio(
+        "Choose your answer:",
+        options=options,
+        format_func=lambda x: choice_map[x],
+        index=None,
+        key=f"radio_q{state.question_number}"
+    )
+    if st.button("Submit Answer", key=f"submit_{state.question_number}"):
+        if selected:
+            state.selected = selected
+            state.submitted = True
+            state.pending_next = True
+            st.rerun()
+        else:
+            st.warning("Please select an answer before submitting.")
+
+
+def record_answer(engine, app, q):
+    """Grade a submitted answer once, log it and re-estimate the learner's ability"""
+    state = st.session_state
+    if not state.submitted or "result_processed" in state:
+        return
+    is_correct = grade(q, state.selected)
+    if is_correct:
+        state.score += 1
+    log_response(
+        state.session_id, app, state.topic, q["question"], state.selected, answer_letter(q), is_correct,
+        difficulty=state.difficulty
+    )
+    # Move to the most informative difficulty for the new estimate
+    state.responses.append((state.difficulty, is_correct))
+    theta, se = engine.ability_model.estimate(state.responses)
+    state.ability = (theta, se)
+    state.difficulty = engine.ability_model.next_difficulty(theta)
+    state.result_processed = True
+
+
+def show_review(engine, q):
+    """Marked answer choices, explanation, score and ability estimate"""
+    state = st.session_state
+    st.markdown("**Answer choices:**")
+    for choice in q["choices"]:
+        choice_letter = choice.split(".")[0].strip()
+        if choice_letter == answer_letter(q):
+            st.markdown(f"✅ **{choice}** ← Correct Answer")
+        elif choice_letter == state.selected:
+            st.markdown(f"❌ {choice} ← Your Answer")
+        else:
+            st.markdown(f"   {choice}")
+
+    if grade(q, state.selected):
+        st.success("✅ Correct! Great job!")
+    else:
+        st.error(f"❌ Incorrect. The correct answer was {answer_letter(q)}.")
+    if "result_processed" in state:
+        st.info(f"Next difficulty: {state.difficulty.title()}")
+
+    st.info(f"💡 **Explanation:** {q['explanation']}")
+    st.markdown(f"**Current Score:** {state.score} / {state.question_number}")
+    theta, se = state.ability
+    st.markdown(
+        f"**Estimated Level:** {engine.ability_model.placement(theta).title()} (ability {theta:+.2f} ± {se:.2f})"
+    )
+
+
+def next_question():
+    """Move on to a new question"""
+    state = st.session_state
+    state.question_number += 1
+    state.question_data = {}
+    state.submitted = False
+    state.pending_next = False
+    state.question_generated = False
+    if "result_processed" in state:
+        del state.result_processed
+
+
+def finish_early_offer(engine):
+    """Offer to stop once the ability estimate is precise enough; True if chosen"""
+    state = st.session_state
+    if not engine.ability_model.is_placed(state.ability[1]):
+        return False
+    st.success("Your level has been placed confidently - you can finish now.")
+    if st.button("Finish Early", key=f"finish_early_{state.question_number}"):
+        state.total_questions = state.question_number
+        state.quiz_finished = True
+        return True
+    return False
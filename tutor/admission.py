@@ -0,0 +1,146 @@
+"""Global admission control for LLM calls.
+
+Every LLM request the engine makes takes a slot from one process-wide
+``AdmissionController``.  At most ``LLM_MAX_IN_FLIGHT`` requests run at
+once; the rest wait in line, interactive work (``HIGH`` priority) ahead of
+background work and first come, first served within a priority.  A
+background job a learner has started waiting on (see ``collect``) counts as
+interactive.  Hedged duplicates only take a slot that is free with nobody
+waiting, so they count against the cap too.  Once
+``SHED_QUEUE_DEPTH`` requests are waiting the tutor counts as overloaded:
+
+- background jobs below ``HIGH`` priority (alternate lessons, question pool
+  top-ups, bank refills) are refused with ``Overloaded`` instead of queueing
+- the engine serves practice and adaptive questions from the question bank
+  where it can, and the apps skip optional regeneration
+
+``wait_in_line`` runs an engine call for the Streamlit script and shows the
+learner's place in line while the call waits for a slot.
+"""
+
+import contextvars
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import Future, wait
+from contextlib import contextmanager
+from functools import lru_cache
+
+from .background import HIGH, LOW, NORMAL, current_job, job_priority
+from .metrics import observe
+
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "24"))
+SHED_QUEUE_DEPTH = int(os.getenv("SHED_QUEUE_DEPTH", "8"))
+POLL_INTERVAL = 0.25
+
+PRIORITY_NAMES = {HIGH: "high", NORMAL: "normal", LOW: "low"}
+
+# Whose request this is, for reporting a place in line
+request_owner = contextvars.ContextVar("request_owner", default=None)
+
+
+class Overloaded(RuntimeError):
+    """Background LLM work refused because too many requests are waiting"""
+
+
+class AdmissionController:
+    """Bounded in-flight LLM requests with a priority-ordered waiting line"""
+
+    def __init__(self, max_in_flight=LLM_MAX_IN_FLIGHT, shed_depth=SHED_QUEUE_DEPTH):
+        self.max_in_flight = max_in_flight
+        self.shed_depth = shed_depth
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+        self._waiting = []  # (seq, owner, job), most urgent first
+        self.in_flight = 0
+        self.shed = 0
+
+    @contextmanager
+    def slot(self):
+        """Hold one in-flight request slot, waiting in line for it if necessary"""
+        job = current_job.get()
+        start = time.monotonic()
+        with self._cond:
+            if job_priority(job) > HIGH and len(self._waiting) >= self.shed_depth:
+                self.shed += 1
+                raise Overloaded(f"{len(self._waiting)} LLM requests waiting")
+            if self.in_flight >= self.max_in_flight or self._waiting:
+                entry = (next(self._counter), request_owner.get(), job)
+                self._waiting.append(entry)
+                while True:
+                    # Re-sorted on every wake, so a job collected while it waits moves up to HIGH
+                    self._waiting.sort(key=lambda e: (job_priority(e[2]), e[0]))
+                    if self.in_flight < self.max_in_flight and self._waiting[0] is entry:
+                        break
+                    self._cond.wait()
+                self._waiting.pop(0)
+            self.in_flight += 1
+            priority = job_priority(job)
+        observe("tutor_llm_admission_wait_seconds", time.monotonic() - start, priority=PRIORITY_NAMES[priority])
+        try:
+            yield
+        finally:
+            self.release()
+
+    def try_acquire(self):
+        """Take a slot only if one is free and nobody is waiting; pair with ``release``"""
+        with self._cond:
+            if self.in_flight >= self.max_in_flight or self._waiting:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def overloaded(self):
+        with self._cond:
+            return len(self._waiting) >= self.shed_depth
+
+    def position(self, owner):
+        """1-based place in line of the owner's first waiting request, or 0 when it isn't waiting"""
+        with self._cond:
+            for i, entry in enumerate(self._waiting):
+                if entry[1] is owner:
+                    return i + 1
+        return 0
+
+    def stats(self):
+        with self._cond:
+            return {"in_flight": self.in_flight, "waiting": len(self._waiting), "shed": self.shed}
+
+
+@lru_cache(maxsize=None)
+def get_admission():
+    return AdmissionController()
+
+
+def wait_in_line(message, fn, *args, **kwargs):
+    """Call ``fn`` off the script thread behind a spinner, showing the learner's place in line while it waits"""
+    import streamlit as st
+
+    owner = object()
+    future = Future()
+
+    def run():
+        request_owner.set(owner)
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+    # A thread of its own, so the call never queues behind background jobs
+    threading.Thread(target=contextvars.copy_context().run, args=(run,), daemon=True).start()
+    notice = st.empty()
+    with st.spinner(message):
+        while not wait([future], timeout=POLL_INTERVAL).done:
+            position = get_admission().position(owner)
+            if position:
+                notice.info(f"The tutor is busy right now - you are number {position} in line.")
+            else:
+                notice.empty()
+    notice.empty()
+    return future.result()
@@ -0,0 +1,90 @@
+"""Shared worker pool for LLM work that runs off the Streamlit script thread.
+
+Jobs are ordered by priority, so speculative work (pre-generating alternate
+lessons, prefetching) never delays anything a learner is actively waiting for.
+Results come back as ``concurrent.futures.Future`` objects that can be kept in
+``st.session_state`` and collected on a later rerun.  Jobs run in a copy of
+the submitter's context, with ``current_job`` set to their future.  A job
+keeps its priority until someone collects it: from then on a learner is
+waiting, so ``job_priority`` reports it as ``HIGH``.
+"""
+
+import contextvars
+import itertools
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from functools import lru_cache
+
+# Lower number runs first
+HIGH = 0    # a learner is waiting on this
+NORMAL = 1  # prefetch of content the learner is about to need
+LOW = 2     # speculative, may never be used
+
+# Future of the job running in the current context; None outside a job, which is interactive
+current_job = contextvars.ContextVar("current_job", default=None)
+
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "4"))
+
+
+class PriorityExecutor:
+    """Thread pool that always picks the most urgent queued job next"""
+
+    def __init__(self, max_workers=BACKGROUND_WORKERS):
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()  # FIFO within a priority
+        for i in range(max_workers):
+            threading.Thread(target=self._worker, name=f"background-{i}", daemon=True).start()
+
+    def submit(self, fn, *args, priority=NORMAL, **kwargs):
+        future = Future()
+        future.priority = priority
+        context = contextvars.copy_context()
+        self._queue.put((priority, next(self._counter), future, context, fn, args, kwargs))
+        return future
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def _worker(self):
+        while True:
+            priority, _, future, context, fn, args, kwargs = self._queue.get()
+            # Skip jobs that were cancelled while queued
+            if not future.set_running_or_notify_cancel():
+                continue
+            context.run(self._run, future, fn, args, kwargs)
+
+    @staticmethod
+    def _run(future, fn, args, kwargs):
+        current_job.set(future)
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+def job_priority(job):
+    """Current priority of a job's future; None stands for interactive work"""
+    return HIGH if job is None else job.priority
+
+
+@lru_cache(maxsize=None)
+def get_executor():
+    return PriorityExecutor()
+
+
+def collect(future):
+    """Result of a finished or running job, or None if it never started or failed.
+
+    A job still waiting in the queue is cancelled so the caller can do the
+    work itself at interactive priority instead of queueing behind others; a
+    running one is raised to ``HIGH`` for the LLM requests it still has to make.
+    """
+    if future is None or future.cancel():
+        return None
+    future.priority = HIGH
+    try:
+        return future.result()
+    except Exception:
+        return None
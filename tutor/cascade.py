@@ -0,0 +1,151 @@
+"""Small-model-first cascade for LLM chain calls.
+
+``CascadeChain`` wraps a (hedged) chain on the default model and keeps its
+``run`` interface.  When a small model is configured (``CASCADE_MODEL_NAME``
+and/or ``CASCADE_OPENAI_API_BASE``, e.g. a local OpenAI-compatible server),
+each call goes to the small model first and its output is run through the
+same parsers and structural checks the apps use.  Only output that fails
+them, or a small-model error, escalates to the default model.  Escalation
+rates per prompt type are kept in ``cascade_stats``, reported by the load
+tester and exported as the ``tutor_cascade_accepted_total`` and
+``tutor_cascade_escalated_total`` metrics.
+"""
+
+import os
+import threading
+
+from .curriculum_parser import parse_curriculum
+from .lesson_sections import section_body, split_lesson
+from .metrics import inc
+from .parsers import parse_lesson_quiz, parse_question
+from .profiling import span
+from .question_pool import parse_question_batch
+from .validation import validate_question
+
+CASCADE_MODEL_NAME = os.getenv("CASCADE_MODEL_NAME")
+CASCADE_OPENAI_API_BASE = os.getenv("CASCADE_OPENAI_API_BASE")
+# The small model should be fast; a slow answer escalates instead of waiting out the full deadline
+CASCADE_TIMEOUT = float(os.getenv("CASCADE_TIMEOUT", "20"))
+
+LESSON_QUIZ_QUESTIONS = 3
+
+
+def small_llm(temperature):
+    """ChatOpenAI for the cascade's first tier, or None when no small model is configured"""
+    if not (CASCADE_MODEL_NAME or CASCADE_OPENAI_API_BASE):
+        return None
+    from langchain.chat_models import ChatOpenAI
+
+    kwargs = {"temperature": temperature, "request_timeout": CASCADE_TIMEOUT, "max_retries": 0}
+    if CASCADE_MODEL_NAME:
+        kwargs["model_name"] = CASCADE_MODEL_NAME
+    if CASCADE_OPENAI_API_BASE:
+        kwargs["openai_api_base"] = CASCADE_OPENAI_API_BASE
+    return ChatOpenAI(**kwargs)
+
+
+# Checks return a list of problems, like validate_question; empty means accept
+
+def _quiz_problems(quiz_text):
+    quiz = parse_lesson_quiz("**Quiz:**\n" + quiz_text)
+    if len(quiz) < LESSON_QUIZ_QUESTIONS:
+        return [f"expected {LESSON_QUIZ_QUESTIONS} quiz questions, got {len(quiz)}"]
+    return [f"Q{q_num}: {problem}" for q_num, q in quiz.items() for problem in validate_question(q)]
+
+
+def check_curriculum(output, inputs):
+    titles = parse_curriculum(output)
+    expected = int(inputs["num_lessons"])
+    return [] if len(titles) >= expected else [f"expected {expected} lessons, got {len(titles)}"]
+
+
+def check_lesson(output, inputs):
+    _, sections = split_lesson(output)
+    problems = [f"missing {name}" for name, body in sections.items() if not body]
+    return problems or _quiz_problems(sections["quiz"])
+
+
+def check_lesson_section(output, inputs):
+    body = section_body(inputs["section"], output)
+    if inputs["section"] == "quiz":
+        return _quiz_problems(body)
+    return [] if body else ["empty section"]
+
+
+def check_question(output, inputs):
+    return validate_question(parse_question(output))
+
+
+def check_question_batch(output, inputs):
+    valid = {level for level, q in parse_question_batch(output, parse_question) if not validate_question(q)}
+    return [f"no valid {level} question" for level in ("easy", "medium", "hard") if level not in valid]
+
+
+CHECKS = {
+    "curriculum": check_curriculum,
+    "lesson": check_lesson,
+    "lesson_section": check_lesson_section,
+    "quiz": check_question,
+    "quiz_batch": check_question_batch,
+}
+
+
+class CascadeStats:
+    """Small-model outcomes per prompt type: accepted, invalid or error"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, prompt_type, outcome, count=1):
+        with self._lock:
+            counts = self._counts.setdefault(prompt_type, {})
+            counts[outcome] = counts.get(outcome, 0) + count
+        if outcome == "accepted":
+            inc("tutor_cascade_accepted_total", count, prompt_type=prompt_type)
+        else:
+            inc("tutor_cascade_escalated_total", count, prompt_type=prompt_type, reason=outcome)
+
+    def stats(self):
+        """Calls, escalations and escalation rate per prompt type"""
+        with self._lock:
+            counts = {k: dict(v) for k, v in self._counts.items()}
+        result = {}
+        for prompt_type, c in counts.items():
+            calls = sum(c.values())
+            escalated = c.get("invalid", 0) + c.get("error", 0)
+            result[prompt_type] = {**c, "calls": calls, "escalated": escalated, "rate": escalated / calls}
+        return result
+
+
+cascade_stats = CascadeStats()
+
+
+class CascadeChain:
+    """Drop-in wrapper trying ``small`` first and escalating to ``chain`` when its output fails the checks"""
+
+    def __init__(self, chain, small_llm=None):
+        from langchain.chains import LLMChain
+
+        self.chain = chain
+        self.prompt_type = chain.prompt_type
+        self.small = LLMChain(llm=small_llm, prompt=chain.prompt) if small_llm is not None else None
+        self.check = CHECKS[self.prompt_type]
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+    def run(self, inputs):
+        if self.small is None:
+            return self.chain.run(inputs)
+        try:
+            with span(f"llm:{self.prompt_type}:small"):
+                output = self.small.run(inputs)
+        except Exception:
+            cascade_stats.record(self.prompt_type, "error")
+        else:
+            if not self.check(output, inputs):
+                cascade_stats.record(self.prompt_type, "accepted")
+                return output
+            cascade_stats.record(self.prompt_type, "invalid")
+        return self.chain.run(inputs)
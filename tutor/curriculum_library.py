@@ -0,0 +1,145 @@
+"""Library of previously generated curricula.
+
+Every generated curriculum is saved; once a learner has actually worked
+through one of its lessons it counts as approved and can be served to later
+requests for the same subject without calling the LLM.  Subjects are matched
+on a normalized name first and then fuzzily through a trigram index, so
+"Newton's Laws", "newtons laws" and "Newtons law" all land on the same
+curriculum.  A fuzzy match needs the same numbers, roman numerals and
+symbol-bearing names ("Calculus I" is not "Calculus II", "C++" is not "C#"),
+and either the same words up to a plural "s" or a near-identical spelling.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from functools import lru_cache
+
+from .metrics import inc
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+LIBRARY_PATH = os.path.join(DATA_DIR, "curricula.sqlite3")
+
+# Minimum trigram Jaccard similarity for a fuzzy topic match whose words differ
+MATCH_THRESHOLD = float(os.getenv("CURRICULUM_MATCH_THRESHOLD", "0.85"))
+
+_ROMAN = re.compile(r"^x{0,3}(?:ix|iv|v?i{0,3})$")
+
+
+def normalize_topic(topic):
+    topic = re.sub(r"['\u2019]", "", (topic or "").lower())
+    # "+" and "#" are part of names like C++ and C#
+    topic = re.sub(r"[^a-z0-9+# ]+", " ", topic)
+    return " ".join(topic.split())
+
+
+def _stem(word):
+    return word[:-1] if len(word) > 3 and word.endswith("s") and not word.endswith("ss") else word
+
+
+def topic_words(norm_topic):
+    """(word stems, tokens that must match exactly) of a normalized topic.
+
+    Numbers, roman numerals and tokens with symbols tell otherwise similar
+    subjects apart, so a fuzzy match must agree on all of them.
+    """
+    words = norm_topic.split()
+    exact = {w for w in words if any(c.isdigit() for c in w) or _ROMAN.match(w) or not w.isalnum()}
+    return {_stem(w) for w in words}, exact
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CurriculumLibrary:
+    """SQLite-backed curriculum store with an in-memory trigram index"""
+
+    def __init__(self, path=LIBRARY_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS curricula ("
+                " id INTEGER PRIMARY KEY, topic TEXT, norm_topic TEXT, level TEXT,"
+                " num_lessons INTEGER, profile TEXT, lessons TEXT,"
+                " approved INTEGER DEFAULT 0, uses INTEGER DEFAULT 0)"
+            )
+        self._topics = {}   # norm_topic -> trigram set
+        self._words = {}    # norm_topic -> topic_words()
+        self._index = {}    # trigram -> set of norm_topics
+        for (norm_topic,) in self._db.execute("SELECT DISTINCT norm_topic FROM curricula WHERE approved = 1"):
+            self._index_topic(norm_topic)
+
+    def _index_topic(self, norm_topic):
+        if norm_topic in self._topics:
+            return
+        grams = trigrams(norm_topic)
+        self._topics[norm_topic] = grams
+        self._words[norm_topic] = topic_words(norm_topic)
+        for gram in grams:
+            self._index.setdefault(gram, set()).add(norm_topic)
+
+    def _candidate_topics(self, norm_topic):
+        """Approved topics that match, same words first, then by trigram similarity"""
+        if norm_topic in self._topics:
+            return [norm_topic]
+        grams = trigrams(norm_topic)
+        stems, exact = topic_words(norm_topic)
+        shared = Counter(t for gram in grams for t in self._index.get(gram, ()))
+        scored = []
+        for candidate, overlap in shared.items():
+            candidate_stems, candidate_exact = self._words[candidate]
+            if candidate_exact != exact:
+                continue
+            similarity = overlap / (len(grams) + len(self._topics[candidate]) - overlap)
+            same_words = candidate_stems == stems
+            if same_words or similarity >= MATCH_THRESHOLD:
+                scored.append((same_words, similarity, candidate))
+        return [candidate for *_, candidate in sorted(scored, reverse=True)]
+
+    def find(self, topic, level, num_lessons, profile=""):
+        """Return (id, lessons) of the best approved match, or None"""
+        with self._lock:
+            for norm_topic in self._candidate_topics(normalize_topic(topic)):
+                row = self._db.execute(
+                    "SELECT id, lessons FROM curricula WHERE norm_topic = ? AND level = ?"
+                    " AND num_lessons = ? AND profile = ? AND approved = 1"
+                    " ORDER BY uses DESC LIMIT 1",
+                    (norm_topic, level, num_lessons, profile),
+                ).fetchone()
+                if row:
+                    with self._db:
+                        self._db.execute("UPDATE curricula SET uses = uses + 1 WHERE id = ?", (row[0],))
+                    inc("tutor_cache_requests_total", cache="curriculum_library", result="hit")
+                    return row[0], json.loads(row[1])
+        inc("tutor_cache_requests_total", cache="curriculum_library", result="miss")
+        return None
+
+    def add(self, topic, level, num_lessons, lessons, profile=""):
+        """Save a freshly generated curriculum (unapproved); returns its id"""
+        with self._lock, self._db:
+            cur = self._db.execute(
+                "INSERT INTO curricula (topic, norm_topic, level, num_lessons, profile, lessons, uses)"
+                " VALUES (?, ?, ?, ?, ?, ?, 1)",
+                (topic, normalize_topic(topic), level, num_lessons, profile, json.dumps(lessons)),
+            )
+            return cur.lastrowid
+
+    def approve(self, curriculum_id):
+        """Make a curriculum available for reuse"""
+        with self._lock, self._db:
+            self._db.execute("UPDATE curricula SET approved = 1 WHERE id = ?", (curriculum_id,))
+            row = self._db.execute("SELECT norm_topic FROM curricula WHERE id = ?", (curriculum_id,)).fetchone()
+            if row:
+                self._index_topic(row[0])
+
+
+@lru_cache(maxsize=None)
+def get_curriculum_library():
+    return CurriculumLibrary()
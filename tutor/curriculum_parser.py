@@ -0,0 +1,56 @@
+"""Parsing of the numbered lesson list returned by the curriculum prompt.
+
+``CurriculumParser`` accepts the response in arbitrary chunks as it streams
+and emits each lesson title as soon as its line is complete, so the UI can
+show titles (and start generating lesson 1) before the list is finished.
+Items may be numbered ``1.`` / ``1)`` or bulleted, and may carry markdown
+bold or a ``Lesson 1:`` prefix; preamble and other unnumbered lines are
+ignored rather than mangled.
+"""
+
+import re
+
+_ITEM = re.compile(r"^\s*(?:\d+\s*[.):]|[-*•])\s+(.*\S)\s*$")
+_LESSON_PREFIX = re.compile(r"^(?:lesson|unit|module)\s*\d+\s*[:.\-–—]\s*", re.IGNORECASE)
+
+
+def parse_item(line):
+    """Lesson title from one line of the list, or None if it isn't a list item"""
+    match = _ITEM.match(line)
+    if not match:
+        return None
+    title = match.group(1).replace("**", "").replace("__", "").strip()
+    title = _LESSON_PREFIX.sub("", title).strip().strip('"').strip()
+    return title or None
+
+
+def parse_curriculum(text):
+    """All lesson titles in a complete curriculum response"""
+    parser = CurriculumParser()
+    parser.feed(text)
+    parser.finish()
+    return parser.titles
+
+
+class CurriculumParser:
+    """Incremental parser: ``feed`` chunks, get back newly completed titles"""
+
+    def __init__(self):
+        self.titles = []
+        self._partial = ""
+
+    def _add(self, line):
+        title = parse_item(line)
+        if title is not None and title not in self.titles:
+            self.titles.append(title)
+            return [title]
+        return []
+
+    def feed(self, chunk):
+        *lines, self._partial = (self._partial + chunk).split("\n")
+        return [title for line in lines for title in self._add(line)]
+
+    def finish(self):
+        """Flush the last line, which has no trailing newline"""
+        line, self._partial = self._partial, ""
+        return self._add(line)
@@ -0,0 +1,265 @@
+"""Generation services shared by the three apps.
+
+A ``TutorEngine`` holds the LLM clients, chains and stores for one app
+configuration.  ``get_engine`` builds it once per process, and every session
+then reuses it instead of building chains on each rerun.  The apps only
+handle layout and session state.  Caching, batching, hedging, the model
+cascade and validation live behind these methods, so a change here reaches
+every app.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from .ability import DIFFICULTY_LEVELS, get_ability_model
+from .admission import get_admission
+from .background import LOW, get_executor
+from .cascade import CascadeChain, small_llm
+from .curriculum_library import get_curriculum_library
+from .curriculum_parser import CurriculumParser, parse_curriculum
+from .latency import REQUEST_TIMEOUT, HedgedChain, secondary_llm, stream_run
+from .lesson_index import get_lesson_index
+from .lesson_sections import SECTIONS, assemble, section_body, split_lesson
+from .lesson_store import get_lesson_store
+from .metrics import inc, start_metrics_server
+from .parsers import parse_lesson_quiz, parse_question
+from .prompts import (
+    BATCH_QUESTION_PROMPT, CURRICULUM_PROMPT, LESSON_SECTION_PROMPTS, PREREQUISITE_PROMPT, QUESTION_PROMPT,
+    TOPIC_LESSON_PROMPT, UNIT_LESSON_PROMPT,
+)
+from .question_bank import get_question_bank
+from .question_pool import QUIZ_BATCH_SIZE, QuestionPool
+from .validation import checked_lesson_quiz, checked_question, shuffle_choices
+
+# Sampling temperature per app; TUTOR_TEMPERATURE overrides all of them
+APP_TEMPERATURES = {
+    "curriculum_generator": 0.5,
+    "personalized_lesson_agent": 0.7,
+    "quiz": 0.8,
+}
+DEFAULT_TEMPERATURE = 0.7
+
+# Prerequisite lists and lessons are stored under this level, shared by all learners of a subject
+PREREQUISITE_LEVEL = "prerequisite"
+PREREQUISITE_LESSONS = 3
+
+# Generate lessons section by section (in parallel) rather than in one call
+SECTIONED_LESSONS = os.getenv("SECTIONED_LESSONS", "1") != "0"
+
+# Section jobs wait on HedgedChain calls, so they get their own threads
+_section_pool = ThreadPoolExecutor(max_workers=int(os.getenv("SECTION_THREADS", "16")), thread_name_prefix="section")
+
+
+class TutorEngine:
+    """LLM chains, stores and the ability model behind one app"""
+
+    def __init__(self, temperature=DEFAULT_TEMPERATURE):
+        from langchain.chains import LLMChain
+        from langchain.chat_models import ChatOpenAI
+
+        self.temperature = temperature
+        llm = ChatOpenAI(temperature=temperature, request_timeout=REQUEST_TIMEOUT)
+        hedge_llm = secondary_llm(temperature=temperature)
+        stream_llm = ChatOpenAI(temperature=temperature, request_timeout=REQUEST_TIMEOUT, streaming=True)
+
+        small = small_llm(temperature=temperature)
+
+        def chain(prompt, prompt_type):
+            # Small model first when one is configured, then the default model with hedging
+            return CascadeChain(HedgedChain(LLMChain(llm=llm, prompt=prompt), prompt_type, hedge_llm), small)
+
+        self.curriculum_chain = chain(CURRICULUM_PROMPT, "curriculum")
+        self.curriculum_stream_chain = LLMChain(llm=stream_llm, prompt=CURRICULUM_PROMPT)
+        self.prerequisite_chain = chain(PREREQUISITE_PROMPT, "curriculum")
+        self.unit_lesson_chain = chain(UNIT_LESSON_PROMPT, "lesson")
+        self.topic_lesson_chain = chain(TOPIC_LESSON_PROMPT, "lesson")
+        self.section_chains = {
+            section: chain(prompt, "lesson_section") for section, prompt in LESSON_SECTION_PROMPTS.items()
+        }
+        self.question_chain = chain(QUESTION_PROMPT, "quiz")
+        self.batch_question_chain = chain(BATCH_QUESTION_PROMPT, "quiz_batch")
+
+        self.lesson_store = get_lesson_store()
+        self.lesson_index = get_lesson_index()
+        self.curriculum_library = get_curriculum_library()
+        self.ability_model = get_ability_model()
+        self.admission = get_admission()
+
+    def _run(self, chain, inputs):
+        # Every LLM request waits for an admission slot (see admission)
+        with self.admission.slot():
+            return chain.run(inputs)
+
+    # Curricula
+
+    def curriculum(self, inputs):
+        """Lesson titles from a single non-streaming call"""
+        return parse_curriculum(self._run(self.curriculum_chain, inputs))
+
+    def stream_curriculum(self, inputs):
+        """Yield the list of lesson titles so far, each time a new one arrives"""
+        parser = CurriculumParser()
+        with self.admission.slot():
+            for chunk in stream_run(self.curriculum_stream_chain, "curriculum", inputs):
+                if parser.feed(chunk):
+                    yield list(parser.titles)
+        if parser.finish():
+            yield list(parser.titles)
+
+    def prerequisites(self, topic):
+        """Prerequisite lesson titles for a subject, generated once and then served from the library"""
+        match = self.curriculum_library.find(topic, PREREQUISITE_LEVEL, PREREQUISITE_LESSONS)
+        if match:
+            return match[1]
+        inputs = {"topic": topic, "num_lessons": PREREQUISITE_LESSONS}
+        titles = parse_curriculum(self._run(self.prerequisite_chain, inputs))[:PREREQUISITE_LESSONS]
+        if titles:
+            # Not tied to a learner, so reusable right away
+            self.curriculum_library.approve(
+                self.curriculum_library.add(topic, PREREQUISITE_LEVEL, PREREQUISITE_LESSONS, titles)
+            )
+        return titles
+
+    # Lessons
+
+    def _section(self, section, inputs, previous="none"):
+        # Topic lessons have no separate title or challenges
+        inputs = {"lesson": inputs["topic"], "challenges": "none", **inputs, "section": section, "previous": previous}
+        return section_body(section, self._run(self.section_chains[section], inputs))
+
+    def _generate_lesson(self, chain, inputs):
+        if not SECTIONED_LESSONS:
+            return self._run(chain, inputs)
+        futures = {
+            section: _section_pool.submit(contextvars.copy_context().run, self._section, section, inputs)
+            for section in SECTIONS
+        }
+        return assemble(inputs.get("lesson", inputs["topic"]), {s: f.result() for s, f in futures.items()})
+
+    def _stored_lesson(self, chain, inputs, key):
+        if not key:
+            return self.lesson_store.put(self._generate_lesson(chain, {**inputs, "related": "none"}))
+        digest = self.lesson_store.lookup(*key)
+        if digest is not None:
+            return digest
+        # A near-identical lesson for the same learner is reused outright;
+        # otherwise the closest lessons ground the new one
+        digest = self.lesson_index.reusable(*key)
+        inc("tutor_cache_requests_total", cache="lesson_index", result="miss" if digest is None else "hit")
+        if digest is not None:
+            return self.lesson_store.put(self.lesson_store.get(digest), *key)
+        related = self.lesson_index.related(key[0], key[1])
+        digest = self.lesson_store.put(self._generate_lesson(chain, {**inputs, "related": related}), *key)
+        self.lesson_index.add(digest, *key)
+        return digest
+
+    def unit_lesson(self, inputs, key=None):
+        """Digest of a curriculum lesson, reusing the stored one for ``key`` if any.
+
+        A lesson stored under a near-identical key is reused too (see
+        ``lesson_index``).  Without a key a new version is always generated.
+        Safe to call off the script thread.
+        """
+        return self._stored_lesson(self.unit_lesson_chain, inputs, key)
+
+    def topic_lesson(self, inputs, key=None):
+        """Digest of a standalone topic lesson; see ``unit_lesson``"""
+        return self._stored_lesson(self.topic_lesson_chain, inputs, key)
+
+    def refresh_section(self, digest, section, inputs):
+        """Digest of a copy of a lesson with one section regenerated and the rest kept"""
+        title, sections = split_lesson(self.lesson_store.get(digest))
+        sections[section] = self._section(section, {**inputs, "related": "none"}, sections[section] or "none")
+        return self.lesson_store.put(assemble(title or inputs.get("lesson", inputs["topic"]), sections))
+
+    def prefetch_unit_lesson(self, inputs, key, priority=LOW):
+        """Start generating a lesson in the background; shed under overload, when the learner's request generates it instead"""
+        return get_executor().submit(self.unit_lesson, inputs, key, priority=priority)
+
+    def lesson_quiz(self, content, topic, difficulty, seed=""):
+        """The validated quiz of a lesson"""
+        return checked_lesson_quiz(
+            parse_lesson_quiz(content), topic, difficulty, lambda: self.question(topic, difficulty), seed=seed
+        )
+
+    # Questions
+
+    def question(self, topic, difficulty, number=1):
+        """One freshly generated, unvalidated question"""
+        inputs = {"topic": topic, "difficulty": difficulty, "question_number": number}
+        return parse_question(self._run(self.question_chain, inputs))
+
+    def question_pool(self, topic):
+        """Pool of batch-generated questions for one quiz session, or None when batching is off"""
+        if not QUIZ_BATCH_SIZE:
+            return None
+        return QuestionPool(
+            lambda batch_number: self._run(
+                self.batch_question_chain,
+                {"topic": topic, "per_level": QUIZ_BATCH_SIZE, "batch_number": batch_number}
+            ),
+            parse_question, DIFFICULTY_LEVELS
+        )
+
+    def next_question(self, topic, difficulty, number, pool=None, exclude=(), seed=""):
+        """A validated question for an adaptive quiz, shuffled for ``seed``, or None if none could be produced"""
+        # Serve from the batch pool, falling back to a single-question call
+        question = pool.next(difficulty) if pool is not None else None
+        if question is None and self.admission.overloaded():
+            question = get_question_bank().sample(topic, difficulty, exclude, seed)
+        if question is None:
+            question = self.question(topic, difficulty, number)
+        # Invalid items are swapped for a bank item, or regenerated here when the bank is empty
+        question = checked_question(
+            question, topic, difficulty, lambda: self.question(topic, difficulty, number),
+            exclude=exclude, seed=seed
+        )
+        return shuffle_choices(question, seed) if question is not None else None
+
+    def practice_questions(self, topic, difficulty, seed="", count=5, exclude=()):
+        """A set of validated practice questions, shuffled for ``seed``.
+
+        When the tutor is overloaded, banked questions are served instead.
+        """
+        if self.admission.overloaded():
+            banked = self.banked_questions(topic, difficulty, seed, count, exclude)
+            if banked:
+                return banked
+        questions = []
+        for i in range(1, count + 1):
+            q = checked_question(
+                self.question(topic, difficulty, i), topic, difficulty,
+                lambda i=i: self.question(topic, difficulty, i),
+                exclude=[*exclude, *(p["id"] for p in questions if "id" in p)], seed=f"{seed}:{i}"
+            )
+            if q is not None:
+                questions.append(shuffle_choices(q, seed))
+        return questions
+
+    def review_questions(self, item_ids, seed=""):
+        """Banked questions by id for a review, shuffled for ``seed``"""
+        return [dict(shuffle_choices(q, seed), review=True) for q in get_question_bank().get(item_ids)]
+
+    def banked_questions(self, topic, difficulty, seed="", count=5, exclude=()):
+        """Up to ``count`` distinct questions from the question bank, shuffled for ``seed``"""
+        bank = get_question_bank()
+        questions = []
+        for i in range(1, count + 1):
+            q = bank.sample(topic, difficulty, [*exclude, *(p["id"] for p in questions)], seed=f"{seed}:{i}")
+            if q is None:
+                break
+            questions.append(shuffle_choices(q, seed))
+        return questions
+
+
+@lru_cache(maxsize=None)
+def get_engine(app=None):
+    """The process-wide engine for an app (see APP_TEMPERATURES)"""
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path="../.env", override=True)
+    start_metrics_server()
+    temperature = float(os.getenv("TUTOR_TEMPERATURE") or APP_TEMPERATURES.get(app, DEFAULT_TEMPERATURE))
+    return TutorEngine(temperature)
@@ -0,0 +1,207 @@
+"""Append-only log of learner responses.
+
+The apps call ``log_response`` when an answer is graded.  Events are queued in
+memory and written by a background thread in batches, so a submit never waits
+on disk.  Raw events land in hourly JSON-lines segments; ``compact`` turns the
+closed segments into a Parquet dataset partitioned by topic and date for
+analytics and item calibration.
+
+    python -m tutor.event_log compact      # segments -> Parquet
+    python -m tutor.event_log calibrate    # Parquet -> tutor_data/item_params.json
+"""
+
+import atexit
+import glob
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+EVENTS_DIR = os.path.join(DATA_DIR, "events")
+ANALYTICS_DIR = os.path.join(DATA_DIR, "analytics", "responses")
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 2.0  # seconds
+
+EVENT_FIELDS = [
+    "ts", "session_id", "app", "topic", "lesson", "question",
+    "difficulty", "selected", "correct_answer", "is_correct",
+]
+
+
+class ResponseLog:
+    """Batched, non-blocking writer for response events"""
+
+    def __init__(self, events_dir=EVENTS_DIR, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.events_dir = events_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        os.makedirs(events_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="response-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def append(self, event):
+        self._queue.put(event)
+
+    def _segment_path(self, ts):
+        hour = datetime.fromtimestamp(ts, timezone.utc).strftime("%Y%m%d-%H")
+        return os.path.join(self.events_dir, f"{hour}-{os.getpid()}.jsonl")
+
+    def _drain(self, max_items):
+        batch = []
+        while len(batch) < max_items:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        by_segment = {}
+        for event in batch:
+            by_segment.setdefault(self._segment_path(event["ts"]), []).append(event)
+        with self._lock:
+            for path, events in by_segment.items():
+                with open(path, "a") as f:
+                    f.write("".join(json.dumps(e) + "\n" for e in events))
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            # Give the batch a moment to fill before hitting the disk
+            deadline = time.monotonic() + self.flush_interval
+            batch = [first]
+            while len(batch) < self.batch_size and time.monotonic() < deadline and not self._stop.is_set():
+                batch += self._drain(self.batch_size - len(batch))
+                self._stop.wait(0.05)
+            self._write(batch)
+
+    def close(self):
+        """Stop the writer thread, letting it write the batch it holds, then write everything still queued"""
+        self._stop.set()
+        self._thread.join()
+        self._write(self._drain(sys.maxsize))
+
+
+@lru_cache(maxsize=None)
+def get_response_log():
+    return ResponseLog()
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def log_response(session_id, app, topic, question, selected, correct_answer, is_correct,
+                 difficulty="", lesson=""):
+    """Queue one graded answer; returns immediately"""
+    get_response_log().append({
+        "ts": time.time(),
+        "session_id": session_id,
+        "app": app,
+        "topic": topic,
+        "lesson": lesson,
+        "question": question,
+        "difficulty": difficulty,
+        "selected": selected or "",
+        "correct_answer": correct_answer or "",
+        "is_correct": bool(is_correct),
+    })
+
+
+def compact(events_dir=EVENTS_DIR, out_dir=ANALYTICS_DIR):
+    """Move closed JSON-lines segments into the Parquet dataset.
+
+    Segments for the current hour are still being appended to and are left
+    alone.  Closed segments are renamed before they are read: a late event
+    for an earlier hour reopens the segment by name and starts a new file
+    instead of being appended to one that is about to be deleted.  Renamed
+    segments left behind by an interrupted run are exported too.  Returns
+    the number of events exported.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    current_hour = datetime.now(timezone.utc).strftime("%Y%m%d-%H")
+    for path in sorted(glob.glob(os.path.join(events_dir, "*.jsonl"))):
+        if not os.path.basename(path).startswith(current_hour):
+            os.replace(path, path + ".compacting")
+    segments = sorted(glob.glob(os.path.join(events_dir, "*.jsonl.compacting")))
+    rows = []
+    for path in segments:
+        with open(path) as f:
+            rows += [json.loads(line) for line in f if line.strip()]
+    if rows:
+        columns = {field: [row.get(field) for row in rows] for field in EVENT_FIELDS}
+        columns["topic"] = [(t or "unknown").strip().lower() for t in columns["topic"]]
+        columns["date"] = [datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d") for ts in columns["ts"]]
+        table = pa.table(columns)
+        pq.write_to_dataset(
+            table,
+            root_path=out_dir,
+            partition_cols=["topic", "date"],
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+    for path in segments:
+        os.remove(path)
+    return len(rows)
+
+
+def load_responses(out_dir=ANALYTICS_DIR, topic=None, columns=None):
+    """Read the compacted responses as an Arrow table, optionally for one topic"""
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(out_dir, format="parquet", partitioning="hive")
+    flt = ds.field("topic") == topic.strip().lower() if topic else None
+    return dataset.to_table(columns=columns, filter=flt)
+
+
+def topic_accuracy(out_dir=ANALYTICS_DIR):
+    """Per-topic answer counts and accuracy"""
+    table = load_responses(out_dir, columns=["topic", "is_correct"])
+    return table.group_by("topic").aggregate([("is_correct", "count"), ("is_correct", "mean")])
+
+
+def calibrate(out_dir=ANALYTICS_DIR):
+    """Refit the adaptive-quiz item parameters from logged responses"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from .ability import DIFFICULTY_LEVELS, calibrate_item_params, save_item_params
+
+    table = load_responses(out_dir, columns=["session_id", "difficulty", "is_correct"])
+    table = table.filter(pc.is_in(table["difficulty"], value_set=pa.array(DIFFICULTY_LEVELS)))
+    params = calibrate_item_params(
+        table["session_id"].to_numpy(zero_copy_only=False),
+        table["difficulty"].to_pylist(),
+        table["is_correct"].to_numpy(zero_copy_only=False),
+    )
+    save_item_params(params)
+    return params
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "compact"
+    if command == "compact":
+        print(f"Exported {compact()} events to {ANALYTICS_DIR}")
+    elif command == "calibrate":
+        print(json.dumps(calibrate(), indent=2))
+    elif command == "accuracy":
+        print(topic_accuracy().to_pandas().to_string(index=False))
+    else:
+        sys.exit(f"Unknown command: {command}")
@@ -0,0 +1,184 @@
+"""Tail-latency control for LLM chain calls.
+
+``HedgedChain`` wraps an ``LLMChain`` and keeps its ``run`` interface.  Each
+call gets a deadline for its prompt type; if the first request has not
+answered by the recent p95 latency of that prompt type, a duplicate request is
+sent (to a secondary backend when one is configured) and whichever finishes
+first wins.  The loser is cancelled if it has not started yet and otherwise
+ignored - ``request_timeout`` on the LLM bounds how long it can linger.
+Duplicates are skipped unless an admission slot is spare (see admission).
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .admission import get_admission
+from .metrics import observe
+from .profiling import span
+
+# Per-request HTTP timeout passed to ChatOpenAI
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+
+# Overall deadline per prompt type, in seconds
+PROMPT_DEADLINES = {
+    "curriculum": 30.0,
+    "lesson": 90.0,
+    "lesson_section": 45.0,
+    "quiz": 30.0,
+    "quiz_batch": 60.0,
+}
+DEFAULT_DEADLINE = 60.0
+
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+# Optional secondary backend for hedged duplicates
+HEDGE_MODEL_NAME = os.getenv("HEDGE_MODEL_NAME")
+HEDGE_OPENAI_API_BASE = os.getenv("HEDGE_OPENAI_API_BASE")
+
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("LLM_THREADS", "32")), thread_name_prefix="llm")
+
+
+class LatencyTracker:
+    """Recent latencies per prompt type, for hedge delays"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = {}
+        self.window = window
+
+    def record(self, prompt_type, seconds, outcome):
+        """outcome is one of primary, hedge, timeout, error; exported with the latency histogram"""
+        observe("tutor_llm_request_seconds", seconds, prompt_type=prompt_type, outcome=outcome)
+        with self._lock:
+            if outcome in ("primary", "hedge"):
+                self._samples.setdefault(prompt_type, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_delay(self, prompt_type):
+        """Seconds to wait before sending a duplicate request"""
+        deadline = PROMPT_DEADLINES.get(prompt_type, DEFAULT_DEADLINE)
+        with self._lock:
+            samples = sorted(self._samples.get(prompt_type, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return deadline / 3
+        p = samples[min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE / 100))]
+        return max(HEDGE_MIN_DELAY, p)
+
+
+tracker = LatencyTracker()
+
+
+def secondary_llm(temperature):
+    """ChatOpenAI for hedged duplicates, if HEDGE_MODEL_NAME/HEDGE_OPENAI_API_BASE is set"""
+    if not (HEDGE_MODEL_NAME or HEDGE_OPENAI_API_BASE):
+        return None
+    from langchain.chat_models import ChatOpenAI
+
+    kwargs = {"temperature": temperature, "request_timeout": REQUEST_TIMEOUT}
+    if HEDGE_MODEL_NAME:
+        kwargs["model_name"] = HEDGE_MODEL_NAME
+    if HEDGE_OPENAI_API_BASE:
+        kwargs["openai_api_base"] = HEDGE_OPENAI_API_BASE
+    return ChatOpenAI(**kwargs)
+
+
+class HedgedChain:
+    """Drop-in wrapper adding deadlines and hedged requests to chain.run"""
+
+    def __init__(self, chain, prompt_type, secondary=None):
+        from langchain.chains import LLMChain
+
+        self.chain = chain
+        self.prompt_type = prompt_type
+        self.secondary = LLMChain(llm=secondary, prompt=chain.prompt) if secondary is not None else chain
+
+    def __getattr__(self, name):
+        return getattr(self.chain, name)
+
+    def run(self, inputs):
+        with span(f"llm:{self.prompt_type}"):
+            return self._run(inputs)
+
+    def _run(self, inputs):
+        deadline = PROMPT_DEADLINES.get(self.prompt_type, DEFAULT_DEADLINE)
+        start = time.monotonic()
+        primary = _pool.submit(self.chain.run, inputs)
+        futures = {primary: "primary"}
+
+        done, _ = wait([primary], timeout=min(tracker.hedge_delay(self.prompt_type), deadline))
+        # A hedge is an extra LLM request, so it needs a spare admission slot
+        admission = get_admission()
+        if not done and admission.try_acquire():
+            hedge = _pool.submit(self.secondary.run, inputs)
+            hedge.add_done_callback(lambda _: admission.release())
+            futures[hedge] = "hedge"
+
+        winner, error, pending = None, None, set(futures)
+        while pending and winner is None:
+            remaining = deadline - (time.monotonic() - start)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    winner = future
+                    break
+                error = future.exception()
+        for future in pending:
+            future.cancel()
+
+        elapsed = time.monotonic() - start
+        if winner is None:
+            tracker.record(self.prompt_type, elapsed, "error" if error and not pending else "timeout")
+            if error is not None and not pending:
+                raise error
+            raise TimeoutError(f"{self.prompt_type} generation did not finish within {deadline:.0f}s")
+        tracker.record(self.prompt_type, elapsed, futures[winner])
+        return winner.result()
+
+
+def stream_run(chain, prompt_type, inputs):
+    """Run ``chain`` (whose LLM has streaming=True) yielding text chunks as they arrive.
+
+    Not hedged: the caller sees partial output instead.  The prompt type's
+    deadline still applies, raising TimeoutError.  When the LLM doesn't
+    stream, the whole result is yielded at the end.
+    """
+    from langchain.callbacks.base import BaseCallbackHandler
+
+    tokens = queue.Queue()
+
+    class TokenQueue(BaseCallbackHandler):
+        def on_llm_new_token(self, token, **kwargs):
+            tokens.put(token)
+
+    deadline = PROMPT_DEADLINES.get(prompt_type, DEFAULT_DEADLINE)
+    start = time.monotonic()
+    future = _pool.submit(chain.run, inputs, callbacks=[TokenQueue()])
+    streamed = False
+    with span(f"llm:{prompt_type}:stream"):
+        while True:
+            try:
+                yield tokens.get(timeout=0.05)
+                streamed = True
+                continue
+            except queue.Empty:
+                pass
+            if future.done() and tokens.empty():
+                break
+            if time.monotonic() - start > deadline:
+                future.cancel()
+                tracker.record(prompt_type, time.monotonic() - start, "timeout")
+                raise TimeoutError(f"{prompt_type} generation did not finish within {deadline:.0f}s")
+        if future.exception() is not None:
+            tracker.record(prompt_type, time.monotonic() - start, "error")
+            raise future.exception()
+        tracker.record(prompt_type, time.monotonic() - start, "primary")
+        if not streamed:
+            yield future.result()
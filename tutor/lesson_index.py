@@ -0,0 +1,196 @@
+"""Vector index of generated lessons, for reuse and grounding.
+
+Every lesson stored under a request key is embedded by its title and unit
+and added to a flat in-memory index (normalized NumPy vectors, so search is
+one matrix-vector product).  On a lesson-store miss the engine checks it:
+
+- if a lesson for the same level and learner profile is at least
+  ``REUSE_SIMILARITY`` similar, it is reused without an LLM call
+- otherwise short explanation snippets from the closest lessons above
+  ``GROUNDING_SIMILARITY`` go into the prompt, so the new lesson can build on
+  them instead of re-explaining at length
+
+Embeddings come from sentence-transformers (``EMBEDDING_MODEL``) when it is
+installed, and from hashed word and character n-grams otherwise.  Vectors
+persist in SQLite next to the lesson store; ``python -m tutor.lesson_index
+rebuild`` re-embeds every stored lesson, e.g. after changing the model.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from .curriculum_library import normalize_topic
+from .lesson_store import LESSON_DIR, get_lesson_store
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+REUSE_SIMILARITY = float(os.getenv("LESSON_REUSE_SIMILARITY", "0.92"))
+GROUNDING_SIMILARITY = float(os.getenv("LESSON_GROUNDING_SIMILARITY", "0.6"))
+GROUNDING_LESSONS = 2
+SNIPPET_CHARS = 400
+HASH_DIM = 1024
+
+
+class HashingEmbedder:
+    """Dependency-free embedding: hashed word unigrams/bigrams and character trigrams"""
+
+    name = f"hashing-{HASH_DIM}"
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), HASH_DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = normalize_topic(text).split()
+            features = words + [" ".join(pair) for pair in zip(words, words[1:])]
+            for word in words:
+                padded = f" {word} "
+                features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+            for feature in features:
+                # crc32 rather than hash(), which differs between processes
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % HASH_DIM] += 1.0 if h & 0x80000000 else -1.0
+        return _normalize(vectors)
+
+
+class SentenceEmbedder:
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"st-{model_name}"
+
+    def embed(self, texts):
+        return _normalize(np.asarray(self.model.encode(list(texts)), dtype=np.float32))
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+@lru_cache(maxsize=None)
+def get_embedder():
+    try:
+        return SentenceEmbedder(EMBEDDING_MODEL)
+    except Exception:
+        # Not installed, or the model can't be loaded (e.g. offline)
+        return HashingEmbedder()
+
+
+def lesson_text(unit, title):
+    """What a lesson is embedded by"""
+    return title if normalize_topic(unit) == normalize_topic(title) else f"{title} ({unit})"
+
+
+def explanation_snippet(lesson, limit=SNIPPET_CHARS):
+    """Start of a lesson's explanation section"""
+    match = re.search(r"\*\*Explanation:\*\*(.*?)(?=\*\*Example|\*\*Quiz:|\Z)", lesson, re.S)
+    text = " ".join((match.group(1) if match else lesson).split())
+    return text if len(text) <= limit else text[:limit].rsplit(" ", 1)[0] + " ..."
+
+
+class LessonIndex:
+    """Flat cosine-similarity index over stored lessons"""
+
+    def __init__(self, root=LESSON_DIR, embedder=None):
+        self.embedder = embedder or get_embedder()
+        os.makedirs(root, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(root, "vectors.sqlite3"), check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS vectors ("
+                " model TEXT, unit TEXT, title TEXT, level TEXT, profile TEXT, digest TEXT, vector BLOB,"
+                " PRIMARY KEY (model, unit, title, level, profile))"
+            )
+            rows = self._db.execute(
+                "SELECT unit, title, level, profile, digest, vector FROM vectors WHERE model = ?",
+                (self.embedder.name,),
+            ).fetchall()
+        self.meta = [row[:5] for row in rows]
+        self._rows = [np.frombuffer(row[5], dtype=np.float32) for row in rows]
+        self._matrix = None
+
+    def __len__(self):
+        return len(self.meta)
+
+    def add(self, digest, unit, title, level, profile=""):
+        vector = self.embedder.embed([lesson_text(unit, title)])[0]
+        key = (normalize_topic(unit), normalize_topic(title), normalize_topic(level), profile or "")
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO vectors VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.embedder.name, *key, digest, vector.tobytes()),
+                )
+            for i, meta in enumerate(self.meta):
+                if meta[:4] == key:
+                    self.meta[i], self._rows[i] = (*key, digest), vector
+                    break
+            else:
+                self.meta.append((*key, digest))
+                self._rows.append(vector)
+            self._matrix = None
+
+    def search(self, unit, title, k=5):
+        """[(similarity, (unit, title, level, profile, digest))] best first"""
+        query = self.embedder.embed([lesson_text(unit, title)])[0]
+        with self._lock:
+            if not self.meta:
+                return []
+            if self._matrix is None:
+                self._matrix = np.vstack(self._rows)
+            scores = self._matrix @ query
+            meta = list(self.meta)
+        top = np.argsort(-scores)[:k]
+        return [(float(scores[i]), meta[i]) for i in top]
+
+    def reusable(self, unit, title, level, profile=""):
+        """Digest of a near-identical lesson for the same level and learner profile, if any"""
+        level, profile = normalize_topic(level), profile or ""
+        for similarity, meta in self.search(unit, title, k=10):
+            if similarity < REUSE_SIMILARITY:
+                break
+            if meta[2] == level and meta[3] == profile:
+                return meta[4]
+        return None
+
+    def related(self, unit, title, limit=GROUNDING_LESSONS):
+        """Short snippets from the closest existing lessons, formatted for a prompt"""
+        store = get_lesson_store()
+        snippets, seen = [], set()
+        for similarity, meta in self.search(unit, title, k=limit * 3):
+            if similarity < GROUNDING_SIMILARITY or len(snippets) >= limit:
+                break
+            if meta[4] in seen:
+                continue
+            seen.add(meta[4])
+            try:
+                snippets.append(f'"{meta[1]}": {explanation_snippet(store.get(meta[4]))}')
+            except KeyError:
+                continue
+        return "\n".join(snippets) or "none"
+
+
+@lru_cache(maxsize=None)
+def get_lesson_index():
+    return LessonIndex()
+
+
+def rebuild():
+    """Embed every lesson in the lesson store with the current embedder"""
+    index = get_lesson_index()
+    for unit, title, level, profile, digest in get_lesson_store().entries():
+        index.add(digest, unit, title, level, profile)
+    return len(index)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m tutor.lesson_index rebuild")
+    print(f"{rebuild()} lessons indexed with {get_embedder().name}")
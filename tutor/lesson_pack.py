@@ -0,0 +1,222 @@
+"""Export a generated curriculum as a static, offline lesson pack.
+
+A pack is a directory of plain files: ``index.html``, one pre-rendered HTML
+page per lesson with its quiz and practice questions graded in the browser,
+the same quiz data as ``lesson-NN.json`` and a ``manifest.json``.  Packs are
+named by a hash of their contents, so they can be served from any static
+file server or CDN with long cache lifetimes, and viewing them needs no
+LLM calls and no Python process.
+"""
+
+import hashlib
+import html
+import io
+import json
+import os
+import re
+import shutil
+import zipfile
+
+from .validation import answer_letter, choice_letter, choice_text
+
+try:
+    import markdown
+    from markdown.extensions import Extension
+    from markdown.treeprocessors import Treeprocessor
+except ImportError:
+    markdown = None
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+PACK_DIR = os.path.join(DATA_DIR, "packs")
+
+_LIST_ITEM = re.compile(r"^([-*]|\d+\.)\s+")
+# Link and image targets allowed in rendered lessons
+_SAFE_URL = re.compile(r"^(https?:|mailto:|#|/|\.|[^:/?#]*(?:[/?#]|$))", re.IGNORECASE)
+
+STYLE = """
+body { font-family: system-ui, sans-serif; max-width: 46rem; margin: 2rem auto; padding: 0 1rem; color: #2c3e50; line-height: 1.6; }
+h1 { color: #1f4e79; } nav a { margin-right: 1rem; }
+.toc li.missing { color: #95a5a6; }
+.question { border-left: 4px solid #3498db; padding: 0.5rem 1rem; margin: 1rem 0; background: #f8f9fa; }
+.practice .question { border-left-color: #27ae60; }
+.question label { display: block; }
+.correct { color: #27ae60; font-weight: 600; } .incorrect { color: #c0392b; font-weight: 600; }
+.score { font-size: 1.3rem; font-weight: 600; margin: 1rem 0; }
+"""
+
+# Grades every .quiz form on the page against the embedded quiz data
+SCRIPT = """
+const data = JSON.parse(document.getElementById("quiz-data").textContent);
+document.querySelectorAll("form.quiz").forEach(form => {
+  const items = data[form.dataset.section];
+  form.addEventListener("submit", event => {
+    event.preventDefault();
+    let score = 0;
+    items.forEach((q, i) => {
+      const picked = form.querySelector(`input[name="${form.dataset.section}-${i}"]:checked`);
+      const result = form.querySelector(`#${form.dataset.section}-${i}-result`);
+      const ok = picked && picked.value === q.answer;
+      if (ok) score += 1;
+      result.className = ok ? "correct" : "incorrect";
+      result.textContent = (ok ? "Correct! " : `Incorrect. Correct answer: ${q.answer}. `) + (q.explanation || "");
+    });
+    form.querySelector(".score").textContent = `Score: ${score} out of ${items.length}`;
+  });
+});
+"""
+
+
+if markdown is not None:
+    class _DropUnsafeUrls(Treeprocessor):
+        def run(self, root):
+            for element in root.iter():
+                for attr in ("href", "src"):
+                    if attr in element.attrib and not _SAFE_URL.match(element.attrib[attr].strip()):
+                        element.attrib[attr] = "#"
+
+    class _EscapeHtml(Extension):
+        """Show raw HTML in LLM output as text and neutralize script URLs"""
+
+        def extendMarkdown(self, md):
+            md.preprocessors.deregister("html_block")
+            md.inlinePatterns.deregister("html")
+            md.treeprocessors.register(_DropUnsafeUrls(md), "drop_unsafe_urls", 0)
+
+
+def markdown_to_html(text):
+    """Render lesson markdown, with a small built-in fallback when markdown isn't installed"""
+    if markdown is not None:
+        return markdown.markdown(text, extensions=[_EscapeHtml()])
+    blocks = []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        lines = [html.escape(line.strip()) for line in block.strip().split("\n")]
+        lines = [re.sub(r"\*\*(.+?)\*\*", r"<strong>\1</strong>", line) for line in lines]
+        lines = [re.sub(r"\*(.+?)\*", r"<em>\1</em>", line) for line in lines]
+        heading = re.match(r"^(#{1,6})\s+(.*)$", lines[0])
+        if heading and len(lines) == 1:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif all(_LIST_ITEM.match(line) for line in lines):
+            items = "".join(f"<li>{_LIST_ITEM.sub('', line)}</li>" for line in lines)
+            blocks.append(f"<ul>{items}</ul>")
+        else:
+            blocks.append(f"<p>{'<br>'.join(lines)}</p>")
+    return "\n".join(blocks)
+
+
+def quiz_items(questions):
+    """Quiz questions (parsed or validated dicts) as pack JSON items"""
+    items = []
+    for q in questions:
+        items.append({
+            "question": q["question"],
+            "choices": [{"letter": choice_letter(c), "text": choice_text(c)} for c in q["choices"]],
+            "answer": answer_letter(q),
+            "explanation": q.get("explanation", ""),
+        })
+    return items
+
+
+def _quiz_form(section, title, items):
+    parts = [f'<form class="quiz" data-section="{section}"><h2>{html.escape(title)}</h2>']
+    for i, q in enumerate(items):
+        parts.append(f'<div class="question"><p><strong>{i + 1}.</strong> {html.escape(q["question"])}</p>')
+        for choice in q["choices"]:
+            parts.append(
+                f'<label><input type="radio" name="{section}-{i}" value="{html.escape(choice["letter"])}"> '
+                f'{html.escape(choice["letter"])}. {html.escape(choice["text"])}</label>'
+            )
+        parts.append(f'<p id="{section}-{i}-result"></p></div>')
+    parts.append('<button type="submit">Check answers</button><p class="score"></p></form>')
+    return "\n".join(parts)
+
+
+def _page(title, body, quiz_data=None):
+    script = ""
+    if quiz_data:
+        # Embedded rather than fetched so pages also work from file://
+        payload = json.dumps(quiz_data).replace("</", "<\\/")
+        script = f'<script id="quiz-data" type="application/json">{payload}</script>\n<script>{SCRIPT}</script>'
+    return (
+        f'<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8">'
+        f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>{html.escape(title)}</title><style>{STYLE}</style></head>"
+        f"<body>\n{body}\n{script}\n</body></html>\n"
+    )
+
+
+def build_pack(topic, level, curriculum, lessons):
+    """Build the pack's files as {relative path: text}.
+
+    ``lessons`` maps lesson titles to dicts with ``content`` (lesson
+    markdown), ``quiz`` (lesson quiz questions) and optionally ``practice``;
+    curriculum titles without an entry are listed but not linked.
+    """
+    files = {}
+    toc = []
+    manifest = {"topic": topic, "level": level, "lessons": []}
+    pages = [(n, title) for n, title in enumerate(curriculum, 1) if title in lessons]
+    for position, (n, title) in enumerate(pages):
+        lesson = lessons[title]
+        name = f"lesson-{n:02d}"
+        quiz = {"quiz": quiz_items(lesson.get("quiz", [])), "practice": quiz_items(lesson.get("practice", []))}
+        nav = ['<a href="index.html">Contents</a>']
+        if position > 0:
+            nav.append(f'<a href="lesson-{pages[position - 1][0]:02d}.html">Previous</a>')
+        if position + 1 < len(pages):
+            nav.append(f'<a href="lesson-{pages[position + 1][0]:02d}.html">Next</a>')
+        body = [
+            f"<nav>{''.join(nav)}</nav>",
+            f"<h1>Lesson {n}: {html.escape(title)}</h1>",
+            markdown_to_html(lesson["content"].split("**Quiz:")[0]),
+        ]
+        if quiz["quiz"]:
+            body.append(_quiz_form("quiz", "Knowledge Check", quiz["quiz"]))
+        if quiz["practice"]:
+            body.append(f'<div class="practice">{_quiz_form("practice", "Extra Practice", quiz["practice"])}</div>')
+        files[f"{name}.html"] = _page(f"{title} - {topic}", "\n".join(body), quiz)
+        files[f"{name}.json"] = json.dumps({"title": title, **quiz}, indent=1)
+        manifest["lessons"].append({"number": n, "title": title, "page": f"{name}.html", "quiz": f"{name}.json"})
+
+    for n, title in enumerate(curriculum, 1):
+        if title in lessons:
+            toc.append(f'<li><a href="lesson-{n:02d}.html">Lesson {n}: {html.escape(title)}</a></li>')
+        else:
+            toc.append(f'<li class="missing">Lesson {n}: {html.escape(title)}</li>')
+    files["index.html"] = _page(
+        topic, f"<h1>{html.escape(topic)}</h1><p>Level: {html.escape(level)}</p><ol class=\"toc\">{''.join(toc)}</ol>"
+    )
+    files["manifest.json"] = json.dumps(manifest, indent=1)
+    return files
+
+
+def pack_id(files):
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(path.encode("utf-8") + b"\0" + files[path].encode("utf-8") + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def write_pack(files, root=PACK_DIR):
+    """Write a pack under ``root/<pack id>`` and return its directory"""
+    out_dir = os.path.join(root, pack_id(files))
+    if not os.path.isdir(out_dir):
+        tmp = f"{out_dir}.{os.getpid()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for path, text in files.items():
+            with open(os.path.join(tmp, path), "w", encoding="utf-8") as f:
+                f.write(text)
+        try:
+            os.replace(tmp, out_dir)
+        except OSError:
+            # Written concurrently by another session; contents are identical
+            shutil.rmtree(tmp, ignore_errors=True)
+    return out_dir
+
+
+def zip_pack(files, folder="lesson-pack"):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as z:
+        for path, text in sorted(files.items()):
+            z.writestr(f"{folder}/{path}", text)
+    return buffer.getvalue()
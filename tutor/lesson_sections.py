@@ -0,0 +1,68 @@
+"""Lessons as independently generated sections.
+
+A lesson is stored and displayed as one markdown document in the format the
+lesson prompts have always used (title, explanation, two examples, quiz), so
+the parsers, lesson packs and stores don't care how it was produced.  The
+engine generates each section with its own prompt, in parallel, and joins
+them with ``assemble``.  ``split_lesson`` takes any lesson apart again, which
+lets a single section be regenerated while the others are kept as they are.
+"""
+
+import re
+
+# Section name -> heading, in lesson order
+SECTIONS = {
+    "explanation": "**Explanation:**",
+    "basic_example": "**Example 1: Basic**",
+    "advanced_example": "**Example 2: Advanced**",
+    "quiz": "**Quiz:**",
+}
+SECTION_LABELS = {
+    "explanation": "Explanation",
+    "basic_example": "Basic example",
+    "advanced_example": "Advanced example",
+    "quiz": "Quiz questions",
+}
+
+_TITLE = re.compile(r"^\*\*Title:\*\*\s*(.*)$", re.M)
+# A heading at the start of a line, e.g. "**Example 1: Basic**" or "**Example 1: Basic:**"
+_HEADINGS = re.compile(
+    r"^\s*\*\*(Explanation|Example 1[^*\n]*|Example 2[^*\n]*|Quiz):?\*\*:?[ \t]*$", re.M | re.I
+)
+
+
+def _section_of(heading):
+    heading = heading.lower()
+    if heading.startswith("example 1"):
+        return "basic_example"
+    if heading.startswith("example 2"):
+        return "advanced_example"
+    return heading
+
+
+def split_lesson(lesson):
+    """(title, {section: body}) of a lesson; sections it lacks are empty"""
+    match = _TITLE.search(lesson)
+    title = match.group(1).strip() if match else ""
+    sections = dict.fromkeys(SECTIONS, "")
+    headings = list(_HEADINGS.finditer(lesson))
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(lesson)
+        sections[_section_of(heading.group(1))] = lesson[heading.end():end].strip()
+    return title, sections
+
+
+def section_body(section, raw):
+    """Generated text for one section, without a heading the model may have repeated"""
+    text = _TITLE.sub("", raw).strip()
+    heading = _HEADINGS.match(text)
+    if heading and _section_of(heading.group(1)) == section:
+        text = text[heading.end():].strip()
+    return text
+
+
+def assemble(title, sections):
+    """Lesson markdown from its sections"""
+    parts = [f"**Title:** {title}"]
+    parts += [f"{heading}\n{sections.get(name, '').strip()}" for name, heading in SECTIONS.items()]
+    return "\n\n".join(parts) + "\n"
@@ -0,0 +1,130 @@
+"""Content-addressed storage for generated lessons.
+
+Lesson markdown is stored once per unique content as a compressed blob named
+by its SHA-256 digest.  A small SQLite index maps the request that produced a
+lesson (unit topic, lesson title, level, learner profile) to that digest, so a
+repeated request is served from disk instead of the LLM.  Sessions keep only
+digests; decoded text is shared between sessions through an in-process LRU.
+"""
+
+import gzip
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+
+from .metrics import inc
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+LESSON_DIR = os.path.join(DATA_DIR, "lessons")
+LESSON_CACHE_SIZE = int(os.getenv("LESSON_CACHE_SIZE", "512"))
+
+
+def _normalize(text):
+    return " ".join((text or "").lower().split())
+
+
+def profile_hash(*parts):
+    """Stable short hash of the learner-specific prompt inputs"""
+    joined = "\x1f".join(_normalize(p) for p in parts)
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()[:16]
+
+
+def content_digest(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LessonStore:
+    """Deduplicated, compressed lesson blobs plus a request index"""
+
+    def __init__(self, root=LESSON_DIR):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self._local = threading.local()
+        with self._db() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS lessons ("
+                " unit TEXT, title TEXT, level TEXT, profile TEXT, digest TEXT,"
+                " PRIMARY KEY (unit, title, level, profile))"
+            )
+        self._read = lru_cache(maxsize=LESSON_CACHE_SIZE)(self._read_blob)
+
+    def _db(self):
+        # sqlite connections can't be shared across threads
+        if not hasattr(self._local, "db"):
+            self._local.db = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), timeout=10)
+        return self._local.db
+
+    def _blob_path(self, digest):
+        ext = ".zst" if zstandard else ".gz"
+        return os.path.join(self.blob_dir, digest[:2], digest + ext)
+
+    def _find_blob(self, digest):
+        for ext in (".zst", ".gz"):
+            path = os.path.join(self.blob_dir, digest[:2], digest + ext)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, text, unit=None, title=None, level=None, profile=None):
+        """Store a lesson (once) and optionally index it; returns its digest"""
+        digest = content_digest(text)
+        if self._find_blob(digest) is None:
+            path = self._blob_path(digest)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            data = text.encode("utf-8")
+            data = zstandard.ZstdCompressor(level=10).compress(data) if zstandard else gzip.compress(data, 9)
+            # Write then rename so readers never see a partial blob
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        if unit is not None:
+            with self._db() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO lessons VALUES (?, ?, ?, ?, ?)",
+                    (_normalize(unit), _normalize(title), _normalize(level), profile or "", digest),
+                )
+        return digest
+
+    def lookup(self, unit, title, level, profile=""):
+        """Digest of a previously generated lesson for this request, if any"""
+        row = self._db().execute(
+            "SELECT digest FROM lessons WHERE unit = ? AND title = ? AND level = ? AND profile = ?",
+            (_normalize(unit), _normalize(title), _normalize(level), profile or ""),
+        ).fetchone()
+        digest = row[0] if row and self._find_blob(row[0]) else None
+        inc("tutor_cache_requests_total", cache="lesson_store", result="miss" if digest is None else "hit")
+        return digest
+
+    def _read_blob(self, digest):
+        path = self._find_blob(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if path.endswith(".zst"):
+                data = zstandard.ZstdDecompressor().decompress(mm)
+            else:
+                data = gzip.decompress(mm)
+        return data.decode("utf-8")
+
+    def get(self, digest):
+        """Lesson text for a digest (shared LRU across sessions)"""
+        return self._read(digest)
+
+    def entries(self):
+        """Every indexed request as (unit, title, level, profile, digest)"""
+        return self._db().execute("SELECT unit, title, level, profile, digest FROM lessons").fetchall()
+
+
+@lru_cache(maxsize=None)
+def get_lesson_store():
+    return LessonStore()
@@ -0,0 +1,196 @@
+"""Prometheus metrics for a tutor process.
+
+Set ``METRICS_PORT`` to serve ``/metrics`` in the Prometheus text format from
+a sidecar thread; each Streamlit process needs its own port.  The endpoint
+listens on ``METRICS_HOST``, loopback by default, since it has no
+authentication.  Exported:
+
+- ``tutor_sessions``: sessions that reran within ``METRICS_SESSION_IDLE``
+  seconds, per app
+- ``tutor_session_state_bytes``: histogram of session state size, observed
+  on every rerun
+- ``tutor_llm_in_flight``, ``tutor_llm_waiting``, ``tutor_llm_shed_total``
+  and ``tutor_background_jobs_queued``: admission control and job queues
+- ``tutor_llm_admission_wait_seconds``: time to get an admission slot, per
+  priority
+- ``tutor_llm_request_seconds``: latency histogram per prompt type and outcome
+- ``tutor_cache_requests_total``: lookups per cache and result, for hit ratios
+  of the lesson store, lesson index, curriculum library, question bank,
+  question pool and session caches
+- ``tutor_cascade_accepted_total`` and ``tutor_cascade_escalated_total``:
+  small-model outputs kept, and calls escalated to the default model by
+  reason (``invalid`` or ``error``), per prompt type
+
+Counters cost a dict update when the endpoint is off; the per-rerun session
+size is only measured when it is on.
+"""
+
+import os
+import threading
+import time
+import warnings
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+SESSION_IDLE = float(os.getenv("METRICS_SESSION_IDLE", "900"))
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 90)
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+STATE_BUCKETS = (10_000, 30_000, 100_000, 300_000, 1_000_000, 3_000_000, 10_000_000)
+# Histograms not listed here use LATENCY_BUCKETS
+HISTOGRAM_BUCKETS = {
+    "tutor_llm_admission_wait_seconds": WAIT_BUCKETS,
+    "tutor_session_state_bytes": STATE_BUCKETS,
+}
+
+METRICS = {
+    "tutor_sessions": ("gauge", "Sessions that reran recently, per app"),
+    "tutor_session_state_bytes": ("histogram", "Approximate session_state size, observed per rerun"),
+    "tutor_llm_in_flight": ("gauge", "LLM requests holding an admission slot"),
+    "tutor_llm_waiting": ("gauge", "LLM requests waiting for an admission slot"),
+    "tutor_llm_shed_total": ("counter", "Background LLM requests refused under overload"),
+    "tutor_llm_admission_wait_seconds": ("histogram", "Wait for an LLM admission slot, per priority"),
+    "tutor_background_jobs_queued": ("gauge", "Jobs waiting for a background worker"),
+    "tutor_llm_request_seconds": ("histogram", "LLM request latency per prompt type and outcome"),
+    "tutor_cache_requests_total": ("counter", "Cache and store lookups per cache and result"),
+    "tutor_cascade_accepted_total": ("counter", "Small-model outputs that passed the checks, per prompt type"),
+    "tutor_cascade_escalated_total": ("counter", "Calls escalated to the default model, per prompt type and reason"),
+}
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+
+
+class Registry:
+    """Counters and histograms, plus gauges read when scraped"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._sessions = {}  # session id -> (app, last rerun)
+
+    def _buckets(self, name):
+        return HISTOGRAM_BUCKETS.get(name, self.buckets)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        buckets = self._buckets(name)
+        with self._lock:
+            counts = self._histograms.setdefault(key, [0] * (len(buckets) + 2))
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def histogram(self, name):
+        """Bucket bounds and {labels: (cumulative bucket counts, count, sum)} of one histogram"""
+        with self._lock:
+            series = {
+                labels: (counts[:-2], counts[-2], counts[-1])
+                for (key, labels), counts in self._histograms.items() if key == name
+            }
+        return self._buckets(name), series
+
+    def session(self, session_id, app, state_bytes):
+        with self._lock:
+            self._sessions[session_id] = (app, time.time())
+        self.observe("tutor_session_state_bytes", state_bytes)
+
+    def _gauges(self):
+        from .admission import get_admission
+        from .background import get_executor
+
+        now = time.time()
+        with self._lock:
+            for session_id, (_, seen) in list(self._sessions.items()):
+                if now - seen > SESSION_IDLE:
+                    del self._sessions[session_id]
+            apps = [app for app, _ in self._sessions.values()]
+        gauges = [("tutor_sessions", (("app", app),), apps.count(app)) for app in sorted(set(apps))]
+        admission = get_admission().stats()
+        gauges += [
+            ("tutor_llm_in_flight", (), admission["in_flight"]),
+            ("tutor_llm_waiting", (), admission["waiting"]),
+            ("tutor_llm_shed_total", (), admission["shed"]),
+            ("tutor_background_jobs_queued", (), get_executor().pending()),
+        ]
+        return gauges
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        samples = {}
+        for name, labels, value in self._gauges():
+            samples.setdefault(name, []).append(f"{name}{_labels(labels)} {value}")
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(counts) for key, counts in self._histograms.items()}
+        for (name, labels), value in sorted(counters.items()):
+            samples.setdefault(name, []).append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), counts in sorted(histograms.items()):
+            lines = samples.setdefault(name, [])
+            for bound, count in zip(self._buckets(name), counts):
+                lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {count}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {counts[-2]}")
+            lines.append(f"{name}_sum{_labels(labels)} {counts[-1]}")
+            lines.append(f"{name}_count{_labels(labels)} {counts[-2]}")
+        out = []
+        for name, (kind, help_text) in METRICS.items():
+            if name in samples:
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples[name]]
+        return "\n".join(out) + "\n"
+
+
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+
+
+def track_session(app):
+    """Record this session's state size (call once per rerun); no-op unless the endpoint is on"""
+    if not METRICS_PORT:
+        return
+    import streamlit as st
+
+    from .session_cache import state_bytes
+
+    registry.session(st.session_state.session_id, app, state_bytes(st.session_state))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@lru_cache(maxsize=None)
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    """Serve /metrics on ``host:port`` from a daemon thread, once per process; returns the server or None"""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as exc:
+        warnings.warn(f"metrics endpoint not started on {host}:{port}: {exc}", RuntimeWarning)
+        return None
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,72 @@
+"""Parsers for LLM output in the formats requested by ``prompts``.
+
+The curriculum list has its own streaming parser in ``curriculum_parser``.
+"""
+
+from .profiling import profiled
+
+CHOICE_PREFIXES = ("A.", "B.", "C.", "D.")
+
+
+@profiled()
+def parse_lesson_quiz(lesson_content):
+    """Parse the quiz section of a lesson into {question number: question}"""
+    quiz_started = False
+    current = None
+    questions = {}
+    for line in lesson_content.split("\n"):
+        # The answer sometimes trails the last choice instead of having its own line
+        line, marker, answer = line.partition("**Answer:**")
+        line = line.strip()
+        if line.startswith("**Quiz:**"):
+            quiz_started = True
+            continue
+        if not quiz_started:
+            continue
+        if line.startswith("**Q") and ":**" in line:
+            current = len(questions) + 1
+            questions[current] = {"question": line.split(":**", 1)[1].strip(), "choices": [], "answer": ""}
+        elif current is None:
+            continue
+        elif line.replace("**", "").startswith(CHOICE_PREFIXES):
+            questions[current]["choices"].append(line)
+        if marker and current is not None:
+            questions[current]["answer"] = answer.split("**Answer:**")[-1].strip()
+    return questions
+
+
+@profiled()
+def parse_question(raw):
+    """Parse one generated multiple-choice question"""
+    lines = [line.strip() for line in raw.strip().split("\n") if line.strip()]
+    question = ""
+    choices = []
+    explanation = ""
+    correct_choice = ""
+
+    for line in lines:
+        # "**Correct Answer: X**", possibly followed by a note, and sometimes trailing another line
+        line, marker, answer = line.partition("**Correct Answer:")
+        if marker:
+            correct_choice = answer.replace("**Correct Answer:", "").replace("**", "").strip()
+            line = line.strip()
+        if line.startswith("Question:"):
+            question = line.replace("Question:", "").strip()
+        elif line.replace("**", "").startswith(CHOICE_PREFIXES):
+            choices.append(line)
+        elif line.startswith("Explanation:"):
+            explanation = line.replace("Explanation:", "").strip()
+
+    # Some responses mark the answer by bolding the choice instead
+    if not correct_choice:
+        for choice in choices:
+            if "**" in choice:
+                correct_choice = choice.replace("**", "").strip().split(".")[0].strip()
+                break
+
+    return {
+        "question": question,
+        "choices": choices,
+        "correct": correct_choice,
+        "explanation": explanation
+    }
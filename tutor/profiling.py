@@ -0,0 +1,228 @@
+"""Opt-in rerun profiling for the Streamlit apps.
+
+Enable with ``TUTOR_PROFILE=1`` (or ``cprofile`` / ``pyinstrument`` for a
+full profile of each rerun), or per browser tab with ``?profile=1``.  Each
+rerun records a timeline of sections:
+
+- ``checkpoint(name)`` closes the section since the previous checkpoint, so
+  top-level script blocks can be timed without re-indenting them
+- ``span(name)`` / ``@profiled(name)`` time a nested block or function
+
+``render_panel()`` shows the last reruns as a timeline in the sidebar and
+offers them as a Chrome trace (chrome://tracing, Perfetto) download.  When
+profiling is off every hook is a cheap no-op.
+"""
+
+import contextvars
+import cProfile
+import io
+import json
+import os
+import pstats
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+PROFILE_MODE = os.getenv("TUTOR_PROFILE", "").lower()
+MAX_RERUNS = int(os.getenv("TUTOR_PROFILE_RERUNS", "20"))
+
+# The Streamlit script's active profiler, carried into threads that run its work in a copied context
+_current = contextvars.ContextVar("profiler", default=None)
+# Nesting depth of spans in the current context, so work fanned out to other threads nests correctly
+_depth = contextvars.ContextVar("profile_depth", default=0)
+
+
+class RerunTrace:
+    def __init__(self, index):
+        self.index = index
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.last_mark = self.start
+        self.spans = []  # (name, start offset, duration, depth)
+        self.total = None
+        self.profile_text = ""
+        self.interrupted = False
+
+    def add(self, name, start, end, depth):
+        self.spans.append((name, start - self.start, end - start, depth))
+
+
+class Profiler:
+    """Per-session record of the last ``max_reruns`` rerun timelines"""
+
+    def __init__(self, app, mode="spans", max_reruns=MAX_RERUNS):
+        self.app = app
+        self.mode = mode
+        self.reruns = deque(maxlen=max_reruns)
+        self.trace = None
+        self._count = 0
+        self._profile = None
+
+    def begin(self):
+        # st.rerun()/st.stop() skip end(), so close any trace left open
+        if self.trace is not None:
+            self.trace.interrupted = True
+            self.end()
+        self._count += 1
+        self.trace = RerunTrace(self._count)
+        _current.set(self)
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif self.mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler as Instrument
+            except ImportError:
+                self._profile = None
+            else:
+                self._profile = Instrument()
+                self._profile.start()
+
+    def end(self):
+        trace = self.trace
+        if trace is None:
+            return
+        now = time.perf_counter()
+        if now > trace.last_mark and not trace.interrupted:
+            trace.add("rest of script", trace.last_mark, now, 0)
+        trace.total = now - trace.start
+        if isinstance(self._profile, cProfile.Profile):
+            self._profile.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(25)
+            trace.profile_text = out.getvalue()
+        elif self._profile is not None:
+            self._profile.stop()
+            trace.profile_text = self._profile.output_text()
+        self._profile = None
+        self.reruns.append(trace)
+        self.trace = None
+
+    def checkpoint(self, name):
+        trace = self.trace
+        if trace is not None:
+            now = time.perf_counter()
+            trace.add(name, trace.last_mark, now, 0)
+            trace.last_mark = now
+
+    @contextmanager
+    def span(self, name):
+        trace = self.trace
+        if trace is None:
+            yield
+            return
+        depth = _depth.get() + 1
+        token = _depth.set(depth)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            _depth.reset(token)
+            trace.add(name, start, time.perf_counter(), depth)
+
+    def chrome_trace(self):
+        """Completed reruns in Chrome trace event format"""
+        events = []
+        for trace in self.reruns:
+            base = trace.wall_start * 1e6
+            events.append({
+                "name": f"rerun {trace.index}" + (" (interrupted)" if trace.interrupted else ""),
+                "ph": "X", "ts": base, "dur": (trace.total or 0) * 1e6,
+                "pid": self.app, "tid": "script",
+            })
+            for name, offset, duration, depth in trace.spans:
+                events.append({
+                    "name": name, "ph": "X", "ts": base + offset * 1e6, "dur": duration * 1e6,
+                    "pid": self.app, "tid": "script", "args": {"depth": depth, "rerun": trace.index},
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _active():
+    profiler = _current.get()
+    return profiler if profiler is not None and profiler.trace is not None else None
+
+
+def checkpoint(name):
+    profiler = _active()
+    if profiler is not None:
+        profiler.checkpoint(name)
+
+
+@contextmanager
+def span(name):
+    profiler = _active()
+    if profiler is None:
+        yield
+    else:
+        with profiler.span(name):
+            yield
+
+
+def profiled(name=None):
+    """Decorator recording each call as a span"""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _active() is None:
+                return fn(*args, **kwargs)
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_rerun(app):
+    """Begin profiling this rerun if enabled; call once near the top of a script"""
+    import streamlit as st
+
+    _current.set(None)
+    mode = PROFILE_MODE or ("spans" if st.query_params.get("profile") else "")
+    if not mode or mode in ("0", "false", "off"):
+        return None
+    if "_profiler" not in st.session_state:
+        st.session_state._profiler = Profiler(app, "spans" if mode in ("1", "true", "on") else mode)
+    profiler = st.session_state._profiler
+    profiler.begin()
+    return profiler
+
+
+def render_panel():
+    """Close the current rerun and show the developer timeline in the sidebar"""
+    import streamlit as st
+
+    profiler = _current.get()
+    if profiler is None:
+        return
+    profiler.end()
+    _current.set(None)
+    if not profiler.reruns:
+        return
+
+    import altair as alt
+    import pandas as pd
+
+    rows = [
+        {"rerun": f"#{trace.index}", "section": name, "start_ms": offset * 1000,
+         "end_ms": (offset + duration) * 1000, "ms": round(duration * 1000, 2), "depth": depth}
+        for trace in profiler.reruns for name, offset, duration, depth in trace.spans
+    ]
+    with st.sidebar.expander("Profiler", expanded=False):
+        last = profiler.reruns[-1]
+        st.caption(f"Last rerun: {last.total * 1000:.1f} ms, showing {len(profiler.reruns)} reruns")
+        if rows:
+            chart = alt.Chart(pd.DataFrame(rows)).mark_bar().encode(
+                x=alt.X("start_ms", title="ms since rerun start"), x2="end_ms",
+                y=alt.Y("rerun", sort=None), color="section", tooltip=["section", "ms", "depth"],
+            )
+            st.altair_chart(chart, use_container_width=True)
+            st.dataframe(pd.DataFrame([r for r in rows if r["rerun"] == f"#{last.index}"])[["section", "ms", "depth"]])
+        if last.profile_text:
+            st.code(last.profile_text)
+        st.download_button(
+            "Download Chrome trace", json.dumps(profiler.chrome_trace()),
+            file_name=f"{profiler.app}-trace.json", mime="application/json",
+        )
@@ -0,0 +1,237 @@
+"""Prompt templates shared by the apps.
+
+Every app generates questions with the same prompts, so the question bank,
+batch pool and validation treat their output alike.
+"""
+
+from langchain.prompts import PromptTemplate
+
+CURRICULUM_PROMPT = PromptTemplate(
+    input_variables=["topic", "num_lessons", "level", "challenges"],
+    template="Create a structured curriculum with {num_lessons} lesson topics for the subject: {topic}. Return only the numbered list:\n1. ...\n2. ...\n3. ...\n etc. Make sure to take their level of understanding ({level}) and any learning challenges ({challenges}) into account when organizing the curriculum. Keep the curriculum concise with each lesson topic under 10 words."
+)
+
+# Prerequisites for the "Lacks Foundation" level, shared by every learner of a subject
+PREREQUISITE_PROMPT = PromptTemplate(
+    input_variables=["topic", "num_lessons"],
+    template="List the {num_lessons} most essential prerequisite concepts a learner must understand before studying the subject: {topic}. Order them from most basic to most advanced and pick foundational concepts that are commonly missing or assumed. Return only the numbered list:\n1. ...\n2. ...\n3. ...\n Keep each concept under 10 words."
+)
+
+# A lesson within a curriculum unit (curriculum_generator)
+UNIT_LESSON_PROMPT = PromptTemplate(
+    input_variables=["lesson", "topic", "level", "challenges", "mistakes", "related"],
+    template="""
+You are a helpful and engaging AI tutor.
+
+Create a comprehensive personalized lesson based on:
+- Lesson Title: {lesson}
+- Broader Unit: {topic}
+- Level: {level}
+- Learning Challenges: {challenges} (adjust explanation style and/or use analogies)
+- Mistakes: {mistakes} (address these directly with clarification and repetition)
+- Related lessons already written: {related} (build on them briefly instead of re-explaining them at length)
+
+The lesson should include:
+1. Clear explanation of key concepts (about two paragraphs)
+2. Two examples (basic and advanced)
+3. 3-question multiple choice quiz
+
+Use this format:
+**Title:** [Title]
+
+**Explanation:**
+[Explanation]
+
+**Example 1: Basic**
+[...]
+
+**Example 2: Advanced**
+[...]
+
+**Quiz:**
+
+**Q1:** [Question]
+A. ...
+B. ...
+C. ...
+D. ...
+**Answer:** [Correct]
+
+**Q2:** [Question]
+...
+**Answer:** [Correct]
+
+**Q3:** [Question]
+...
+**Answer:** [Correct]
+"""
+)
+
+# A standalone lesson on one topic (personalized_lesson_agent)
+TOPIC_LESSON_PROMPT = PromptTemplate(
+    input_variables=["topic", "level", "mistakes", "related"],
+    template="""
+You are a helpful and engaging AI tutor.
+
+Create a comprehensive personalized lesson based on the following:
+- Topic: {topic}
+- Level: {level}
+- Common Mistakes: {mistakes}
+- Related lessons already written: {related} (build on them briefly instead of re-explaining them at length)
+
+The lesson should include:
+1. A clear explanation of the topic with key concepts
+2. Two illustrative examples (one basic, one advanced)
+3. A short 3-question quiz with multiple choice answers based on the given explanation and examples
+
+Format your response EXACTLY like this:
+
+**Title:** [Lesson Title]
+
+**Explanation:**
+[Detailed explanation of the topic, highlighting key concepts and addressing common mistakes]
+
+**Example 1: Basic**
+[Simple, easy-to-understand example]
+
+**Example 2: Advanced**
+[More complex example that builds on the basic one]
+
+**Quiz:**
+
+**Q1:** [Question 1]
+A. [Option A]
+B. [Option B]
+C. [Option C]
+D. [Option D]
+**Answer:** [Correct letter]
+
+**Q2:** [Question 2]
+A. [Option A]
+B. [Option B]
+C. [Option C]
+D. [Option D]
+**Answer:** [Correct letter]
+
+**Q3:** [Question 3]
+A. [Option A]
+B. [Option B]
+C. [Option C]
+D. [Option D]
+**Answer:** [Correct letter]
+"""
+)
+
+# One section of a lesson, generated on its own (see lesson_sections)
+_SECTION_HEADER = """
+You are a helpful and engaging AI tutor, writing one part of a personalized lesson:
+- Lesson Title: {lesson}
+- Broader Unit: {topic}
+- Level: {level}
+- Learning Challenges: {challenges} (adjust explanation style and/or use analogies)
+- Mistakes: {mistakes} (address these directly with clarification and repetition)
+- Related lessons already written: {related} (build on them briefly instead of re-explaining them at length)
+- Previous version of this part: {previous} (if given, write a new version that differs from it)
+
+"""
+_SECTION_INPUTS = ["lesson", "topic", "level", "challenges", "mistakes", "related", "previous"]
+
+LESSON_SECTION_PROMPTS = {
+    "explanation": PromptTemplate(
+        input_variables=_SECTION_INPUTS,
+        template=_SECTION_HEADER + """Write only the explanation: a clear explanation of the key concepts in about two paragraphs.
+Do not include a title, examples or quiz questions.
+"""
+    ),
+    "basic_example": PromptTemplate(
+        input_variables=_SECTION_INPUTS,
+        template=_SECTION_HEADER + """Write only one basic example: a simple, easy-to-understand worked example of the lesson's key idea.
+Do not include a title, explanation or quiz questions.
+"""
+    ),
+    "advanced_example": PromptTemplate(
+        input_variables=_SECTION_INPUTS,
+        template=_SECTION_HEADER + """Write only one advanced example: a more complex worked example that applies the lesson's key ideas.
+Do not include a title, explanation or quiz questions.
+"""
+    ),
+    "quiz": PromptTemplate(
+        input_variables=_SECTION_INPUTS,
+        template=_SECTION_HEADER + """Write only a 3-question multiple choice quiz on the lesson's key concepts, in this format:
+
+**Q1:** [Question]
+A. ...
+B. ...
+C. ...
+D. ...
+**Answer:** [Correct letter]
+
+**Q2:** [Question]
+...
+**Answer:** [Correct letter]
+
+**Q3:** [Question]
+...
+**Answer:** [Correct letter]
+"""
+    ),
+}
+
+QUESTION_PROMPT = PromptTemplate(
+    input_variables=["topic", "difficulty", "question_number"],
+    template="""
+You are a helpful AI tutor. Write one UNIQUE question about "{topic}" at a "{difficulty}" difficulty level.
+This is question #{question_number} - make sure it's different from previous questions.
+
+For EASY level: Basic definitions, simple concepts, straightforward applications
+For MEDIUM level: More complex relationships, multi-step thinking, analysis
+For HARD level: Advanced concepts, synthesis, critical thinking, complex scenarios
+
+Use this EXACT format:
+
+Question: <actual question here>
+
+A. <option>
+B. <option>
+C. <option>
+D. <option>
+
+**Correct Answer: X** (where X is the letter A, B, C, or D of the correct choice)
+
+Explanation: <one sentence explaining why this answer is correct>
+
+IMPORTANT: 
+- Make the question unique and appropriate for the {difficulty} level
+- Ensure all 4 options are plausible but only one is clearly correct
+"""
+)
+
+# Batch mode: several questions per difficulty level in one call
+BATCH_QUESTION_PROMPT = PromptTemplate(
+    input_variables=["topic", "per_level", "batch_number"],
+    template="""
+You are a helpful AI tutor. Write {per_level} UNIQUE questions about "{topic}" for EACH difficulty level: easy, medium and hard.
+This is batch #{batch_number} - make sure every question is different from each other and from previous batches.
+
+For EASY level: Basic definitions, simple concepts, straightforward applications
+For MEDIUM level: More complex relationships, multi-step thinking, analysis
+For HARD level: Advanced concepts, synthesis, critical thinking, complex scenarios
+
+Use this EXACT format for every question:
+
+Difficulty: <easy, medium or hard>
+Question: <actual question here>
+
+A. <option>
+B. <option>
+C. <option>
+D. <option>
+
+**Correct Answer: X** (where X is the letter A, B, C, or D of the correct choice)
+
+Explanation: <one sentence explaining why this answer is correct>
+
+IMPORTANT: 
+- Ensure all 4 options are plausible but only one is clearly correct
+"""
+)
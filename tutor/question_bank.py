@@ -0,0 +1,91 @@
+"""Bank of generated multiple-choice questions that passed validation.
+
+Questions are keyed by normalized topic and difficulty and deduplicated on
+their text, so a valid item can be shown again whenever a fresh generation
+fails validation or is not ready yet.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+
+from .curriculum_library import normalize_topic
+from .metrics import inc
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+BANK_PATH = os.path.join(DATA_DIR, "questions.sqlite3")
+
+
+def question_digest(q):
+    text = " ".join(q["question"].lower().split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class QuestionBank:
+    """SQLite-backed store of validated questions"""
+
+    def __init__(self, path=BANK_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS questions ("
+                " id INTEGER PRIMARY KEY, topic TEXT, difficulty TEXT, digest TEXT UNIQUE, item TEXT)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS questions_topic ON questions (topic, difficulty)")
+
+    def add(self, topic, difficulty, q):
+        """Store a validated question; returns its id"""
+        item = {k: q.get(k, "") for k in ("question", "choices", "correct", "explanation")}
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR IGNORE INTO questions (topic, difficulty, digest, item) VALUES (?, ?, ?, ?)",
+                (normalize_topic(topic), difficulty.lower(), question_digest(item), json.dumps(item)),
+            )
+            row = self._db.execute("SELECT id FROM questions WHERE digest = ?", (question_digest(item),)).fetchone()
+        return row[0]
+
+    def items(self, topic, difficulty=None, exclude=()):
+        """All banked questions for a topic (and difficulty), oldest first"""
+        query = "SELECT id, difficulty, item FROM questions WHERE topic = ?"
+        args = [normalize_topic(topic)]
+        if difficulty:
+            query += " AND difficulty = ?"
+            args.append(difficulty.lower())
+        with self._lock:
+            rows = self._db.execute(query + " ORDER BY id", args).fetchall()
+        return [
+            dict(json.loads(item), id=item_id, difficulty=level)
+            for item_id, level, item in rows if item_id not in exclude
+        ]
+
+    def get(self, item_ids):
+        """Banked questions by id, in the given order; unknown ids are skipped"""
+        item_ids = list(item_ids)
+        if not item_ids:
+            return []
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT id, difficulty, item FROM questions WHERE id IN ({','.join('?' * len(item_ids))})",
+                item_ids,
+            ).fetchall()
+        items = {item_id: dict(json.loads(item), id=item_id, difficulty=level) for item_id, level, item in rows}
+        return [items[item_id] for item_id in item_ids if item_id in items]
+
+    def sample(self, topic, difficulty, exclude=(), seed=""):
+        """Pick one banked question, deterministically for a given seed"""
+        items = self.items(topic, difficulty, exclude)
+        inc("tutor_cache_requests_total", cache="question_bank", result="hit" if items else "miss")
+        if not items:
+            return None
+        index = int(hashlib.sha256(str(seed).encode("utf-8")).hexdigest(), 16) % len(items)
+        return items[index]
+
+
+@lru_cache(maxsize=None)
+def get_question_bank():
+    return QuestionBank()
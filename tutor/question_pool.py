@@ -0,0 +1,110 @@
+"""Per-session pool of adaptive quiz questions generated in batches.
+
+One LLM call asks for a few questions at every difficulty level; they are
+parsed into a difficulty-keyed pool and the adaptive sequence is served from
+it.  When a level runs low the next batch is requested in the background, so
+most questions appear without waiting on the LLM at all.  A learner who finds
+the pool empty (the first question of a quiz) gets the batch fetched inline,
+at their own priority, rather than queued behind other sessions' jobs.
+"""
+
+import os
+import re
+import threading
+
+from .background import NORMAL, collect, get_executor
+from .metrics import inc
+from .profiling import profiled
+from .validation import validate_question
+
+# Questions per difficulty level in one batch call (0 disables batch mode)
+QUIZ_BATCH_SIZE = int(os.getenv("QUIZ_BATCH_SIZE", "2"))
+# Top up in the background once a level has this many questions left
+LOW_WATER = 1
+
+_DIFFICULTY_SPLIT = re.compile(r"^\W*difficulty\W*:\W*", re.IGNORECASE | re.MULTILINE)
+
+
+def parse_question_batch(raw, parse_one):
+    """Split a batch response into (difficulty, parsed question) pairs"""
+    items = []
+    for block in _DIFFICULTY_SPLIT.split(raw)[1:]:
+        level, _, rest = block.partition("\n")
+        level = re.sub(r"[^a-z]", "", level.lower())
+        items.append((level, parse_one(rest)))
+    return items
+
+
+class QuestionPool:
+    """Difficulty-keyed question pool with asynchronous top-ups.
+
+    ``fetch_batch(batch_number)`` returns the raw text of one batch call and
+    ``parse_one`` parses a single question block.  Only structurally valid
+    questions enter the pool.
+    """
+
+    def __init__(self, fetch_batch, parse_one, levels, low_water=LOW_WATER):
+        self.fetch_batch = fetch_batch
+        self.parse_one = parse_one
+        self.levels = list(levels)
+        self.low_water = low_water
+        self.pool = {level: [] for level in self.levels}
+        self.batches = 0
+        self._pending = None
+        self._lock = threading.Lock()
+
+    def _fetch(self, batch_number):
+        return parse_question_batch(self.fetch_batch(batch_number), self.parse_one)
+
+    def _merge(self):
+        future = self._pending
+        if future is None or not future.done():
+            return
+        self._pending = None
+        try:
+            self._add(future.result())
+        except Exception:
+            pass
+
+    def _fill(self):
+        """Get the next batch for a learner who is waiting on it"""
+        future, self._pending = self._pending, None
+        # A running top-up is waited for; a queued one is cancelled and fetched here instead
+        items = collect(future)
+        if items is None:
+            if future is None:
+                self.batches += 1
+            try:
+                items = self._fetch(self.batches)
+            except Exception:
+                return
+        self._add(items)
+
+    def _add(self, items):
+        with self._lock:
+            for level, q in items:
+                if level in self.pool and not validate_question(q):
+                    self.pool[level].append(dict(q, difficulty=level))
+
+    def top_up(self):
+        """Request the next batch in the background unless one is in flight"""
+        if self._pending is None:
+            self.batches += 1
+            self._pending = get_executor().submit(self._fetch, self.batches, priority=NORMAL)
+
+    @profiled("question_pool.next")
+    def next(self, level):
+        """Pop a question at ``level``, fetching a batch first if the pool has none.
+
+        Returns None when the pool can't supply one (e.g. the batch came back
+        without that level); callers then fall back to a single-question call.
+        """
+        self._merge()
+        if not self.pool.get(level):
+            self._fill()
+        with self._lock:
+            question = self.pool[level].pop(0) if self.pool.get(level) else None
+        if len(self.pool.get(level, [])) <= self.low_water:
+            self.top_up()
+        inc("tutor_cache_requests_total", cache="question_pool", result="miss" if question is None else "hit")
+        return question
@@ -0,0 +1,145 @@
+"""Spaced-repetition review of questions a learner has answered.
+
+A ``ReviewQueue`` lives in a learner's session state and schedules banked
+questions (by question bank id) with SM-2: a correct answer pushes the next
+review out by a growing interval (1, 6, then interval x easiness units of
+``REVIEW_INTERVAL_UNIT`` seconds), a missed one comes back after
+``RELEARN_DELAY`` seconds and lowers the item's easiness.
+
+Due items are kept in two min-heaps keyed by due time, one for items last
+answered wrong and one for the rest, so missed items are offered first and
+finding due items costs O(log n) per item however many a learner has seen.
+Rescheduling pushes a new heap entry and leaves the old one to be skipped:
+each entry carries a sequence number, and only an item's latest is live.
+
+A queue created for a learner id loads that learner's schedule from a SQLite
+``ReviewStore`` and saves every rescheduled item back, so reviews come due
+across sessions and restarts.
+"""
+
+import heapq
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+REVIEWS_PATH = os.path.join(DATA_DIR, "reviews.sqlite3")
+
+REVIEW_INTERVAL_UNIT = float(os.getenv("REVIEW_INTERVAL_UNIT", str(24 * 3600)))
+RELEARN_DELAY = float(os.getenv("REVIEW_RELEARN_DELAY", "300"))
+
+DEFAULT_EASINESS = 2.5
+MIN_EASINESS = 1.3
+# SM-2 response quality (0-5) for a correct and a missed answer
+CORRECT_QUALITY = 4
+MISSED_QUALITY = 1
+
+
+class ReviewStore:
+    """SQLite-backed SM-2 cards of every learner"""
+
+    def __init__(self, path=REVIEWS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cards ("
+                " learner TEXT, item_id INTEGER, repetitions INTEGER, easiness REAL, interval INTEGER,"
+                " due REAL, missed INTEGER, PRIMARY KEY (learner, item_id))"
+            )
+
+    def load(self, learner):
+        """A learner's cards as item id -> (repetitions, easiness, interval, due, missed)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT item_id, repetitions, easiness, interval, due, missed FROM cards WHERE learner = ?",
+                (learner,),
+            ).fetchall()
+        return {item_id: (repetitions, easiness, interval, due, bool(missed))
+                for item_id, repetitions, easiness, interval, due, missed in rows}
+
+    def save(self, learner, item_id, card):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cards VALUES (?, ?, ?, ?, ?, ?, ?)", (learner, item_id, *card)
+            )
+
+
+@lru_cache(maxsize=None)
+def get_review_store():
+    return ReviewStore()
+
+
+class ReviewQueue:
+    """One learner's SM-2 schedule with heap-ordered due queues"""
+
+    def __init__(self, learner=None):
+        self.learner = learner  # saved to the review store when set
+        self.cards = {}  # item id -> (repetitions, easiness, interval, due, missed)
+        self._missed = []  # (due, seq, item id) heap of items last answered wrong
+        self._review = []  # (due, seq, item id) heap of the rest
+        self._live = {}  # item id -> seq of its current heap entry
+        self._seq = itertools.count()
+        if learner is not None:
+            for item_id, card in get_review_store().load(learner).items():
+                self._schedule(item_id, card)
+
+    def __len__(self):
+        return len(self.cards)
+
+    def record(self, item_id, correct, now=None):
+        """Reschedule an item after an answer"""
+        now = time.time() if now is None else now
+        repetitions, easiness, interval, _, _ = self.cards.get(item_id, (0, DEFAULT_EASINESS, 0, 0, False))
+        quality = CORRECT_QUALITY if correct else MISSED_QUALITY
+        if correct:
+            interval = 1 if repetitions == 0 else 6 if repetitions == 1 else round(interval * easiness)
+            repetitions += 1
+            due = now + interval * REVIEW_INTERVAL_UNIT
+        else:
+            repetitions, interval = 0, 1
+            due = now + RELEARN_DELAY
+        easiness = max(MIN_EASINESS, easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        card = (repetitions, easiness, interval, due, not correct)
+        self._schedule(item_id, card)
+        self._compact()
+        if self.learner is not None:
+            get_review_store().save(self.learner, item_id, card)
+
+    def _schedule(self, item_id, card):
+        due, missed = card[3], card[4]
+        self.cards[item_id] = card
+        seq = self._live[item_id] = next(self._seq)
+        heapq.heappush(self._missed if missed else self._review, (due, seq, item_id))
+
+    def _current(self, entry):
+        return self._live.get(entry[2]) == entry[1]
+
+    def _take_due(self, heap, now, count):
+        taken = []
+        while heap and heap[0][0] <= now and len(taken) < count:
+            entry = heapq.heappop(heap)
+            if self._current(entry):
+                taken.append(entry)
+        # Items stay scheduled until they are answered again
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [item_id for _, _, item_id in taken]
+
+    def due(self, count, now=None):
+        """Up to ``count`` item ids due for review, missed items first"""
+        now = time.time() if now is None else now
+        items = self._take_due(self._missed, now, count)
+        return items + self._take_due(self._review, now, count - len(items))
+
+    def _compact(self):
+        # Drop superseded entries once they outnumber live ones
+        if len(self._missed) + len(self._review) > 2 * len(self.cards) + 16:
+            self._missed = [e for e in self._missed if self._current(e)]
+            self._review = [e for e in self._review if self._current(e)]
+            heapq.heapify(self._missed)
+            heapq.heapify(self._review)
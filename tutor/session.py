@@ -0,0 +1,34 @@
+"""Session-state helpers shared by the apps."""
+
+import copy
+import uuid
+
+import streamlit as st
+
+
+def init_state(defaults):
+    """Set session_state keys that are missing.
+
+    Callable defaults are called (in order, so they can use keys set before
+    them); other values are copied so sessions never share a mutable default.
+    """
+    for key, value in defaults.items():
+        if key not in st.session_state:
+            st.session_state[key] = value() if callable(value) else copy.copy(value)
+
+
+def learner_id():
+    """Id of the learner from the ``learner`` query parameter, added to the URL when missing"""
+    learner = st.query_params.get("learner")
+    if not learner:
+        learner = st.query_params["learner"] = uuid.uuid4().hex
+    return learner
+
+
+def reset_state():
+    """Forget everything in this session, including its spilled lesson cache entries"""
+    cache = st.session_state.get("lesson_cache")
+    if cache is not None:
+        cache.clear()
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
@@ -0,0 +1,198 @@
+"""Memory-bounded per-session cache for lesson content.
+
+Long sessions used to keep every lesson quiz and practice set they touched in
+``st.session_state``.  A ``SessionCache`` keeps entries in memory up to a
+byte cap (``SESSION_CACHE_BYTES``), never evicting pinned keys (the current
+and adjacent lessons).  Least recently used entries beyond the cap are
+spilled to a shared SQLite file and reloaded on demand; entries that can be
+rebuilt from elsewhere (lesson text from the lesson store) are just dropped.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+from .metrics import inc
+
+DATA_DIR = os.getenv("TUTOR_DATA_DIR", "tutor_data")
+SPILL_PATH = os.path.join(DATA_DIR, "session_spill.sqlite3")
+SESSION_CACHE_BYTES = int(os.getenv("SESSION_CACHE_BYTES", str(256 * 1024)))
+# Spilled entries of sessions idle for longer than this are deleted
+SPILL_TTL = float(os.getenv("SESSION_SPILL_TTL", str(24 * 3600)))
+
+
+class SpillStore:
+    """Compressed pickled values keyed by (session, key)"""
+
+    def __init__(self, path=SPILL_PATH, ttl=SPILL_TTL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS spill ("
+                " session TEXT, key TEXT, value BLOB, updated REAL, PRIMARY KEY (session, key))"
+            )
+            self._db.execute("DELETE FROM spill WHERE updated < ?", (time.time() - ttl,))
+
+    def put(self, session, key, value):
+        blob = zlib.compress(pickle.dumps(value))
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO spill VALUES (?, ?, ?, ?)", (session, key, blob, time.time())
+            )
+
+    def get(self, session, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM spill WHERE session = ? AND key = ?", (session, key)
+            ).fetchone()
+        return None if row is None else pickle.loads(zlib.decompress(row[0]))
+
+    def delete(self, session, key=None):
+        with self._lock, self._db:
+            if key is None:
+                self._db.execute("DELETE FROM spill WHERE session = ?", (session,))
+            else:
+                self._db.execute("DELETE FROM spill WHERE session = ? AND key = ?", (session, key))
+
+
+@lru_cache(maxsize=None)
+def get_spill_store():
+    return SpillStore()
+
+
+def value_bytes(value):
+    """Approximate in-memory footprint of a value, by its pickled size"""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(pickle.dumps(value))
+
+
+class SessionCache:
+    """Byte-capped LRU of plain-data values with pinning and spill-to-disk"""
+
+    def __init__(self, session_id, cap_bytes=SESSION_CACHE_BYTES):
+        self.session_id = session_id
+        self.cap_bytes = cap_bytes
+        self.entries = OrderedDict()  # key -> (value, size, spillable)
+        self.pinned = set()
+        self.spilled = set()
+        self.bytes = 0
+        self.spills = 0
+        self.reloads = 0
+
+    def __contains__(self, key):
+        return key in self.entries or key in self.spilled
+
+    def _insert(self, key, value, spillable):
+        self._remove(key)
+        size = value_bytes(value)
+        self.entries[key] = (value, size, spillable)
+        self.bytes += size
+        self._evict()
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[1]
+
+    def _evict(self):
+        for key in list(self.entries):
+            if self.bytes <= self.cap_bytes:
+                break
+            if key in self.pinned:
+                continue
+            value, _, spillable = self.entries[key]
+            if spillable:
+                get_spill_store().put(self.session_id, key, value)
+                self.spilled.add(key)
+                self.spills += 1
+            self._remove(key)
+
+    def set(self, key, value, spillable=True):
+        """Store a value; pass spillable=False for values that ``get`` can reload"""
+        if key in self.spilled:
+            self.spilled.discard(key)
+            get_spill_store().delete(self.session_id, key)
+        self._insert(key, value, spillable)
+
+    def get(self, key, load=None):
+        """Return a value from memory or spill, else from ``load()`` when given"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            inc("tutor_cache_requests_total", cache="session_cache", result="hit")
+            return self.entries[key][0]
+        if key in self.spilled:
+            inc("tutor_cache_requests_total", cache="session_cache", result="spill")
+            value = get_spill_store().get(self.session_id, key)
+            self.spilled.discard(key)
+            get_spill_store().delete(self.session_id, key)
+            self.reloads += 1
+            self._insert(key, value, True)
+            return value
+        inc("tutor_cache_requests_total", cache="session_cache", result="miss")
+        if load is None:
+            return None
+        value = load()
+        self._insert(key, value, False)
+        return value
+
+    def pop(self, key):
+        value = self.get(key)
+        self._remove(key)
+        return value
+
+    def pin(self, *keys):
+        """Keep exactly these keys resident; others become evictable"""
+        self.pinned = {k for k in keys if k is not None}
+        self._evict()
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        if self.spilled:
+            get_spill_store().delete(self.session_id)
+        self.spilled.clear()
+
+    def usage(self):
+        return {
+            "bytes": self.bytes,
+            "cap_bytes": self.cap_bytes,
+            "entries": len(self.entries),
+            "spilled": len(self.spilled),
+            "spills": self.spills,
+            "reloads": self.reloads,
+        }
+
+
+def state_bytes(state):
+    """Best-effort size of a session's state, skipping values that can't be pickled"""
+    total = 0
+    for key in list(state.keys()):
+        value = state[key]
+        if isinstance(value, SessionCache):
+            total += value.bytes
+            continue
+        try:
+            total += value_bytes(value)
+        except Exception:
+            pass
+    return total
+
+
+def render_usage(cache):
+    """Sidebar caption with this session's memory use"""
+    import streamlit as st
+
+    usage = cache.usage()
+    st.sidebar.caption(
+        f"Session memory: {state_bytes(st.session_state) / 1024:.0f} KiB "
+        f"(lesson cache {usage['bytes'] / 1024:.0f} / {usage['cap_bytes'] / 1024:.0f} KiB, "
+        f"{usage['spilled']} spilled to disk)"
+    )
@@ -0,0 +1,140 @@
+"""Local structural checks, shuffling and grading for generated quiz items.
+
+Everything here runs before a question is displayed and costs no LLM calls.
+A question is only shown when it has four distinct choices labelled A-D and
+an answer letter that exists among them; otherwise a valid item from the
+question bank is shown while a replacement is generated in the background,
+or, when the bank has none, a replacement is generated right away.
+Valid items are shown with their choices in a per-learner order, so one
+generated or banked item can serve many learners and retakes.
+"""
+
+import hashlib
+import random
+import re
+
+from .background import LOW, get_executor
+from .question_bank import get_question_bank
+
+LETTERS = ("A", "B", "C", "D")
+
+# Letter references in explanations, e.g. "Option B" or "answer (C)"; lowercase letters are plain words
+_LETTER_REF = re.compile(r"\b((?i:option|choice|answer)\s+\(?)([A-D])\b")
+
+
+def choice_letter(choice):
+    return choice.replace("**", "").strip().split(".", 1)[0].strip()
+
+
+def choice_text(choice):
+    parts = choice.replace("**", "").split(".", 1)
+    return parts[1].strip() if len(parts) == 2 else ""
+
+
+def answer_letter(q):
+    """The answer letter of a parsed question, from either "correct" or "answer" """
+    raw = (q.get("correct") or q.get("answer") or "").replace("**", "").strip()
+    match = re.match(r"^\(?([A-D])\b", raw, re.IGNORECASE)
+    return match.group(1).upper() if match else ""
+
+
+def validate_question(q):
+    """Return a list of problems; an empty list means the item can be shown"""
+    problems = []
+    if not q.get("question", "").strip():
+        problems.append("missing question text")
+    choices = q.get("choices", [])
+    letters = [choice_letter(c) for c in choices]
+    if len(choices) != 4:
+        problems.append(f"expected 4 choices, got {len(choices)}")
+    if sorted(letters) != sorted(set(letters)) or not set(letters) <= set(LETTERS):
+        problems.append("choice letters are not distinct A-D")
+    texts = [" ".join(choice_text(c).lower().split()) for c in choices]
+    if "" in texts or len(set(texts)) != len(texts):
+        problems.append("duplicate or empty options")
+    letter = answer_letter(q)
+    if letter not in letters:
+        problems.append("answer letter is not among the choices")
+    return problems
+
+
+def shuffle_choices(q, seed):
+    """Copy of a question with its choices reordered for ``seed``, relabelled A-D and the answer remapped.
+
+    The order depends only on the seed and the question text, so a learner
+    sees the same order on every rerun.  Invalid items are returned as-is.
+    """
+    if validate_question(q):
+        return q
+    choices = q["choices"]
+    order = list(range(len(choices)))
+    random.Random(hashlib.sha256(f"{seed}\x1f{q['question']}".encode("utf-8")).digest()).shuffle(order)
+    mapping = {choice_letter(choices[old]): LETTERS[new] for new, old in enumerate(order)}
+    shuffled = dict(q, choices=[f"{LETTERS[new]}. {choice_text(choices[old])}" for new, old in enumerate(order)])
+    for field in ("correct", "answer"):
+        if q.get(field):
+            shuffled[field] = mapping[answer_letter(q)]
+    if q.get("explanation"):
+        shuffled["explanation"] = _LETTER_REF.sub(
+            lambda m: m.group(1) + mapping[m.group(2)], q["explanation"]
+        )
+    return shuffled
+
+
+def shuffled_quiz(quiz, seed):
+    """A {number: question} quiz with every question shuffled for ``seed``"""
+    return {q_num: shuffle_choices(q, seed) for q_num, q in quiz.items()}
+
+
+def grade(q, selected):
+    """True when the selected letter matches the item's answer letter"""
+    letter = answer_letter(q)
+    return bool(letter) and (selected or "").strip().upper() == letter
+
+
+def _regenerate_into_bank(generate, topic, difficulty, attempts):
+    for _ in range(attempts):
+        q = generate()
+        if not validate_question(q):
+            return dict(q, id=get_question_bank().add(topic, difficulty, q))
+    return None
+
+
+def checked_question(q, topic, difficulty, generate, exclude=(), seed="", attempts=2):
+    """Return a valid, banked item to display, or None.
+
+    Valid items are banked and returned as-is.  An invalid item is swapped
+    for a bank item while a replacement is generated into the bank in the
+    background with ``generate`` (a no-argument callable returning a parsed
+    question).  When the bank has nothing for the topic the replacement is
+    generated here instead, at the caller's priority.
+    """
+    bank = get_question_bank()
+    if not validate_question(q):
+        return dict(q, id=bank.add(topic, difficulty, q))
+    item = bank.sample(topic, difficulty, exclude, seed)
+    if item is None:
+        return _regenerate_into_bank(generate, topic, difficulty, attempts)
+    get_executor().submit(_regenerate_into_bank, generate, topic, difficulty, 1, priority=LOW)
+    return item
+
+
+def checked_lesson_quiz(quiz, topic, difficulty, generate, seed=""):
+    """Validate the quiz embedded in a lesson.
+
+    Valid items are banked.  Invalid ones are swapped for a bank item (or
+    dropped when the bank has none) and a replacement question is generated
+    into the bank in the background for the next learner.
+    """
+    bank = get_question_bank()
+    checked = {}
+    for q_num, q in quiz.items():
+        if not validate_question(q):
+            checked[q_num] = dict(q, id=bank.add(topic, difficulty, dict(q, correct=answer_letter(q))))
+            continue
+        get_executor().submit(_regenerate_into_bank, generate, topic, difficulty, 1, priority=LOW)
+        chosen = [item["id"] for item in checked.values() if "id" in item]
+        item = bank.sample(topic, difficulty, chosen, seed=f"{seed}:{q_num}")
+        if item is not None:
+            checked[q_num] = dict(item, answer=item["correct"])
+    return checked